@@ -12,6 +12,8 @@ import pymel
 
 from PySide2 import QtWidgets, QtCore
 
+from common_utils import root_paths
+
 from assign_material_central_library_UI import AssignMaterialCentralLibraryUI
 
 class AssignMaterialCentralLibraryCore(AssignMaterialCentralLibraryUI):
@@ -303,9 +305,7 @@ class AssignMaterialCentralLibraryCore(AssignMaterialCentralLibraryUI):
 
         library_relative_path = 'assets/material_library'
 
-        project_path = os.path.expandvars('%ADI_ROOT_FOLDER%')
-        library_path = os.path.join(project_path, library_relative_path)
-        library_path = library_path.replace('\\', '/')
+        library_path = root_paths.join_root(library_relative_path)
 
         if os.path.exists(library_path):
             return library_path
@@ -0,0 +1,352 @@
+""" Streaming parser of maya ascii files, finds the files a maya file depends
+on without maya: references, textures, alembic and geometry caches and xgen
+palettes. Files are read in big chunks and only the statements that can hold
+a file path are decoded, so memory does not grow with the file size.
+
+Usage:
+    python maya_ascii.py scene_a.ma scene_b.ma
+    python maya_ascii.py --workers 8 --json /shots/*/*.ma
+
+    from common_utils import maya_ascii
+    maya_ascii.parse_dependencies('D:/shot/scene.ma')
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import argparse
+import collections
+import json
+import os
+import re
+import sys
+
+
+## Kind of a referenced maya file.
+# type: str
+REFERENCE = 'reference'
+
+## Kind of a texture file, can have UDIM or frame tokens.
+# type: str
+TEXTURE = 'texture'
+
+## Kind of a cache file (alembic, gpu cache, geometry cache).
+# type: str
+CACHE = 'cache'
+
+## Kind of a xgen palette file.
+# type: str
+XGEN = 'xgen'
+
+## A file a maya ascii file depends on.
+# type: namedtuple
+FileDependency = collections.namedtuple('FileDependency', ['kind', 'path'])
+
+## Bytes read from disk at once.
+# type: int
+CHUNK_SIZE = 4 * 1024 * 1024
+
+## Longest statement kept in memory, longer ones can not hold a file path.
+# type: int
+MAX_STATEMENT_SIZE = 1024 * 1024
+
+## Kind of the file stored in an attribute, by (node type, attribute).
+# type: {}
+_FILE_ATTRIBUTES = {('file', '.ftn'): TEXTURE,
+                    ('file', '.cfnp'): TEXTURE,
+                    ('imagePlane', '.imn'): TEXTURE,
+                    ('AlembicNode', '.fn'): CACHE,
+                    ('AlembicNode', '.fns'): CACHE,
+                    ('gpuCache', '.cfn'): CACHE,
+                    ('xgmPalette', '.xfn'): XGEN}
+
+## Attributes of a geometry cache node, directory and name of its xml file.
+# type: tuple
+_CACHE_FILE_ATTRIBUTES = ('.cp', '.cn')
+
+## Attributes of script nodes, scripts can import alembic files.
+# type: tuple
+_SCRIPT_ATTRIBUTES = ('.b', '.a')
+
+## Quoted attribute names worth decoding, every other setAttr is skipped.
+# type: tuple
+_QUOTED_ATTRIBUTES = tuple(set('"{}"'.format(attribute).encode('ascii')
+                               for attribute in ([attribute for _, attribute in _FILE_ATTRIBUTES] +
+                                                 list(_CACHE_FILE_ATTRIBUTES) +
+                                                 list(_SCRIPT_ATTRIBUTES))))
+
+## Statements starting a new context or holding a reference.
+# type: tuple
+_STATEMENT_PREFIXES = (b'file ', b'createNode ', b'select ')
+
+## Finds double quoted strings, escaped quotes included.
+# type: re
+_QUOTED_REGEX = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+## Finds alembic files inside scripts (eg. AbcImport "D:/cache.abc").
+# type: re
+_ABC_REGEX = re.compile(r'([^\s"\';]+\.abc)\b', re.IGNORECASE)
+
+## Finds the copy number maya adds to references loaded several times.
+# type: re
+_COPY_NUMBER_REGEX = re.compile(r'\{\d+\}$')
+
+## Parsed dependencies by (full path, modification time, size).
+# type: {}
+_PARSE_CACHE = {}
+
+
+def clear_parse_cache():
+    """ Forgets every parsed file.
+    """
+
+    _PARSE_CACHE.clear()
+
+    return
+
+
+def strip_copy_number(path):
+    """ Removes the copy number of a reference path, path.ma{1} -> path.ma
+    Args:
+        path: String representing the reference path.
+    Return:
+        String representing the path without copy number.
+    """
+
+    return _COPY_NUMBER_REGEX.sub('', path)
+
+
+def unquote(value):
+    """ Removes maya escaping from a quoted string.
+    Args:
+        value: String inside the quotes.
+    Return:
+        String representing the unescaped value.
+    """
+
+    return value.replace('\\"', '"').replace('\\\\', '\\')
+
+
+def iter_lines(full_path, chunk_size=CHUNK_SIZE):
+    """ Yields raw lines of a file reading it in chunks. Lines longer than
+    MAX_STATEMENT_SIZE are yielded cut, they only hold data.
+    Args:
+        full_path: String representing the file full path.
+        chunk_size: Integer representing the bytes read at once.
+    Yield:
+        Bytes of every line without line break.
+    """
+
+    remainder = b''
+
+    with open(full_path, 'rb') as maya_file:
+        while True:
+            chunk = maya_file.read(chunk_size)
+
+            if not chunk:
+                break
+
+            lines = (remainder + chunk).split(b'\n')
+            remainder = lines.pop()
+
+            for line in lines:
+                yield line
+
+            if len(remainder) > MAX_STATEMENT_SIZE:
+                yield remainder[:MAX_STATEMENT_SIZE]
+                remainder = b'\t\t'
+
+    if remainder:
+        yield remainder
+
+
+def iter_statements(full_path, chunk_size=CHUNK_SIZE):
+    """ Yields statements of a maya ascii file that can hold a file path,
+    joining the lines a statement is split in. Other statements (eg. mesh
+    points) are skipped without decoding them.
+    Args:
+        full_path: String representing the maya ascii file.
+        chunk_size: Integer representing the bytes read at once.
+    Yield:
+        String representing the statement.
+    """
+
+    statement = None
+    statement_size = 0
+
+    for line in iter_lines(full_path, chunk_size):
+        # Maya indents node attributes one tab, and the lines a statement
+        # continues in two tabs.
+        if line.startswith(b'\t\t'):
+            if statement is not None and statement_size < MAX_STATEMENT_SIZE:
+                statement.append(line.strip())
+                statement_size += len(line)
+
+            continue
+
+        if statement is not None:
+            yield b' '.join(statement).decode('utf-8', 'replace')
+
+        statement = None
+        stripped = line.strip()
+
+        if stripped.startswith(b'setAttr '):
+            if any(attribute in stripped for attribute in _QUOTED_ATTRIBUTES):
+                statement = [stripped]
+
+        # Select ends the node attributes are set on.
+        elif stripped.startswith(_STATEMENT_PREFIXES):
+            statement = [stripped]
+
+        statement_size = len(stripped)
+
+    if statement is not None:
+        yield b' '.join(statement).decode('utf-8', 'replace')
+
+
+def iter_dependencies(full_path, chunk_size=CHUNK_SIZE):
+    """ Yields the files a maya ascii file depends on, in file order.
+    Args:
+        full_path: String representing the maya ascii file.
+        chunk_size: Integer representing the bytes read at once.
+    Yield:
+        FileDependency, texture paths can have tokens and paths can have
+        environment variables or be relative.
+    """
+
+    node_type = None
+    cache_file = {}
+
+    for statement in iter_statements(full_path, chunk_size):
+        if statement.startswith('createNode '):
+            node_type = statement.split()[1]
+            cache_file = {}
+
+            continue
+
+        if statement.startswith('select '):
+            node_type = None
+
+            continue
+
+        values = _QUOTED_REGEX.findall(statement)
+
+        if not values:
+            continue
+
+        if statement.startswith('file '):
+            yield FileDependency(REFERENCE, strip_copy_number(unquote(values[-1])))
+
+            continue
+
+        attribute = values[0]
+        value = unquote(values[-1]) if len(values) > 1 else ''
+
+        if not value:
+            continue
+
+        kind = _FILE_ATTRIBUTES.get((node_type, attribute))
+
+        # String arrays (eg. alembic layers) hold several files.
+        if kind is not None:
+            for file_path in values[2:] if values[1:2] == ['stringArray'] else [value]:
+                if file_path:
+                    yield FileDependency(kind, unquote(file_path))
+
+        elif node_type == 'cacheFile' and attribute in _CACHE_FILE_ATTRIBUTES:
+            cache_file[attribute] = value
+
+            if len(cache_file) == len(_CACHE_FILE_ATTRIBUTES):
+                cache_path = '{}/{}.xml'.format(cache_file['.cp'].rstrip('/\\'), cache_file['.cn'])
+
+                yield FileDependency(CACHE, cache_path)
+
+        elif node_type == 'script' and attribute in _SCRIPT_ATTRIBUTES:
+            for abc_path in _ABC_REGEX.findall(value):
+                yield FileDependency(CACHE, abc_path)
+
+
+def parse_dependencies(full_path):
+    """ Gets the files a maya ascii file depends on without repeating them,
+    parsing it only once while it does not change.
+    Args:
+        full_path: String representing the maya ascii file.
+    Return:
+        List of FileDependency, texture paths can have tokens.
+    """
+
+    try:
+        file_stat = os.stat(full_path)
+
+    except OSError:
+        return []
+
+    cache_key = (full_path, file_stat.st_mtime, file_stat.st_size)
+
+    if cache_key in _PARSE_CACHE:
+        return _PARSE_CACHE[cache_key]
+
+    dependencies = list(collections.OrderedDict.fromkeys(iter_dependencies(full_path)))
+
+    _PARSE_CACHE[cache_key] = dependencies
+
+    return dependencies
+
+
+def parse_many(full_paths, workers=1):
+    """ Parses several maya ascii files, in other processes if workers > 1.
+    Args:
+        full_paths: List of string representing maya ascii files.
+        workers: Integer representing the amount of processes.
+    Return:
+        List of tuples (full path, list of FileDependency), in paths order.
+    """
+
+    if workers <= 1 or len(full_paths) <= 1:
+        return [(full_path, parse_dependencies(full_path)) for full_path in full_paths]
+
+    import multiprocessing
+
+    pool = multiprocessing.Pool(min(workers, len(full_paths)))
+
+    try:
+        results = pool.map(parse_dependencies, full_paths)
+
+    finally:
+        pool.close()
+        pool.join()
+
+    return list(zip(full_paths, results))
+
+
+def main(argv=None):
+    """ Prints dependencies of passed maya ascii files.
+    Args:
+        argv: List of command line arguments, sys.argv if None.
+    Return:
+        Integer exit code.
+    """
+
+    parser = argparse.ArgumentParser(description='List files maya ascii files depend on, without maya.')
+    parser.add_argument('scenes', nargs='+', help='Maya ascii files.')
+    parser.add_argument('--workers', type=int, default=1, help='Files parsed at the same time.')
+    parser.add_argument('--json', action='store_true', help='Print one json object per maya file.')
+
+    args = parser.parse_args(argv)
+
+    for full_path, dependencies in parse_many(args.scenes, args.workers):
+        if args.json:
+            print(json.dumps({'scene': full_path,
+                              'dependencies': [dependency._asdict() for dependency in dependencies]}))
+
+            continue
+
+        print(full_path)
+
+        for dependency in dependencies:
+            print('    {}\t{}'.format(dependency.kind, dependency.path))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+""" Root folder of the folder structure (ADI_ROOT_FOLDER environment variable)
+and path helpers shared by every tool.
+
+The root folder is resolved once and resolved again only if the environment
+variable changes. Paths are not cached: normalize_path replaces backslashes
+on every call and interns the result, so repeated paths share one string
+while they are in use.
+
+Usage:
+    from common_utils import root_paths
+    root_paths.get_root_directory()
+    root_paths.classify_path('D:/ADI_project/sq010/sh010/tex/body.exr')
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+
+try:
+    from sys import intern
+except ImportError:
+    # Python 2 builtin.
+    pass
+
+
+## Environment variable holding the root folder.
+# type: str
+ROOT_VARIABLE = 'ADI_ROOT_FOLDER'
+
+## Root folder written as variable in maya paths.
+# type: str
+ROOT_TOKEN = '%{}%'.format(ROOT_VARIABLE)
+
+## Classification of paths under the root folder.
+# type: str
+IN_STRUCTURE = 'structure'
+
+## Classification of xgen paths outside the root folder.
+# type: str
+XGEN = 'xgen'
+
+## Classification of any other path.
+# type: str
+EXTERNAL = 'external'
+
+## Environment value and root folder resolved from it.
+# type: []
+_ROOT_CACHE = [None, '']
+
+## Paths are compared without case on windows.
+# type: bool
+_IGNORE_CASE = os.name == 'nt'
+
+
+def normalize_path(path):
+    """ Normalizes a path with forward slashes, same paths share the string.
+    Args:
+        path: String representing a path.
+    Return:
+        String representing the normalized path.
+    """
+
+    normalized_path = path.replace('\\', '/')
+
+    # Not memoized, a cache by path grows with every path ever seen. Interned
+    # strings are freed once nothing uses them.
+    try:
+        normalized_path = intern(normalized_path)
+
+    # Python 2 only interns byte strings.
+    except TypeError:
+        pass
+
+    return normalized_path
+
+
+def get_root_directory():
+    """ Gets the root folder of the folder structure.
+    Return:
+        String representing the root folder with forward slashes, without
+        trailing slash, empty if environment variable is not set.
+    """
+
+    root_value = os.environ.get(ROOT_VARIABLE)
+
+    if root_value != _ROOT_CACHE[0]:
+        _ROOT_CACHE[0] = root_value
+        _ROOT_CACHE[1] = normalize_path(root_value).rstrip('/') if root_value else ''
+
+    return _ROOT_CACHE[1]
+
+
+def is_under(path, directory):
+    """ Checks if path is directory or any path inside it.
+    Args:
+        path: String representing a normalized path.
+        directory: String representing a normalized directory, no trailing slash.
+    Return:
+        True if path is under directory, False otherwise.
+    """
+
+    if not directory or len(path) < len(directory):
+        return False
+
+    path_start = path[:len(directory)]
+
+    if _IGNORE_CASE:
+        if path_start.lower() != directory.lower():
+            return False
+
+    elif path_start != directory:
+        return False
+
+    return len(path) == len(directory) or path[len(directory)] == '/'
+
+
+def is_in_structure(path, root_directory=None):
+    """ Checks if a path is under the root folder.
+    Args:
+        path: String representing a path.
+        root_directory: String representing the root folder, current one if None.
+    Return:
+        True if path is under the root folder, False otherwise.
+    """
+
+    if root_directory is None:
+        root_directory = get_root_directory()
+
+    return is_under(normalize_path(path), root_directory.rstrip('/'))
+
+
+def classify_path(path, root_directory=None):
+    """ Classifies a path by where it is.
+    Args:
+        path: String representing a path.
+        root_directory: String representing the root folder, current one if None.
+    Return:
+        IN_STRUCTURE, XGEN or EXTERNAL.
+    """
+
+    if is_in_structure(path, root_directory):
+        return IN_STRUCTURE
+
+    if '/xgen/' in '/{}/'.format(normalize_path(path)):
+        return XGEN
+
+    return EXTERNAL
+
+
+def relative_to_root(path, root_directory=None):
+    """ Gets the part of a path under the root folder.
+    Args:
+        path: String representing a path.
+        root_directory: String representing the root folder, current one if None.
+    Return:
+        String starting with slash, None if path is not under the root folder.
+    """
+
+    if root_directory is None:
+        root_directory = get_root_directory()
+
+    if not is_in_structure(path, root_directory):
+        return None
+
+    return normalize_path(path)[len(root_directory.rstrip('/')):]
+
+
+def to_root_token_path(path):
+    """ Replaces the root folder of a path with ROOT_TOKEN, so the path works
+    on every machine.
+    Args:
+        path: String representing a path.
+    Return:
+        String representing the path with ROOT_TOKEN, same path if it is not
+        under the root folder.
+    """
+
+    path_under_root = relative_to_root(path)
+
+    if path_under_root is None:
+        return path
+
+    return '{}{}'.format(ROOT_TOKEN, path_under_root)
+
+
+def expand_path(path):
+    """ Expands ROOT_TOKEN and environment variables of a path, ROOT_TOKEN is
+    expanded on every platform.
+    Args:
+        path: String representing a path, as written in maya files.
+    Return:
+        String representing the expanded path with forward slashes.
+    """
+
+    root_directory = get_root_directory()
+
+    if root_directory and ROOT_TOKEN in path:
+        path = path.replace(ROOT_TOKEN, root_directory)
+
+    return normalize_path(os.path.expandvars(path))
+
+
+def join_root(*parts):
+    """ Joins parts to the root folder.
+    Args:
+        parts: Strings representing the directories and file under root.
+    Return:
+        String representing the full path with forward slashes.
+    """
+
+    return normalize_path(os.path.join(get_root_directory(), *parts))
@@ -0,0 +1,201 @@
+""" Expands texture file patterns (UDIM, UV tiles and frame sequences) into
+the files matching them on disk.
+
+Every directory is listed once and kept in memory until it changes, so many
+file nodes pointing into the same folder do not list it again.
+
+Supported tokens, case insensitive:
+    <UDIM>        1001, 1002..
+    <UVTILE>      u1_v1, u2_v1..
+    <U> <V>       u<U>_v<V> (Mudbox), 1 based digits.
+    <f> <frame>   frame number, also ### hashes and %04d.
+
+Usage:
+    from common_utils import texture_tiles
+    texture_tiles.resolve_pattern('D:/tex/body.<UDIM>.exr')
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+import re
+
+from common_utils import root_paths
+
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
+
+
+## Tokens of a texture pattern and the regular expression they match.
+# type: []
+_TOKEN_PATTERNS = [('<udim>', r'\d{4}'),
+                   ('<uvtile>', r'u\d+_v\d+'),
+                   ('<u>', r'\d+'),
+                   ('<v>', r'\d+'),
+                   ('<frame>', r'-?\d+'),
+                   ('<f>', r'-?\d+')]
+
+## Finds any token in a file name, hashes and printf frames included.
+# type: re
+_TOKEN_REGEX = re.compile('({}|#+|%0?\\d*d)'.format('|'.join(re.escape(token) for token, _ in _TOKEN_PATTERNS)),
+                          re.IGNORECASE)
+
+## File names by directory full path, with the directory modification time.
+# type: {directory: (mtime, [file names])}
+_DIRECTORY_INDEX = {}
+
+## Compiled file name regular expression by file name pattern.
+# type: {}
+_REGEX_CACHE = {}
+
+
+def clear_directory_index():
+    """ Forgets every listed directory, next requests go to disk again.
+    """
+
+    _DIRECTORY_INDEX.clear()
+
+    return
+
+
+def has_tokens(pattern):
+    """ Checks if a file pattern has tiling or frame tokens.
+    Args:
+        pattern: String representing the file pattern.
+    Return:
+        True if pattern matches more than one file name, False otherwise.
+    """
+
+    return _TOKEN_REGEX.search(os.path.basename(pattern)) is not None
+
+
+def list_file_names(directory):
+    """ Lists file names of a directory, listing it on disk only if it changed
+    since the last time it was listed.
+    Args:
+        directory: String representing the directory full path.
+    Return:
+        List of string representing the file names, empty if directory does
+        not exist.
+    """
+
+    try:
+        mtime = os.stat(directory).st_mtime
+
+    except OSError:
+        return []
+
+    indexed = _DIRECTORY_INDEX.get(directory)
+
+    if indexed is not None and indexed[0] == mtime:
+        return indexed[1]
+
+    file_names = []
+
+    try:
+        if scandir is not None:
+            file_names = [entry.name for entry in scandir(directory) if not entry.is_dir()]
+
+        else:
+            file_names = [name for name in os.listdir(directory)
+                          if not os.path.isdir(os.path.join(directory, name))]
+
+    except OSError:
+        pass
+
+    _DIRECTORY_INDEX[directory] = (mtime, file_names)
+
+    return file_names
+
+
+def pattern_to_regex(file_name_pattern):
+    """ Composes the regular expression matching the files of a pattern.
+    Args:
+        file_name_pattern: String representing a file name with tokens.
+    Return:
+        Compiled regular expression.
+    """
+
+    regex = _REGEX_CACHE.get(file_name_pattern)
+
+    if regex is not None:
+        return regex
+
+    token_regexes = dict(_TOKEN_PATTERNS)
+    parts = []
+
+    for index, part in enumerate(_TOKEN_REGEX.split(file_name_pattern)):
+        # Odd parts are the tokens found by split.
+        if index % 2 == 0:
+            parts.append(re.escape(part))
+
+        elif part.startswith('#'):
+            parts.append(r'-?\d{{{},}}'.format(len(part)))
+
+        elif part.startswith('%'):
+            parts.append(r'-?\d+')
+
+        else:
+            parts.append(token_regexes[part.lower()])
+
+    # Windows file names are not case sensitive.
+    flags = re.IGNORECASE if os.name == 'nt' else 0
+    regex = re.compile('^{}$'.format(''.join(parts)), flags)
+
+    _REGEX_CACHE[file_name_pattern] = regex
+
+    return regex
+
+
+def resolve_pattern(pattern):
+    """ Gets every file on disk matching a texture pattern.
+    Args:
+        pattern: String representing the file full path, can have tokens in
+        its file name and environment variables (eg. %ADI_ROOT_FOLDER%).
+    Return:
+        Sorted list of string representing the full path of the files found.
+    """
+
+    if not pattern:
+        return []
+
+    pattern = root_paths.expand_path(pattern)
+    directory, file_name_pattern = os.path.split(pattern)
+    file_names = list_file_names(directory)
+
+    if not has_tokens(file_name_pattern):
+        # Windows file names are not case sensitive.
+        file_name = os.path.normcase(file_name_pattern)
+
+        if any(os.path.normcase(name) == file_name for name in file_names):
+            return [pattern]
+
+        return []
+
+    regex = pattern_to_regex(file_name_pattern)
+
+    return ['{}/{}'.format(directory, name) for name in sorted(file_names) if regex.match(name)]
+
+
+def resolve_patterns(patterns):
+    """ Gets every file on disk matching any of the texture patterns, listing
+    every directory only once.
+    Args:
+        patterns: List of string representing file patterns.
+    Return:
+        List of string representing the full path of the files found, in
+        the order of patterns and without repeating files.
+    """
+
+    found_paths = []
+    seen_paths = set()
+
+    for pattern in patterns:
+        for path in resolve_pattern(pattern):
+            if path not in seen_paths:
+                seen_paths.add(path)
+                found_paths.append(path)
+
+    return found_paths
@@ -1,8 +1,9 @@
-import os
 import logging
 import maya.cmds as cmds
 import pymel
 
+from common_utils import root_paths
+
 def on_reload_image_callback(path):
     """ Executes when reaload button is pressed when Reload button is 
     pressed in file node.
@@ -28,24 +29,15 @@ def reformat_path(path):
     """ Takes the provided path and reformat the path with
     addin ADI_ROOT_FOLDER variable to the name.
     """
-    var_name = '%ADI_ROOT_FOLDER%'
-    root_folder = os.path.expandvars(var_name)
-    root_folder_reformat = root_folder.replace('\\', '/')
-    size = len(root_folder_reformat)
-    root_folder_selected_file = path[:size]
-
-    logging.debug('{} this is the root folder.'.format(root_folder_reformat))
-    logging.debug('{} this is file path of selected file.'.format(root_folder_selected_file))
+    logging.debug('{} this is the root folder.'.format(root_paths.get_root_directory()))
+    logging.debug('{} this is file path of selected file.'.format(path))
 
-    if root_folder_reformat != root_folder_selected_file:
+    if not root_paths.is_in_structure(path):
         logging.debug('Not doing anything as the file is not in ADI_ROOT_FOLDER')
 
         return path
 
-    path_under_root = path[size:]
-    path_with_variable = '{}{}'.format(var_name, path_under_root)
-
-    return path_with_variable
+    return root_paths.to_root_token_path(path)
 
 def setting_logging():
     """ Setting logging to show information as required.
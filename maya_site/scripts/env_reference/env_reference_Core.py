@@ -2,6 +2,8 @@ import logging
 import os
 import maya.cmds as cmd
 
+from common_utils import root_paths
+
 from env_reference_UI import EnvReferenceUI
 
 
@@ -18,14 +20,7 @@ class EnvReferenceCore(EnvReferenceUI):
         file_name = os.path.basename(self.reference_file)
         name_space = os.path.splitext(file_name)[0]
 
-        var_name = '%ADI_ROOT_FOLDER%'
-        root_folder = os.path.expandvars(var_name)
-        root_folder_reformat = root_folder.replace('\\', '/')
-        size = len(root_folder_reformat)
-
-        root_folder_selected_file = self.reference_file[:size]
-
-        if root_folder_reformat != root_folder_selected_file:
+        if not root_paths.is_in_structure(self.reference_file):
 
             cmd.file(self.reference_file, r=True, namespace=name_space)
 
@@ -33,8 +28,7 @@ class EnvReferenceCore(EnvReferenceUI):
 
             return
 
-        path_under_root = self.reference_file[size:]
-        path_with_variable = '{}{}'.format(var_name, path_under_root)
+        path_with_variable = root_paths.to_root_token_path(self.reference_file)
 
         cmd.file(path_with_variable, r=True, namespace=name_space)
         logging.debug('Setting reference with Environment variable!')
@@ -1,7 +1,8 @@
 import logging
-import os
 from PySide2 import QtWidgets
 
+from common_utils import root_paths
+
 
 class EnvReferenceUI(QtWidgets.QDialog):
     
@@ -10,7 +11,7 @@ class EnvReferenceUI(QtWidgets.QDialog):
                 
     def choose_dir(self):
 
-        initial_dir = os.path.expandvars('%ADI_ROOT_FOLDER%')
+        initial_dir = root_paths.get_root_directory()
         logging.debug('Initial directory: {}'.format(initial_dir))
 
         self.reference_file, _ = QtWidgets.QFileDialog.getOpenFileName(self, 
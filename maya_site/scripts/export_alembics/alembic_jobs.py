@@ -0,0 +1,267 @@
+""" Alembic export jobs described without maya, so they can be handed to
+mayapy worker processes as a json file.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import json
+import os
+import sys
+
+
+## AbcExport job options, formatted with start, end, roots and file.
+# type: str
+ALEMBIC_OPTIONS = '-frameRange {} {} -stripNamespaces -uvWrite -worldSpace -writeUVSets -step 1 -dataFormat ogawa {} -file {}'
+
+## Longest sum of job strings passed to one AbcExport call, more jobs are
+# exported in another call.
+# type: int
+MAX_COMMAND_SIZE = 30000
+
+## Prefix of the lines workers print to report what they are doing.
+# type: str
+EVENT_PREFIX = 'ALEMBIC_EXPORT_EVENT '
+
+## Worker started a job.
+# type: str
+STARTED = 'started'
+
+## Worker evaluated a frame of a job.
+# type: str
+FRAME = 'frame'
+
+## Worker exported a job.
+# type: str
+DONE = 'done'
+
+## Worker could not export a job.
+# type: str
+FAILED = 'failed'
+
+
+class AlembicJob(object):
+    """ One alembic file to export, with the roots written into it.
+    """
+
+    def __init__(self, name, roots, output_path, start_time, end_time, camera=None, publish_directory=None, job_id=0,
+                 alembic_options=ALEMBIC_OPTIONS):
+
+        ## Name of the alembic file without extension (name_from_namespace).
+        # type: str
+        self.name = name
+
+        ## Nodes exported into the file.
+        # type: [str]
+        self.roots = list(roots)
+
+        ## Full path of the alembic file.
+        # type: str
+        self.output_path = output_path
+
+        ## First and last frame exported.
+        # type: float
+        self.start_time = start_time
+        self.end_time = end_time
+
+        ## Folder for cameras ('camera'), None for any other asset.
+        # type: str
+        self.camera = camera
+
+        ## Directory the file is published into, None to not publish.
+        # type: str
+        self.publish_directory = publish_directory
+
+        ## Identifier of the job in the export queue.
+        # type: int
+        self.job_id = job_id
+
+        ## AbcExport options formatted with start, end, roots and file (eg.
+        # of an export profile).
+        # type: str
+        self.alembic_options = alembic_options
+
+        ## Fingerprint of the scene inputs, recorded once exported. Only
+        # known by maya, workers do not need it.
+        # type: str
+        self.fingerprint = None
+
+    @property
+    def root_string(self):
+        """ Root part of the job string (eg. -root |pCube1 -root |pSphere1).
+        """
+
+        return ''.join(' -root {}'.format(root) for root in self.roots)
+
+    @property
+    def publish_path(self):
+        """ Full path of the published file, None if job is not published.
+        """
+
+        if self.publish_directory is None:
+            return None
+
+        file_name = os.path.basename(self.output_path)
+
+        if self.camera is None:
+            return os.path.join(self.publish_directory, file_name)
+
+        return os.path.join(self.publish_directory, self.camera, file_name)
+
+    def job_string(self, alembic_options=None, output_path=None):
+        """ Composes the AbcExport job string.
+        Args:
+            alembic_options: String representing the options to format,
+            alembic_options of the job if None.
+            output_path: String representing the file written, output_path
+            of the job if None (eg. a temporary file).
+        Return:
+            String representing the job string.
+        """
+
+        alembic_options = alembic_options or self.alembic_options
+
+        return alembic_options.format(self.start_time,
+                                      self.end_time,
+                                      self.root_string,
+                                      output_path or self.output_path)
+
+    def to_dict(self):
+
+        return {'name': self.name,
+                'roots': self.roots,
+                'output_path': self.output_path,
+                'start_time': self.start_time,
+                'end_time': self.end_time,
+                'camera': self.camera,
+                'publish_directory': self.publish_directory,
+                'job_id': self.job_id,
+                'alembic_options': self.alembic_options}
+
+    @classmethod
+    def from_dict(cls, data):
+
+        return cls(**data)
+
+
+def batch_jobs(jobs, get_job_string=None, max_size=MAX_COMMAND_SIZE):
+    """ Groups jobs into AbcExport calls, every call evaluates the frame
+    range once for all its jobs. Jobs writing the same file go in different
+    calls, in order, so last one wins like exporting them one by one.
+    Args:
+        jobs: List of AlembicJob.
+        get_job_string: Function composing the job string of a job,
+        AlembicJob.job_string if None.
+        max_size: Integer representing the longest sum of job strings of a call.
+    Return:
+        List of list of tuples (AlembicJob, job string), one list per call.
+    """
+
+    if get_job_string is None:
+        get_job_string = lambda job: job.job_string()
+
+    batches = []
+    batch = []
+    batch_size = 0
+    batch_paths = set()
+
+    for job in jobs:
+        job_string = get_job_string(job)
+
+        if batch and (batch_size + len(job_string) > max_size or job.output_path in batch_paths):
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+            batch_paths = set()
+
+        batch.append((job, job_string))
+        batch_size += len(job_string)
+        batch_paths.add(job.output_path)
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def write_jobs(jobs_path, scene_path, jobs, options=None):
+    """ Writes the jobs a worker exports from a maya file.
+    Args:
+        jobs_path: String representing the json file full path.
+        scene_path: String representing the maya file to open.
+        jobs: List of AlembicJob.
+        options: Dictionary with options of the worker (eg. scratch_directory,
+        bytes_per_second).
+    """
+
+    with open(jobs_path, 'w') as jobs_file:
+        json.dump({'scene': scene_path,
+                   'options': options or {},
+                   'jobs': [job.to_dict() for job in jobs]}, jobs_file, indent=2)
+
+    return
+
+
+def read_jobs(jobs_path):
+    """ Reads the jobs written by write_jobs.
+    Args:
+        jobs_path: String representing the json file full path.
+    Return:
+        Tuple (maya file full path, list of AlembicJob, dictionary of options).
+    """
+
+    with open(jobs_path, 'r') as jobs_file:
+        data = json.load(jobs_file)
+
+    return data['scene'], [AlembicJob.from_dict(job) for job in data['jobs']], data.get('options', {})
+
+
+def format_event(event, job_id, **values):
+    """ Composes the line a worker prints to report an event.
+    Args:
+        event: String representing the event (STARTED, FRAME, DONE, FAILED).
+        job_id: Integer representing the job.
+        values: Extra values of the event.
+    Return:
+        String representing the line, without line break.
+    """
+
+    values.update(event=event, job_id=job_id)
+
+    return EVENT_PREFIX + json.dumps(values)
+
+
+def parse_event(line):
+    """ Reads the event of a line printed by a worker.
+    Args:
+        line: String representing the line.
+    Return:
+        Dictionary with event, job_id and extra values, None if line is not
+        an event (eg. maya warnings).
+    """
+
+    if not line.startswith(EVENT_PREFIX):
+        return None
+
+    try:
+        return json.loads(line[len(EVENT_PREFIX):])
+
+    except ValueError:
+        return None
+
+
+def get_mayapy_executable():
+    """ Gets mayapy of the running maya, from maya executable or MAYA_LOCATION.
+    Return:
+        String representing mayapy full path.
+    """
+
+    executable_name = 'mayapy.exe' if os.name == 'nt' else 'mayapy'
+
+    for bin_directory in (os.path.dirname(sys.executable),
+                          os.path.join(os.environ.get('MAYA_LOCATION', ''), 'bin')):
+        mayapy_path = os.path.join(bin_directory, executable_name)
+
+        if os.path.isfile(mayapy_path):
+            return mayapy_path.replace('\\', '/')
+
+    return executable_name
@@ -14,13 +14,12 @@ class CustomMsgBoxUI(QtWidgets.QDialog):
     """ Custom msg box with option to open destination directory.
     """
 
-    def __init__(self, path, parent=None):
+    def __init__(self, path, summary='', parent=None):
         super(CustomMsgBoxUI, self).__init__(parent=parent)
 
         self.path = path
 
         self.setWindowTitle('Information')
-        self.setFixedHeight(100)
 
         main_layout = QtWidgets.QVBoxLayout()
         self.setLayout(main_layout)
@@ -30,6 +29,19 @@ class CustomMsgBoxUI(QtWidgets.QDialog):
 
         main_layout.addWidget(self.msg_label)
 
+        # Timing summary of the export.
+        ########################################################################
+        if summary:
+            self.summary_plainTextEdit = QtWidgets.QPlainTextEdit(summary)
+            self.summary_plainTextEdit.setReadOnly(True)
+            self.summary_plainTextEdit.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+            self.summary_plainTextEdit.setMinimumWidth(450)
+
+            main_layout.addWidget(self.summary_plainTextEdit)
+
+        else:
+            self.setFixedHeight(100)
+
         # Create button box
         ########################################################################
         self.show_in_folder_button = QtWidgets.QPushButton('Show in Folder')
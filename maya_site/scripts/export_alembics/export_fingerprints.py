@@ -0,0 +1,188 @@
+""" Fingerprints of what an alembic is exported from, so alembics which scene
+inputs did not change since their last export can be skipped.
+
+A fingerprint hashes the animation curves driving the roots (their
+hierarchy and upstream rig), the world matrices of the roots hierarchy at
+the first exported frame, the referenced files of the roots and the
+AbcExport job string (frame range and options). Nothing is read at the
+current frame, so moving the time slider does not change a fingerprint.
+Changes not coming from those (eg. a mesh edited by hand without keys) are
+not detected, exports can be forced from the tool.
+
+Fingerprints are kept per alembic file name in a json file next to the
+alembics.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import hashlib
+import json
+import os
+
+import publish_strategies
+
+
+## File fingerprints are written into, in the alembics directory.
+# type: str
+FINGERPRINTS_FILE_NAME = 'alembic_export_fingerprints.json'
+
+## Key values hashed of every animation curve.
+# type: []
+_KEYFRAME_QUERIES = [{'timeChange': True},
+                     {'valueChange': True}]
+
+## Tangent values hashed of every animation curve.
+# type: []
+_TANGENT_QUERIES = [{'inAngle': True},
+                    {'outAngle': True},
+                    {'inWeight': True},
+                    {'outWeight': True},
+                    {'inTangentType': True},
+                    {'outTangentType': True}]
+
+
+def _update(digest, value):
+    """ Adds a value to a hash, converted to its repr.
+    """
+
+    digest.update(repr(value).encode('utf-8'))
+
+    return
+
+
+def get_scene_hash(roots, start_time):
+    """ Hashes the scene inputs of roots, requires maya.
+    Args:
+        roots: List of string representing the exported nodes.
+        start_time: Float representing the first exported frame, matrices
+        are evaluated at it.
+    Return:
+        String representing the hexadecimal hash.
+    """
+
+    import maya.cmds as cmds
+
+    nodes = cmds.ls(roots, long=True) or []
+    nodes.extend(cmds.listRelatives(roots, allDescendents=True, fullPath=True) or [])
+
+    digest = hashlib.sha1()
+
+    # Curves driving the rig are upstream of the roots hierarchy.
+    curves = sorted(set(cmds.ls(cmds.listHistory(nodes) or [], type='animCurve') or []))
+
+    for curve in curves:
+        _update(digest, curve)
+        _update(digest, sorted(cmds.listConnections(curve, source=False, destination=True, plugs=True) or []))
+
+        for query in _KEYFRAME_QUERIES:
+            _update(digest, cmds.keyframe(curve, query=True, **query))
+
+        for query in _TANGENT_QUERIES:
+            _update(digest, cmds.keyTangent(curve, query=True, **query))
+
+    # Unkeyed transforms do not have curves.
+    for node in sorted(cmds.ls(nodes, type='transform', long=True) or []):
+        _update(digest, node)
+        _update(digest, cmds.getAttr('{}.worldMatrix[0]'.format(node), time=start_time))
+
+    for root in sorted(roots):
+        if cmds.referenceQuery(root, isNodeReferenced=True):
+            _update(digest, cmds.referenceQuery(root, filename=True))
+
+    return digest.hexdigest()
+
+
+def compose_fingerprint(scene_hash, job):
+    """ Combines the scene inputs of a job with what is exported.
+    Args:
+        scene_hash: String representing the hash of get_scene_hash.
+        job: AlembicJob, its job string is hashed with the file name only so
+        directories and temporary names do not change it.
+    Return:
+        String representing the hexadecimal fingerprint.
+    """
+
+    digest = hashlib.sha1()
+    _update(digest, scene_hash)
+    _update(digest, job.job_string(output_path=os.path.basename(job.output_path)))
+
+    return digest.hexdigest()
+
+
+def get_fingerprints_path(output_path):
+
+    return os.path.join(os.path.dirname(output_path), FINGERPRINTS_FILE_NAME).replace('\\', '/')
+
+
+def read_fingerprints(fingerprints_path):
+    """ Reads fingerprints of alembics.
+    Args:
+        fingerprints_path: String representing the json file full path.
+    Return:
+        Dictionary with the fingerprint by alembic file name, empty if the
+        file does not exist or can not be read.
+    """
+
+    try:
+        with open(fingerprints_path, 'r') as fingerprints_file:
+            return json.load(fingerprints_file)
+
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def get_fingerprint(output_path):
+    """ Gets the fingerprint of the last export of an alembic.
+    Args:
+        output_path: String representing the alembic full path.
+    Return:
+        String representing the fingerprint, None if unknown.
+    """
+
+    return read_fingerprints(get_fingerprints_path(output_path)).get(os.path.basename(output_path))
+
+
+def record_fingerprint(output_path, fingerprint):
+    """ Records the fingerprint of an exported alembic, through a temporary
+    file renamed at the end.
+    Args:
+        output_path: String representing the alembic full path.
+        fingerprint: String representing its fingerprint.
+    """
+
+    fingerprints_path = get_fingerprints_path(output_path)
+
+    fingerprints = read_fingerprints(fingerprints_path)
+    fingerprints[os.path.basename(output_path)] = fingerprint
+
+    temp_path = publish_strategies.temp_path_for(fingerprints_path)
+
+    try:
+        with open(temp_path, 'w') as fingerprints_file:
+            json.dump(fingerprints, fingerprints_file, indent=2, sort_keys=True)
+
+        publish_strategies.commit_file(temp_path, fingerprints_path)
+
+    finally:
+        publish_strategies.remove_file(temp_path)
+
+    return
+
+
+def is_unchanged(job, fingerprint):
+    """ Checks if a job would export the same alembic that exists already.
+    Args:
+        job: AlembicJob to export.
+        fingerprint: String representing its current fingerprint.
+    Return:
+        True if its last export has the same fingerprint and its files
+        exist, False otherwise.
+    """
+
+    if not os.path.isfile(job.output_path):
+        return False
+
+    if job.publish_path is not None and not os.path.isfile(job.publish_path):
+        return False
+
+    return get_fingerprint(job.output_path) == fingerprint
@@ -0,0 +1,171 @@
+""" Named sets of AbcExport options, so every step exports only what it needs.
+Lighter profiles write smaller alembics, faster to export and to load.
+
+Profiles:
+    layout-light: transforms and geometry only, no UVs, normals or face sets.
+    anim: UVs and UV sets, the options every export used before profiles.
+    cfx-highres: UVs, normals, face sets, color sets and visibility, two
+    samples per frame for motion blur, user attributes prefixed abc_.
+    camera-only: only selected cameras are exported, no geometry data. No
+    step defaults to it, tracking scenes also hold geometry to export.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import collections
+
+
+## Profile of steps without a default profile.
+# type: str
+DEFAULT_PROFILE = 'anim'
+
+## Default profile of every step of the pipeline (see _STEPS of the tool).
+# type: {str: str}
+STEP_PROFILES = {'mdl': 'anim',
+                 'mcp': 'anim',
+                 'rig': 'anim',
+                 'grm': 'cfx-highres',
+                 'tex': 'anim',
+                 'ldv': 'anim',
+                 'trk': 'anim',
+                 'lyt': 'layout-light',
+                 'anm': 'anim',
+                 'cfx': 'cfx-highres',
+                 'lgt': 'anim',
+                 'crw': 'anim',
+                 'sfx': 'cfx-highres',
+                 'mtp': 'anim'}
+
+
+class ExportProfile(object):
+    """ AbcExport options of a kind of alembic.
+    """
+
+    def __init__(self, name, description, uvs=True, normals=True, face_sets=False, color_sets=False,
+                 visibility=False, sub_steps=1, attributes=None, attribute_prefixes=None, cameras_only=False):
+
+        ## Name shown in the tool.
+        # type: str
+        self.name = name
+
+        ## What the profile is meant for, shown as tooltip.
+        # type: str
+        self.description = description
+
+        ## Writes UVs and UV sets.
+        # type: bool
+        self.uvs = uvs
+
+        ## Writes normals of meshes.
+        # type: bool
+        self.normals = normals
+
+        ## Writes face sets (shading groups).
+        # type: bool
+        self.face_sets = face_sets
+
+        ## Writes color sets.
+        # type: bool
+        self.color_sets = color_sets
+
+        ## Writes visibility.
+        # type: bool
+        self.visibility = visibility
+
+        ## Samples written per frame.
+        # type: int
+        self.sub_steps = sub_steps
+
+        ## User attributes written, by name.
+        # type: [str]
+        self.attributes = list(attributes or [])
+
+        ## User attributes written, by prefix.
+        # type: [str]
+        self.attribute_prefixes = list(attribute_prefixes or [])
+
+        ## Exports only selected cameras, other selected nodes are left out.
+        # type: bool
+        self.cameras_only = cameras_only
+
+    @property
+    def alembic_options(self):
+        """ AbcExport job options, formatted with start, end, roots and file
+        like alembic_jobs.ALEMBIC_OPTIONS.
+        """
+
+        flags = ['-frameRange {} {}', '-stripNamespaces']
+
+        if self.uvs:
+            flags.append('-uvWrite')
+
+        flags.append('-worldSpace')
+
+        if self.uvs:
+            flags.append('-writeUVSets')
+
+        if not self.normals:
+            flags.append('-noNormals')
+
+        if self.face_sets:
+            flags.append('-writeFaceSets')
+
+        if self.color_sets:
+            flags.append('-writeColorSets')
+
+        if self.visibility:
+            flags.append('-writeVisibility')
+
+        flags.extend('-attr {}'.format(attribute) for attribute in self.attributes)
+        flags.extend('-attrPrefix {}'.format(prefix) for prefix in self.attribute_prefixes)
+
+        flags.append('-step {:g}'.format(1.0 / max(self.sub_steps, 1)))
+        flags.append('-dataFormat ogawa {} -file {}')
+
+        return ' '.join(flags)
+
+
+## Every profile by name, in the order shown in the tool.
+# type: OrderedDict
+PROFILES = collections.OrderedDict((profile.name, profile) for profile in [
+    ExportProfile('layout-light',
+                  'Transforms and geometry only, for layout and blocking.',
+                  uvs=False,
+                  normals=False),
+    ExportProfile('anim',
+                  'UVs and UV sets, for animation caches.'),
+    ExportProfile('cfx-highres',
+                  'UVs, normals, face sets, color sets and visibility, two samples per frame, '
+                  'attributes prefixed abc_. For cfx and fx caches rendered with motion blur.',
+                  face_sets=True,
+                  color_sets=True,
+                  visibility=True,
+                  sub_steps=2,
+                  attribute_prefixes=['abc_']),
+    ExportProfile('camera-only',
+                  'Only selected cameras, no geometry data. For tracking and matchmove.',
+                  uvs=False,
+                  normals=False,
+                  cameras_only=True)])
+
+
+def get_profile(name):
+    """ Gets a profile by name, the default profile if it does not exist.
+    Args:
+        name: String representing the profile name.
+    Return:
+        ExportProfile.
+    """
+
+    return PROFILES.get(name, PROFILES[DEFAULT_PROFILE])
+
+
+def get_step_profile(step):
+    """ Gets the default profile name of a step.
+    Args:
+        step: String representing the step (eg. 'anm'), None if unknown.
+    Return:
+        String representing the profile name.
+    """
+
+    return STEP_PROFILES.get(step, DEFAULT_PROFILE)
@@ -0,0 +1,240 @@
+""" Window showing progress of alembic jobs exported in background.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+import os
+import sys
+import subprocess
+
+from PySide2 import QtWidgets
+from PySide2 import QtCore
+
+import export_queue
+import export_timings
+
+
+## Progress window shared by every export of the maya session.
+# type: []
+_PROGRESS_WINDOW = [None]
+
+
+class ExportProgressUI(QtWidgets.QDialog):
+    """ Lists every job of the export queue with its progress.
+    """
+
+    ## Columns of the jobs tree.
+    # type: []
+    _COLUMNS = ['Alembic', 'Status', 'Progress', 'Message']
+
+    ## Status of alembics skipped as unchanged.
+    # type: str
+    _SKIPPED = 'Skipped'
+
+    def __init__(self, queue, parent=None):
+        super(ExportProgressUI, self).__init__(parent=parent)
+
+        ## Queue which jobs are shown.
+        # type: ExportQueue
+        self.queue = queue
+
+        ## Tree item of every job by id.
+        # type: {int: QTreeWidgetItem}
+        self.job_items = {}
+
+        ## Progress bar of every job by id.
+        # type: {int: QProgressBar}
+        self.progress_bars = {}
+
+        self.setWindowTitle('Alembic export progress')
+        self.resize(700, 350)
+
+        main_layout = QtWidgets.QVBoxLayout()
+        self.setLayout(main_layout)
+
+        ########################################################################
+        # Add widgets
+        ########################################################################
+        self.jobs_treeWidget = QtWidgets.QTreeWidget()
+        self.jobs_treeWidget.setHeaderLabels(self._COLUMNS)
+        self.jobs_treeWidget.setRootIsDecorated(False)
+        self.jobs_treeWidget.setColumnWidth(0, 220)
+        main_layout.addWidget(self.jobs_treeWidget)
+
+        self.log_plainTextEdit = QtWidgets.QPlainTextEdit()
+        self.log_plainTextEdit.setReadOnly(True)
+        self.log_plainTextEdit.setMaximumBlockCount(5000)
+        self.log_plainTextEdit.setVisible(False)
+        main_layout.addWidget(self.log_plainTextEdit)
+
+        self.summary_label = QtWidgets.QLabel()
+        self.summary_label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+        main_layout.addWidget(self.summary_label)
+
+        ########################################################################
+        # Create buttons for UI
+        ########################################################################
+        self.progress_buttonBox = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Close)
+
+        self.show_in_folder_button = self.progress_buttonBox.addButton('Show in Folder',
+                                                                       QtWidgets.QDialogButtonBox.ActionRole)
+        self.show_log_button = self.progress_buttonBox.addButton('Show Log',
+                                                                 QtWidgets.QDialogButtonBox.ActionRole)
+        self.stop_button = self.progress_buttonBox.addButton('Stop',
+                                                             QtWidgets.QDialogButtonBox.ActionRole)
+
+        main_layout.addWidget(self.progress_buttonBox)
+
+        for job_id in self.queue.jobs:
+            self.add_job_item(job_id)
+
+        ########################################################################
+        # Connect signals
+        ########################################################################
+        self.queue.jobs_added.connect(self.on_jobs_added)
+        self.queue.job_started.connect(self.on_job_started)
+        self.queue.job_progress.connect(self.on_job_progress)
+        self.queue.job_finished.connect(self.on_job_finished)
+        self.queue.log_received.connect(self.log_plainTextEdit.appendPlainText)
+        self.queue.finished.connect(self.on_queue_finished)
+
+        self.progress_buttonBox.rejected.connect(self.close)
+        self.show_in_folder_button.clicked.connect(self.on_show_in_folder)
+        self.show_log_button.clicked.connect(self.on_show_log)
+        self.stop_button.clicked.connect(self.queue.stop)
+
+    def add_job_item(self, job_id):
+        """ Adds a row for a job of the queue.
+        Args:
+            job_id: Integer representing the job.
+        """
+
+        job = self.queue.jobs[job_id]
+
+        item = QtWidgets.QTreeWidgetItem([job.name, self.queue.statuses[job_id], '', ''])
+        item.setToolTip(0, job.output_path)
+        self.jobs_treeWidget.addTopLevelItem(item)
+
+        progress_bar = QtWidgets.QProgressBar()
+        progress_bar.setRange(0, 100)
+        progress_bar.setValue(100 if self.queue.statuses[job_id] == export_queue.DONE else 0)
+        self.jobs_treeWidget.setItemWidget(item, 2, progress_bar)
+
+        self.job_items[job_id] = item
+        self.progress_bars[job_id] = progress_bar
+
+        return
+
+    def add_skipped_items(self, names):
+        """ Adds a row for every alembic skipped, unchanged since its last
+        export, they are not jobs of the queue.
+        Args:
+            names: List of string representing the alembic names.
+        """
+
+        for name in names:
+            item = QtWidgets.QTreeWidgetItem([name, self._SKIPPED, '', 'Unchanged since last export'])
+            self.jobs_treeWidget.addTopLevelItem(item)
+
+        return
+
+    def on_jobs_added(self, job_ids):
+        """ Executes when jobs are added to the queue.
+        """
+
+        for job_id in job_ids:
+            self.add_job_item(job_id)
+
+        return
+
+    def on_job_started(self, job_id):
+
+        self.job_items[job_id].setText(1, export_queue.RUNNING)
+
+        return
+
+    def on_job_progress(self, job_id, percentage):
+
+        self.progress_bars[job_id].setValue(percentage)
+
+        return
+
+    def on_job_finished(self, job_id, succeeded, message):
+        """ Executes when a job is exported or failed.
+        Args:
+            job_id: Integer representing the job.
+            succeeded: True if the job was exported.
+            message: String representing the result.
+        """
+
+        item = self.job_items[job_id]
+        item.setText(1, export_queue.DONE if succeeded else export_queue.FAILED)
+        item.setText(3, message)
+        item.setToolTip(3, message)
+
+        if succeeded:
+            self.progress_bars[job_id].setValue(100)
+
+        return
+
+    def on_queue_finished(self):
+        """ Executes when every job finished, shows totals of the timings.
+        """
+
+        timings = [self.queue.timings[job_id] for job_id in self.job_items if job_id in self.queue.timings]
+
+        if not timings:
+            return
+
+        # Files are listed in the jobs tree, only totals are shown.
+        self.summary_label.setText(export_timings.summarize_totals(timings))
+
+        return
+
+    def on_show_in_folder(self):
+        """ Opens the directory of the selected job, last job if none.
+        """
+
+        items = self.jobs_treeWidget.selectedItems()
+        job_ids = [job_id for job_id, item in self.job_items.items() if item in items] or list(self.job_items)
+
+        if not job_ids:
+            return
+
+        path_reformat = os.path.dirname(self.queue.jobs[job_ids[-1]].output_path).replace('/', '\\')
+
+        subprocess.Popen(r'explorer "{}"'.format(path_reformat))
+
+        return
+
+    def on_show_log(self):
+
+        self.log_plainTextEdit.setVisible(not self.log_plainTextEdit.isVisible())
+        self.show_log_button.setText('Hide Log' if self.log_plainTextEdit.isVisible() else 'Show Log')
+
+        return
+
+
+def show_export_progress(queue, parent=None):
+    """ Shows the progress window, created the first time.
+    Args:
+        queue: ExportQueue which jobs are shown.
+        parent: Widget parent of the window.
+    Return:
+        ExportProgressUI.
+    """
+
+    if _PROGRESS_WINDOW[0] is None:
+        _PROGRESS_WINDOW[0] = ExportProgressUI(queue, parent=parent)
+        _PROGRESS_WINDOW[0].setWindowFlags(QtCore.Qt.Window)
+
+    _PROGRESS_WINDOW[0].show()
+    _PROGRESS_WINDOW[0].raise_()
+
+    return _PROGRESS_WINDOW[0]
+
+
+if __name__ == '__main__':
+    app = QtWidgets.QApplication(sys.argv)
+    w = ExportProgressUI(export_queue.ExportQueue())
+    w.show()
+    app.exec_()
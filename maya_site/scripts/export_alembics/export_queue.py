@@ -0,0 +1,737 @@
+""" Queue of alembic exports run by mayapy worker processes, so artists keep
+working in maya while exporting. Jobs can be sharded across several workers,
+new workers only start while there is free memory for them (psutil), and the
+output of every worker is aggregated into one log.
+
+Long frame ranges can be split into frame chunks exported by several workers
+at the same time, chunks of a job are stitched when all of them are exported.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import collections
+import datetime
+import os
+import shutil
+import tempfile
+import time
+
+from PySide2 import QtCore
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+import alembic_jobs
+import export_fingerprints
+import export_timings
+import frame_chunks
+
+
+## Job waits for a worker.
+# type: str
+QUEUED = 'Queued'
+
+## Job is being exported.
+# type: str
+RUNNING = 'Running'
+
+## Job was exported.
+# type: str
+DONE = 'Done'
+
+## Job could not be exported.
+# type: str
+FAILED = 'Failed'
+
+## Script run by mayapy workers.
+# type: str
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'export_worker.py').replace('\\', '/')
+
+## Script stitching frame chunks.
+# type: str
+MERGE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'merge_chunks.py').replace('\\', '/')
+
+## Memory left free for maya and the system when starting workers.
+# type: int
+MEMORY_RESERVE = 2 * 1024 ** 3
+
+## Memory a worker is expected to use until a running one is measured.
+# type: int
+DEFAULT_WORKER_MEMORY = 4 * 1024 ** 3
+
+## Milliseconds waited before checking free memory again.
+# type: int
+THROTTLE_INTERVAL = 5000
+
+## A batch of jobs waiting for a worker or being exported by one.
+# type: namedtuple
+ExportBatch = collections.namedtuple('ExportBatch',
+                                     ['scene_path', 'jobs', 'log_path', 'timings_path', 'options', 'script'])
+
+## Queue shared by every export of the maya session.
+# type: []
+_EXPORT_QUEUE = [None]
+
+
+def shard_jobs(jobs, shards):
+    """ Splits jobs into balanced shards, keeping jobs order inside a shard.
+    Jobs writing the same output path go into the same shard, so they are
+    exported one after the other and the last one wins, as exporting serially.
+    Args:
+        jobs: List of AlembicJob.
+        shards: Integer representing the amount of shards.
+    Return:
+        List of list of AlembicJob, without empty shards.
+    """
+
+    groups = collections.OrderedDict()
+
+    for index, job in enumerate(jobs):
+        groups.setdefault(job.output_path, []).append((index, job))
+
+    shards = max(1, min(shards, len(groups)))
+    sharded = [[] for _ in range(shards)]
+
+    # Every group goes into the shard with fewest jobs.
+    for group in groups.values():
+        min(sharded, key=len).extend(group)
+
+    return [[job for _, job in sorted(shard, key=lambda indexed_job: indexed_job[0])] for shard in sharded]
+
+
+def get_available_memory():
+    """ Gets memory available to start new processes.
+    Return:
+        Integer representing bytes, None if psutil is not available.
+    """
+
+    if psutil is None:
+        return None
+
+    return psutil.virtual_memory().available
+
+
+def get_process_memory(pid):
+    """ Gets memory used by a process and its children (eg. mayapy wrapper).
+    Args:
+        pid: Integer representing the process id.
+    Return:
+        Integer representing bytes, 0 if it can not be read.
+    """
+
+    if psutil is None or not pid:
+        return 0
+
+    try:
+        process = psutil.Process(pid)
+        processes = [process] + process.children(recursive=True)
+
+        return sum(child.memory_info().rss for child in processes)
+
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return 0
+
+
+class ExportQueue(QtCore.QObject):
+    """ Runs batches of alembic jobs in mayapy processes, up to max_processes
+    at the same time.
+    """
+
+    ## Emitted with the ids of jobs added to the queue.
+    # type: Signal
+    jobs_added = QtCore.Signal(list)
+
+    ## Emitted with the id of a job a worker started.
+    # type: Signal
+    job_started = QtCore.Signal(int)
+
+    ## Emitted with the id of a job and the percentage of frames evaluated.
+    # type: Signal
+    job_progress = QtCore.Signal(int, int)
+
+    ## Emitted with the id of a job, True if it was exported and a message.
+    # type: Signal
+    job_finished = QtCore.Signal(int, bool, str)
+
+    ## Emitted with every log line, prefixed with the worker name.
+    # type: Signal
+    log_received = QtCore.Signal(str)
+
+    ## Emitted when every job in the queue finished.
+    # type: Signal
+    finished = QtCore.Signal()
+
+    def __init__(self, max_processes=1, parent=None):
+        super(ExportQueue, self).__init__(parent)
+
+        ## Amount of mayapy processes exporting at the same time.
+        # type: int
+        self.max_processes = max_processes
+
+        ## Every job added by id.
+        # type: {int: AlembicJob}
+        self.jobs = collections.OrderedDict()
+
+        ## Status of every job by id.
+        # type: {int: str}
+        self.statuses = {}
+
+        ## Timing of every finished job by id.
+        # type: {int: JobTiming}
+        self.timings = {}
+
+        ## Frame chunk jobs by id, exported but not listed as jobs.
+        # type: {int: AlembicJob}
+        self.chunk_jobs = {}
+
+        ## Chunk ids of every job exported in frame chunks.
+        # type: {int: [int]}
+        self._chunks = {}
+
+        ## Job id of every chunk id.
+        # type: {int: int}
+        self._chunk_parents = {}
+
+        ## Percentage exported of every chunk id.
+        # type: {int: int}
+        self._chunk_progress = {}
+
+        ## Time the first chunk of a job started, by job id.
+        # type: {int: float}
+        self._chunk_start_times = {}
+
+        ## Batches waiting for a process.
+        # type: deque
+        self._pending = collections.deque()
+
+        ## Running batches, process: (ExportBatch, jobs directory, worker name).
+        # type: {QProcess: tuple}
+        self._processes = {}
+
+        ## Highest memory measured of a worker.
+        # type: int
+        self._worker_memory = 0
+
+        self._next_id = 1
+        self._worker_count = 0
+        self._buffers = {}
+
+        self._throttle_timer = QtCore.QTimer(self)
+        self._throttle_timer.setSingleShot(True)
+        self._throttle_timer.timeout.connect(self.start_next)
+
+    def add_jobs(self, scene_path, jobs, log_path=None, timings_path=None, options=None, chunks=1):
+        """ Queues jobs exported from a saved maya file, sharded across
+        max_processes workers, or split into frame chunks.
+        Args:
+            scene_path: String representing the maya file full path.
+            jobs: List of AlembicJob.
+            log_path: String representing the file the output of workers is
+            aggregated into, None to not write it.
+            timings_path: String representing the json lines file timings of
+            jobs are appended to, None to not write them.
+            options: Dictionary with options of the workers (eg.
+            scratch_directory, bytes_per_second).
+            chunks: Integer representing the frame chunks every job is split
+            into, 1 to export whole frame ranges.
+        Return:
+            List of integer representing the ids of the jobs.
+        """
+
+        job_ids = []
+
+        for job in jobs:
+            job.job_id = self.get_next_id()
+
+            self.jobs[job.job_id] = job
+            self.statuses[job.job_id] = QUEUED
+            job_ids.append(job.job_id)
+
+        stitcher_path = None
+
+        if chunks > 1:
+            stitcher_path = frame_chunks.find_stitcher()
+
+            if stitcher_path is None:
+                self.write_log(log_path, 'queue', 'abcstitcher was not found, exporting whole frame ranges. '
+                                                  'Set {} to its full path.'.format(frame_chunks.STITCHER_VARIABLE))
+
+        if stitcher_path is None:
+            for shard in shard_jobs(list(jobs), self.max_processes):
+                self._pending.append(ExportBatch(scene_path, shard, log_path, timings_path, options, WORKER_SCRIPT))
+
+        else:
+            self.add_chunk_batches(scene_path, jobs, log_path, timings_path, options, chunks, stitcher_path)
+
+        self.jobs_added.emit(job_ids)
+
+        self.start_next()
+
+        return job_ids
+
+    def get_next_id(self):
+
+        self._next_id += 1
+
+        return self._next_id - 1
+
+    def add_chunk_batches(self, scene_path, jobs, log_path, timings_path, options, chunks, stitcher_path):
+        """ Splits frame ranges of jobs into chunks, a batch per chunk index
+        exports that chunk of every job. Jobs too short to split are exported
+        whole, sharded into max_processes batches like jobs without chunks.
+        Args:
+            scene_path: String representing the maya file full path.
+            jobs: List of AlembicJob with ids.
+            log_path: String representing the log file.
+            timings_path: String representing the timings file.
+            options: Dictionary with options of the workers.
+            chunks: Integer representing the frame chunks wanted.
+            stitcher_path: String representing abcstitcher full path.
+        """
+
+        options = options or {}
+        chunk_batches = [[] for _ in range(chunks)]
+        whole_jobs = []
+
+        for job in jobs:
+            frame_ranges = frame_chunks.split_frame_range(job.start_time, job.end_time, chunks)
+
+            if len(frame_ranges) == 1:
+                whole_jobs.append(job)
+
+                continue
+
+            chunk_directory = frame_chunks.get_chunk_directory(job.output_path, options.get('scratch_directory'))
+            chunk_jobs = frame_chunks.create_chunk_jobs(job, frame_ranges, chunk_directory)
+
+            for index, chunk_job in enumerate(chunk_jobs):
+                chunk_job.job_id = self.get_next_id()
+
+                self.chunk_jobs[chunk_job.job_id] = chunk_job
+                self.statuses[chunk_job.job_id] = QUEUED
+                self._chunk_parents[chunk_job.job_id] = job.job_id
+                self._chunk_progress[chunk_job.job_id] = 0
+
+                chunk_batches[index].append(chunk_job)
+
+            self._chunks[job.job_id] = [chunk_job.job_id for chunk_job in chunk_jobs]
+
+        if whole_jobs:
+            for shard in shard_jobs(whole_jobs, self.max_processes):
+                self._pending.append(ExportBatch(scene_path, shard, log_path, timings_path, options, WORKER_SCRIPT))
+
+        # Chunks are written to scratch disk already, merging publishes them.
+        chunk_options = dict((key, value) for key, value in options.items()
+                             if key not in ('scratch_directory', 'bytes_per_second'))
+        chunk_options['stitcher'] = stitcher_path
+
+        for chunk_batch in chunk_batches:
+            if chunk_batch:
+                self._pending.append(ExportBatch(scene_path, chunk_batch, log_path, timings_path, chunk_options,
+                                                 WORKER_SCRIPT))
+
+        return
+
+    def is_running(self):
+
+        return bool(self._pending or self._processes)
+
+    def has_memory_for_worker(self):
+        """ Checks if there is free memory to start another worker, always
+        True for the first worker or without psutil.
+        Return:
+            True if a worker can start, False otherwise.
+        """
+
+        if not self._processes:
+            return True
+
+        available_memory = get_available_memory()
+
+        if available_memory is None:
+            return True
+
+        for process in self._processes:
+            self._worker_memory = max(self._worker_memory, get_process_memory(process.processId()))
+
+        worker_memory = self._worker_memory or DEFAULT_WORKER_MEMORY
+
+        return available_memory - worker_memory > MEMORY_RESERVE
+
+    def start_next(self):
+        """ Starts pending batches while there are free processes and memory,
+        checks again later if memory is low.
+        """
+
+        while self._pending and len(self._processes) < self.max_processes:
+            if not self.has_memory_for_worker():
+                if not self._throttle_timer.isActive():
+                    self.write_log(self._pending[0].log_path, 'queue', 'Waiting for free memory to start a worker.')
+                    self._throttle_timer.start(THROTTLE_INTERVAL)
+
+                break
+
+            self.start_batch(self._pending.popleft())
+
+        return
+
+    def start_batch(self, batch):
+        """ Starts a mayapy process exporting a batch of jobs.
+        Args:
+            batch: ExportBatch to export.
+        """
+
+        jobs_directory = tempfile.mkdtemp(prefix='alembic_export_')
+        jobs_path = os.path.join(jobs_directory, 'jobs.json').replace('\\', '/')
+
+        alembic_jobs.write_jobs(jobs_path, batch.scene_path, batch.jobs, batch.options)
+
+        self._worker_count += 1
+        worker_name = 'worker {}'.format(self._worker_count)
+
+        process = QtCore.QProcess(self)
+        process.setProcessChannelMode(QtCore.QProcess.MergedChannels)
+        process.readyReadStandardOutput.connect(lambda process=process: self.on_output(process))
+        process.finished.connect(lambda exit_code, exit_status, process=process: self.on_process_finished(process))
+
+        self._processes[process] = (batch, jobs_directory, worker_name)
+        self._buffers[process] = b''
+
+        self.write_log(batch.log_path, worker_name, 'Exporting {} from {}'.format(', '.join(job.name for job in batch.jobs),
+                                                                               batch.scene_path))
+
+        process.start(alembic_jobs.get_mayapy_executable(), [batch.script, '--jobs', jobs_path])
+
+        # A process that does not start never emits finished.
+        if not process.waitForStarted():
+            self.on_process_finished(process, 'Could not start mayapy: {}'.format(process.errorString()))
+
+        return
+
+    def write_log(self, log_path, worker_name, line):
+        """ Aggregates a line of a worker into the log.
+        Args:
+            log_path: String representing the log file, None to only emit it.
+            worker_name: String representing who wrote the line.
+            line: String representing the line.
+        """
+
+        line = '[{}] {}'.format(worker_name, line)
+
+        self.log_received.emit(line)
+
+        if log_path is None:
+            return
+
+        time_stamp = datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+
+        try:
+            with open(log_path, 'a') as log_file:
+                log_file.write('{} {}\n'.format(time_stamp, line))
+
+        except (IOError, OSError):
+            pass
+
+        return
+
+    def on_output(self, process):
+        """ Executes when a worker prints, reads complete lines.
+        Args:
+            process: QProcess of the worker.
+        """
+
+        lines = (self._buffers.get(process, b'') + bytes(process.readAllStandardOutput())).split(b'\n')
+        self._buffers[process] = lines.pop()
+
+        for line in lines:
+            self.read_line(process, line.decode('utf-8', 'replace').rstrip())
+
+        return
+
+    def read_line(self, process, line):
+        """ Updates jobs with an event line, every line is logged but frames.
+        Args:
+            process: QProcess of the worker.
+            line: String representing the line printed by the worker.
+        """
+
+        batch, _, worker_name = self._processes[process]
+        event = alembic_jobs.parse_event(line)
+
+        if event is not None and event.get('job_id') in self.chunk_jobs:
+            self.read_chunk_event(batch, worker_name, event)
+
+            return
+
+        if event is None or event.get('job_id') not in self.jobs:
+            if line:
+                self.write_log(batch.log_path, worker_name, line)
+
+            return
+
+        job_id = event['job_id']
+        job = self.jobs[job_id]
+
+        if event['event'] == alembic_jobs.STARTED:
+            self.statuses[job_id] = RUNNING
+            self.write_log(batch.log_path, worker_name, 'Started {}'.format(job.output_path))
+            self.job_started.emit(job_id)
+
+        elif event['event'] == alembic_jobs.FRAME:
+            frames = max(float(job.end_time) - float(job.start_time), 1.0)
+            percentage = int(100 * (float(event['frame']) - float(job.start_time)) / frames)
+
+            self.job_progress.emit(job_id, max(0, min(100, percentage)))
+
+        elif event['event'] == alembic_jobs.DONE:
+            export_seconds = event.get('seconds', 0.0)
+            mode = 'background'
+
+            # Chunks are exported at the same time, the job took from its
+            # first chunk until stitched.
+            if job_id in self._chunk_start_times:
+                export_seconds = time.time() - self._chunk_start_times[job_id] - event.get('publish_seconds', 0.0)
+                mode = 'chunks x{}'.format(len(self._chunks[job_id]))
+
+            timing = export_timings.JobTiming(job.name,
+                                              job.output_path,
+                                              job.start_time,
+                                              job.end_time,
+                                              export_seconds=export_seconds,
+                                              publish_seconds=event.get('publish_seconds', 0.0),
+                                              jobs_in_call=event.get('jobs_in_call', 1),
+                                              file_size=event.get('file_size'),
+                                              mode=mode)
+
+            self.statuses[job_id] = DONE
+            self.record_fingerprint(batch, worker_name, job)
+            self.finish_job(batch, worker_name, job, timing)
+
+        elif event['event'] == alembic_jobs.FAILED:
+            self.fail_job(batch, worker_name, job, event.get('error', ''))
+
+        return
+
+    def record_fingerprint(self, batch, worker_name, job):
+        """ Records the fingerprint of an exported job, if it has one.
+        Args:
+            batch: ExportBatch of the job.
+            worker_name: String representing the worker exporting the job.
+            job: AlembicJob exported.
+        """
+
+        if job.fingerprint is None:
+            return
+
+        try:
+            export_fingerprints.record_fingerprint(job.output_path, job.fingerprint)
+
+        except (IOError, OSError) as error:
+            self.write_log(batch.log_path, worker_name, 'Could not record fingerprint of {}: {}'.format(job.name,
+                                                                                                    error))
+
+        return
+
+    def read_chunk_event(self, batch, worker_name, event):
+        """ Updates the job of a chunk with an event of the chunk, the job is
+        merged when its last chunk is exported.
+        Args:
+            batch: ExportBatch of the chunk.
+            worker_name: String representing the worker exporting the chunk.
+            event: Dictionary representing the event.
+        """
+
+        chunk_id = event['job_id']
+        chunk_job = self.chunk_jobs[chunk_id]
+        job_id = self._chunk_parents[chunk_id]
+
+        if event['event'] == alembic_jobs.STARTED:
+            self.statuses[chunk_id] = RUNNING
+            self.write_log(batch.log_path, worker_name, 'Started {}'.format(chunk_job.name))
+
+            if self.statuses[job_id] == QUEUED:
+                self.statuses[job_id] = RUNNING
+                self._chunk_start_times[job_id] = time.time()
+                self.job_started.emit(job_id)
+
+        elif event['event'] == alembic_jobs.FRAME:
+            frames = max(float(chunk_job.end_time) - float(chunk_job.start_time), 1.0)
+            percentage = int(100 * (float(event['frame']) - float(chunk_job.start_time)) / frames)
+            self._chunk_progress[chunk_id] = max(0, min(100, percentage))
+
+            self.emit_chunks_progress(job_id)
+
+        elif event['event'] == alembic_jobs.DONE:
+            self.statuses[chunk_id] = DONE
+            self._chunk_progress[chunk_id] = 100
+            self.write_log(batch.log_path, worker_name, 'Exported {} in {:.1f}s'.format(chunk_job.name,
+                                                                                      event.get('seconds', 0.0)))
+
+            self.emit_chunks_progress(job_id)
+
+            if all(self.statuses[chunk] == DONE for chunk in self._chunks[job_id]):
+                self.add_merge_batch(batch, job_id)
+
+        elif event['event'] == alembic_jobs.FAILED:
+            self.fail_job(batch, worker_name, chunk_job, event.get('error', ''))
+
+        return
+
+    def emit_chunks_progress(self, job_id):
+        """ Emits progress of a job as the average of its chunks.
+        Args:
+            job_id: Integer representing the job exported in chunks.
+        """
+
+        chunk_ids = self._chunks[job_id]
+        percentage = sum(self._chunk_progress[chunk_id] for chunk_id in chunk_ids) // len(chunk_ids)
+
+        self.job_progress.emit(job_id, percentage)
+
+        return
+
+    def add_merge_batch(self, batch, job_id):
+        """ Queues stitching the chunks of a job, before pending exports.
+        Args:
+            batch: ExportBatch of the last chunk exported.
+            job_id: Integer representing the job exported in chunks.
+        """
+
+        job = self.jobs[job_id]
+        chunk_paths = [self.chunk_jobs[chunk_id].output_path for chunk_id in self._chunks[job_id]]
+
+        options = {'stitcher': batch.options['stitcher'],
+                   'chunk_paths': {job_id: chunk_paths}}
+
+        self._pending.appendleft(ExportBatch(batch.scene_path, [job], batch.log_path, batch.timings_path, options,
+                                             MERGE_SCRIPT))
+
+        return
+
+    def fail_job(self, batch, worker_name, job, message):
+        """ Marks a job as failed, a failed chunk fails its job.
+        Args:
+            batch: ExportBatch of the job.
+            worker_name: String representing the worker exporting the job.
+            job: AlembicJob failed.
+            message: String representing why it failed.
+        """
+
+        if job.job_id in self.chunk_jobs:
+            self.statuses[job.job_id] = FAILED
+            job_id = self._chunk_parents[job.job_id]
+
+            # Other chunks of the job failing are only logged.
+            if self.statuses[job_id] in (DONE, FAILED):
+                self.write_log(batch.log_path, worker_name, '{} failed: {}'.format(job.name, message))
+
+                return
+
+            message = 'Frames {}-{}: {}'.format(job.start_time, job.end_time, message or 'Unknown error')
+            job = self.jobs[job_id]
+
+        timing = export_timings.JobTiming(job.name,
+                                          job.output_path,
+                                          job.start_time,
+                                          job.end_time,
+                                          file_size=0,
+                                          mode='background',
+                                          error=message or 'Unknown error')
+
+        self.statuses[job.job_id] = FAILED
+        self.finish_job(batch, worker_name, job, timing)
+
+        return
+
+    def finish_job(self, batch, worker_name, job, timing):
+        """ Logs the timing of a finished job and writes it.
+        Args:
+            batch: ExportBatch of the job.
+            worker_name: String representing the worker exporting the job.
+            job: AlembicJob finished.
+            timing: JobTiming of the job.
+        """
+
+        self.timings[job.job_id] = timing
+        self.write_log(batch.log_path, worker_name, timing.summary())
+
+        if batch.timings_path is not None:
+            try:
+                export_timings.append_timings(batch.timings_path, [timing])
+
+            except (IOError, OSError):
+                pass
+
+        self.job_finished.emit(job.job_id, timing.succeeded, timing.summary())
+
+        return
+
+    def on_process_finished(self, process, message=None):
+        """ Executes when a worker exits, jobs it did not finish are failed.
+        Args:
+            process: QProcess of the worker.
+            message: String representing why jobs failed, exit code if None.
+        """
+
+        if process not in self._processes:
+            return
+
+        if message is None:
+            message = 'Worker exited with code {}'.format(process.exitCode())
+
+        self.on_output(process)
+
+        remaining = self._buffers.pop(process, b'')
+
+        if remaining:
+            self.read_line(process, remaining.decode('utf-8', 'replace').rstrip())
+
+        batch, jobs_directory, worker_name = self._processes.pop(process)
+
+        for job in batch.jobs:
+            if self.statuses[job.job_id] in (QUEUED, RUNNING):
+                self.fail_job(batch, worker_name, job, message)
+
+        shutil.rmtree(jobs_directory, ignore_errors=True)
+        process.deleteLater()
+
+        self.start_next()
+
+        if not self.is_running():
+            self.finished.emit()
+
+        return
+
+    def stop(self):
+        """ Cancels pending batches and kills running workers.
+        """
+
+        self._throttle_timer.stop()
+
+        for batch in self._pending:
+            for job in batch.jobs:
+                self.fail_job(batch, 'queue', job, 'Cancelled')
+
+        self._pending.clear()
+
+        for process in list(self._processes):
+            process.kill()
+
+        if not self._processes:
+            self.finished.emit()
+
+        return
+
+
+def get_export_queue():
+    """ Gets the export queue of the maya session, created the first time.
+    Return:
+        ExportQueue.
+    """
+
+    if _EXPORT_QUEUE[0] is None:
+        _EXPORT_QUEUE[0] = ExportQueue()
+
+    return _EXPORT_QUEUE[0]
@@ -0,0 +1,197 @@
+""" Timing of alembic exports: time evaluating the animation, frames per
+second, size of the file and time publishing it. Timings are appended as json
+lines next to the exported alembics, to find out if exports got slow because
+of the rig, the disk or the publish copy.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import json
+import math
+import os
+import socket
+
+from datetime import datetime
+
+
+## Name of the json lines file written in the destination directory.
+# type: str
+TIMINGS_FILE_NAME = 'alembic_export_timings.jsonl'
+
+
+def format_size(size_bytes):
+    """ Convert bytes to human readable format.
+    Args:
+        size_bytes: Integer representing the size in bytes.
+    Return:
+        String representing the size (eg. 1.5 GB).
+    """
+
+    if size_bytes <= 0:
+        return '0 B'
+
+    size_names = ('B', 'KB', 'MB', 'GB', 'TB')
+    index = min(int(math.floor(math.log(size_bytes, 1024))), len(size_names) - 1)
+
+    return '{} {}'.format(round(size_bytes / math.pow(1024, index), 2), size_names[index])
+
+
+def get_file_size(full_path):
+    """ Gets size of a file, 0 if it does not exist.
+    """
+
+    try:
+        return os.path.getsize(full_path)
+
+    except OSError:
+        return 0
+
+
+class JobTiming(object):
+    """ Timing of one exported alembic file.
+    """
+
+    def __init__(self, name, output_path, start_time, end_time, export_seconds=0.0, publish_seconds=0.0,
+                 jobs_in_call=1, file_size=None, mode='', error=''):
+
+        ## Name of the alembic file without extension.
+        # type: str
+        self.name = name
+
+        ## Full path of the alembic file.
+        # type: str
+        self.output_path = output_path
+
+        ## Amount of frames evaluated.
+        # type: float
+        self.frames = float(end_time) - float(start_time) + 1
+
+        ## Wall time of the AbcExport call that wrote the file.
+        # type: float
+        self.export_seconds = export_seconds
+
+        ## Time spent publishing the file, or transferring it from scratch
+        # disk when staged, 0 if not published.
+        # type: float
+        self.publish_seconds = publish_seconds
+
+        ## Amount of jobs sharing the AbcExport call, and its evaluation.
+        # type: int
+        self.jobs_in_call = jobs_in_call
+
+        ## Size of the alembic file in bytes.
+        # type: int
+        self.file_size = get_file_size(output_path) if file_size is None else file_size
+
+        ## How the file was exported (eg. serial, background).
+        # type: str
+        self.mode = mode
+
+        ## Why export failed, empty if it was exported.
+        # type: str
+        self.error = error
+
+    @property
+    def succeeded(self):
+
+        return not self.error
+
+    @property
+    def frames_per_second(self):
+        """ Frames evaluated per second by the AbcExport call.
+        """
+
+        if self.export_seconds <= 0:
+            return 0.0
+
+        return self.frames / self.export_seconds
+
+    def to_dict(self):
+
+        return {'date': datetime.now().isoformat(),
+                'host': socket.gethostname(),
+                'name': self.name,
+                'output_path': self.output_path,
+                'frames': self.frames,
+                'export_seconds': round(self.export_seconds, 3),
+                'frames_per_second': round(self.frames_per_second, 3),
+                'jobs_in_call': self.jobs_in_call,
+                'file_size': self.file_size,
+                'publish_seconds': round(self.publish_seconds, 3),
+                'mode': self.mode,
+                'error': self.error}
+
+    def summary(self):
+        """ Composes a readable line with the timing.
+        Return:
+            String like: char01: 12.3s, 81.3 fps, 1.2 GB, publish 2.1s
+        """
+
+        if not self.succeeded:
+            return '{}: failed, {}'.format(self.name, self.error)
+
+        line = '{}: {:.1f}s, {:.1f} fps, {}'.format(self.name,
+                                                     self.export_seconds,
+                                                     self.frames_per_second,
+                                                     format_size(self.file_size))
+
+        if self.publish_seconds:
+            line += ', publish {:.1f}s'.format(self.publish_seconds)
+
+        return line
+
+
+def append_timings(timings_path, timings):
+    """ Appends timings to the json lines file.
+    Args:
+        timings_path: String representing the json lines file full path.
+        timings: List of JobTiming.
+    """
+
+    with open(timings_path, 'a') as timings_file:
+        for timing in timings:
+            timings_file.write(json.dumps(timing.to_dict()) + '\n')
+
+    return
+
+
+def summarize_totals(timings):
+    """ Composes readable totals of several exports.
+    Args:
+        timings: List of JobTiming.
+    Return:
+        String representing the totals.
+    """
+
+    lines = []
+    exported = [timing for timing in timings if timing.succeeded]
+
+    # Jobs of the same call share its time.
+    export_seconds = sum(timing.export_seconds / max(timing.jobs_in_call, 1) for timing in exported)
+    publish_seconds = sum(timing.publish_seconds for timing in exported)
+
+    lines.append('Total: {} alembics, {}, export {:.1f}s, publish {:.1f}s'.format(len(exported),
+                                                                               format_size(sum(timing.file_size for timing in exported)),
+                                                                               export_seconds,
+                                                                               publish_seconds))
+
+    if len(exported) != len(timings):
+        lines.append('Failed: {}'.format(len(timings) - len(exported)))
+
+    return '\n'.join(lines)
+
+
+def summarize(timings):
+    """ Composes a readable summary of several exports.
+    Args:
+        timings: List of JobTiming.
+    Return:
+        String representing one line per file and the totals.
+    """
+
+    lines = [timing.summary() for timing in timings]
+
+    lines.append('')
+    lines.append(summarize_totals(timings))
+
+    return '\n'.join(lines)
@@ -7,7 +7,6 @@ import os
 import re
 import sys
 import time
-import uuid
 import pymel.core
 
 from datetime import datetime
@@ -16,6 +15,18 @@ from maya import OpenMaya
 from PySide2 import QtWidgets
 from PySide2 import QtCore
 
+from common_utils import root_paths
+
+import alembic_jobs
+import export_fingerprints
+import export_profiles
+import export_progress_UI
+import export_queue
+import export_timings
+import frame_chunks
+import publish_strategies
+import transfer_queue
+
 from export_to_alembics_UI import ExportToAlembicUI
 from custom_message_UI import CustomMsgBoxUI
 
@@ -90,6 +101,9 @@ class ExportToAlembicCore(ExportToAlembicUI):
         # Gets and sets variables start_time and end_time.
         self.get_start_end_from_time_slider()
 
+        # Default export profile of the step of the file.
+        self.profile_comboBox.setCurrentText(export_profiles.get_step_profile(self.step))
+
         ########################################################################
         self.at_launch_tool()
 
@@ -109,6 +123,10 @@ class ExportToAlembicCore(ExportToAlembicUI):
         self.exportToAlembic_buttonBox.clicked.connect(self.on_button_clicked)
 
         self.alembic_per_selection_checkBox.stateChanged.connect(self.on_checkBox_change)
+        self.background_checkBox.toggled.connect(self.processes_spinBox.setEnabled)
+        self.background_checkBox.toggled.connect(self.chunks_spinBox.setEnabled)
+        self.background_checkBox.toggled.connect(self.staging_checkBox.setEnabled)
+        self.staging_checkBox.toggled.connect(self.bandwidth_spinBox.setEnabled)
     
     def load_AbcExport_plugin(self):
         """ Load AbcExport Alembics, if it is not loaded yet.
@@ -289,7 +307,17 @@ class ExportToAlembicCore(ExportToAlembicUI):
         file_name = self.get_current_file_name()
         file_name_parts = file_name.split('_')
 
-        root_folder = os.path.expandvars('%ADI_ROOT_FOLDER%')
+        root_folder = root_paths.get_root_directory()
+
+        # Step of the file, sets the default export profile.
+        self.step = None
+
+        # Paths would be relative to maya current directory.
+        if not root_folder:
+            self.destination_path = None
+            self.publish_path = None
+
+            return None
 
         if len(file_name_parts) < 4:
             self.destination_path = None
@@ -308,6 +336,7 @@ class ExportToAlembicCore(ExportToAlembicUI):
             valid_version = self._VERSION_PATTERN.search(version)
 
             if valid_sq and valid_shot and valid_version and wf=='wf' and valid_step:
+                self.step = step
                 
                 path_created = os.path.join(root_folder, 
                                             seq, 
@@ -347,6 +376,7 @@ class ExportToAlembicCore(ExportToAlembicUI):
              valid_version = self._VERSION_PATTERN.search(version)
 
              if valid_assets and valid_assetType and valid_step and valid_wf and valid_version:
+                self.step = step
 
                 path_created = os.path.join(root_folder, 
                                             assetType,
@@ -424,7 +454,11 @@ class ExportToAlembicCore(ExportToAlembicUI):
         """ Set in label the destination path.
         """
 
-        root_folder = os.path.expandvars('%ADI_ROOT_FOLDER%')
+        if self.destination_path is None and not root_paths.get_root_directory():
+            msg = '{} environment variable is not set!\nSelect a destination folder!'.format(root_paths.ROOT_VARIABLE)
+            self.message_label.setText(msg)
+
+            return
 
         if self.destination_path is None:
             
@@ -434,7 +468,7 @@ class ExportToAlembicCore(ExportToAlembicUI):
             return
         
         if self.check_adi_root_folder():
-            msg = 'Root destination directory:\n{}'.format(self.destination_path[len(root_folder):])        
+            msg = 'Root destination directory:\n{}'.format(root_paths.relative_to_root(self.destination_path))        
             self.message_label.setText(msg)
 
             return
@@ -448,15 +482,7 @@ class ExportToAlembicCore(ExportToAlembicUI):
         """ Checks if self.destination_path is part of the root folder. 
         """
 
-        root_folder = os.path.expandvars('%ADI_ROOT_FOLDER%')
-        root_folder_reformat = root_folder.replace('\\', '/')
-        
-        destination_root_folder = self.destination_path[:len(root_folder)]
-
-        if root_folder_reformat == destination_root_folder:
-            return True
-        
-        return False
+        return root_paths.is_in_structure(self.destination_path)
 
     def get_start_end_from_time_slider(self):
         """ Gets the start time and end time from current time slider, and set
@@ -501,74 +527,319 @@ class ExportToAlembicCore(ExportToAlembicUI):
         if signal.text() == 'Export and Publish':
             self.create_and_publish = True
 
+        export_selection = self.get_export_selection()
+
+        if not export_selection:
+            self.show_info_msg('Select a camera to export with the camera-only profile.')
+
+            return
+
+        # Camera-only profile leaves out every other selected node.
+        exported_names = set(node.name() for node in export_selection)
+        left_out_names = [node.name() for node in self.selection if node.name() not in exported_names]
+
+        if left_out_names:
+            msg = 'Camera-only profile only exports cameras, left out:\n{}\n\nExport cameras only?'.format(
+                '\n'.join(left_out_names))
+
+            if self.show_decision_msg(msg) != QtWidgets.QMessageBox.Ok:
+                return
+
+        if self.background_checkBox.isChecked():
+            self.export_in_background()
+
+            return
+
+        jobs, skipped_names = self.skip_unchanged_jobs(self.get_jobs())
+
         # Load AbcExport plugin.
         self.load_AbcExport_plugin()
 
+        # Timing of every exported file.
+        self.job_timings = []
+
         # Suspend refresh
         pymel.core.general.refresh(suspend=True)
 
-        files_per_selection = self.alembic_per_selection_checkBox.isChecked()
+        try:
+            if self.exports_file_per_selection():
+                failures = self.export_file_per_selection(jobs)
 
-        if not self.check_duplicate_object_names(self.selection):
+            else:
+                failures = self.export_one_file_for_all_selected(jobs)
 
-            if files_per_selection:
-                self.export_file_per_selection()
+        finally:
+            # Enable refresh
+            pymel.core.general.refresh(suspend=False)
+
+            # Remove callback, even if the export failed.
+            OpenMaya.MMessage.removeCallback(self.selection_changed_callback)
+
+        try:
+            export_timings.append_timings(self.get_timings_path(), self.job_timings)
+
+        except (IOError, OSError):
+            OpenMaya.MGlobal.displayWarning('Could not write export timings into {}'.format(self.destination_path))
+
+        summary = export_timings.summarize(self.job_timings) if self.job_timings else ''
+
+        if skipped_names:
+            summary = '{}\n\nSkipped, unchanged since last export: {}'.format(summary,
+                                                                            ', '.join(skipped_names)).strip()
+
+        if failures:
+            failed_lines = ['{} ({})'.format(name, error) for name, error in failures]
+            summary = '{}\n\nFailed:\n{}'.format(summary, '\n'.join(failed_lines)).strip()
+
+            OpenMaya.MGlobal.displayError('Could not export: {}'.format(', '.join(name for name, _ in failures)))
+
+        CustomMsgBoxUI(self.destination_path,
+                       summary=summary,
+                       parent=self)
+
+        self.close()
+
+        return
+
+    def exports_file_per_selection(self):
+        """ Checks if one alembic is exported per selection, always when
+        selected names clash.
+        Return:
+            True if one alembic per selection, False for one alembic for all.
+        """
+
+        if self.check_duplicate_object_names(self.selection):
+            return True
+
+        return self.alembic_per_selection_checkBox.isChecked()
+
+    def get_saved_scene(self):
+        """ Gets current maya file to export from, background workers open
+        the saved file so unsaved changes are saved first if user agrees.
+        Return:
+            String representing maya file full path, None if it is not saved.
+        """
+
+        scene_path = pymel.core.system.sceneName()
+
+        if scene_path and not pymel.core.system.isModified():
+            return scene_path
+
+        msg = 'Background export uses the saved scene.\nSave scene now?'
+
+        if self.show_decision_msg(msg) != QtWidgets.QMessageBox.Ok:
+            return None
+
+        if not scene_path:
+            self.show_info_msg('Save the scene with a name before exporting in background.')
+
+            return None
+
+        pymel.core.system.saveFile()
+
+        return scene_path
+
+    def export_in_background(self):
+        """ Queues the export jobs into mayapy workers, the tool is closed and
+        progress is shown in its own window while user keeps working.
+        """
+
+        scene_path = self.get_saved_scene()
+
+        if scene_path is None:
+            return
+
+        jobs, skipped_names = self.skip_unchanged_jobs(self.get_jobs())
+
+        if skipped_names:
+            OpenMaya.MGlobal.displayInfo('Skipped, unchanged since last export: {}'.format(', '.join(skipped_names)))
+
+        if not jobs:
+            self.show_info_msg('Every alembic is unchanged since its last export:\n{}'.format('\n'.join(skipped_names)))
+
+            return
+
+        queue = export_queue.get_export_queue()
+        queue.max_processes = self.processes_spinBox.value()
+
+        progress_window = export_progress_UI.show_export_progress(queue, parent=self.parentWidget())
+        progress_window.add_skipped_items(skipped_names)
+
+        log_path = '{}/alembic_export.log'.format(self.destination_path)
+
+        queue.add_jobs(scene_path,
+                       jobs,
+                       log_path=log_path,
+                       timings_path=self.get_timings_path(),
+                       options=self.get_worker_options(),
+                       chunks=self.get_chunks())
 
-            else:
-                self.export_one_file_for_all_selected()
-        
-        else:
-            self.export_file_per_selection()
-        
-        # Enable refresh
-        time.sleep(2)
-        pymel.core.general.refresh(suspend=False)
-                
         # Remove callback
         OpenMaya.MMessage.removeCallback(self.selection_changed_callback)
 
-        CustomMsgBoxUI(self.destination_path, parent=self)
-
         self.close()
 
         return
 
-    def export_command(self, name_from_namespace, root_string, camera=None):
+    def get_chunks(self):
+        """ Gets the frame chunks every job is split into, scenes simulating
+        over time are exported whole, chunks would restart the simulation.
+        Return:
+            Integer representing the frame chunks, 1 to not split.
+        """
+
+        chunks = self.chunks_spinBox.value()
+
+        if chunks < 2:
+            return chunks
+
+        # Plugin node types are unknown if their plugin is not loaded.
+        node_types = set(pymel.core.allNodeTypes())
+        dynamic_types = [node_type for node_type in frame_chunks.DYNAMIC_NODE_TYPES if node_type in node_types]
+        dynamic_nodes = [node.name() for node in pymel.core.ls(type=dynamic_types)] if dynamic_types else []
+
+        issue = frame_chunks.get_chunking_issue(self.step, dynamic_nodes)
+
+        if issue:
+            OpenMaya.MGlobal.displayWarning('{} Exporting whole frame ranges.'.format(issue))
+
+            return 1
+
+        return chunks
+
+    def get_worker_options(self):
+        """ Gets options of background workers from UI.
+        Return:
+            Dictionary with scratch_directory and bytes_per_second if staging.
+        """
+
+        if not self.staging_checkBox.isChecked():
+            return {}
+
+        return {'scratch_directory': transfer_queue.get_scratch_directory(),
+                'bytes_per_second': self.bandwidth_spinBox.value() * 1024 * 1024}
+
+    def get_timings_path(self):
+        """ Gets the json lines file timings of exports are appended to.
+        Return:
+            String representing the file full path.
+        """
+
+        return '{}/{}'.format(self.destination_path, export_timings.TIMINGS_FILE_NAME)
+
+    def publish_and_time(self, full_file_path, camera):
+        """ Copies created alembic file into published path if Export and
+        Publish is clicked.
+        Args:
+            full_file_path: String representing the full file path name.
+            camera: String 'camera' if full_file_path is a camera, None otherwise
+        Return:
+            Float representing the seconds spent publishing, 0 if not published.
+        """
+
+        if not self.create_and_publish:
+            return 0.0
+
+        start = time.time()
+        self.copy_into_publish_path(full_file_path, camera)
+
+        return time.time() - start
+
+    def get_output_path(self, name_from_namespace, camera=None):
+        """ Composes the alembic full path of an export.
+        Args:
+            name_from_namespace: String representing the selected object.
+            camera: String representing the name of the folder for cameras.
+        Return:
+            String representing the alembic full path.
+        """
+
+        output_file_name = '{}.abc'.format(name_from_namespace)
+
+        if camera is None:
+            return '{}/{}'.format(self.destination_path, output_file_name)
+
+        return '{}/{}/{}'.format(self.destination_path, camera, output_file_name)
+
+    def create_job(self, name_from_namespace, roots, camera=None):
+        """ Creates the export job of passed roots.
+        Args:
+            name_from_namespace: String representing the selected object.
+            roots: List of string representing the exported nodes.
+            camera: String representing the name of the folder for cameras.
+        Return:
+            AlembicJob.
+        """
+
+        publish_directory = self.publish_path if self.create_and_publish else None
+
+        return alembic_jobs.AlembicJob(name_from_namespace,
+                                       roots,
+                                       self.get_output_path(name_from_namespace, camera),
+                                       self.start_time,
+                                       self.end_time,
+                                       camera=camera,
+                                       publish_directory=publish_directory,
+                                       alembic_options=self.get_profile().alembic_options)
+
+    def export_command(self, name_from_namespace, root_string, camera=None, alembic_options=None):
         """ Exceutes the actual export based on passed data.
         Args:
             name_from_namespace: String representing the selected object.
             root_string: String representing the -root part of command.
             camera: String representing the name of the folder for cameras.
+            alembic_options: String representing the AbcExport options, of
+            the selected export profile if None.
         """
 
-        alembic_options = '-frameRange {} {} -stripNamespaces -uvWrite -worldSpace -writeUVSets -step 1 -dataFormat ogawa {} -file {}'
+        if alembic_options is None:
+            alembic_options = self.get_profile().alembic_options
 
-        output_file_name = '{}.abc'.format(name_from_namespace)
-        if camera is None:
-            full_path_destination_dir = '{}/{}'.format(self.destination_path, output_file_name)
-        else:
-            full_path_destination_dir = '{}/{}/{}'.format(self.destination_path, camera, output_file_name)
+        full_path_destination_dir = self.get_output_path(name_from_namespace, camera)
+
+        if camera is not None:
             if not os.path.exists(os.path.dirname(full_path_destination_dir)):
                 os.makedirs(os.path.dirname(full_path_destination_dir))
 
+        # Export to a temporary file, readers never see a half written file.
+        temp_path = publish_strategies.temp_path_for(full_path_destination_dir)
+
         command_formatted = alembic_options.format(self.start_time,
                                                     self.end_time,
                                                     root_string,
-                                                    full_path_destination_dir)
+                                                    temp_path)
+
+        start = time.time()
+
+        try:
+            pymel.core.AbcExport(j=command_formatted)
+            publish_strategies.commit_file(temp_path, full_path_destination_dir)
+
+        finally:
+            publish_strategies.remove_file(temp_path)
+
+        export_seconds = time.time() - start
 
-        pymel.core.AbcExport(j=command_formatted)  
+        publish_seconds = self.publish_and_time(full_path_destination_dir, camera)
 
-        # If Export and Publish is clicked.
-        if self.create_and_publish:
-            self.copy_into_publish_path(full_path_destination_dir, camera)
+        self.job_timings.append(export_timings.JobTiming(name_from_namespace,
+                                                         full_path_destination_dir,
+                                                         self.start_time,
+                                                         self.end_time,
+                                                         export_seconds=export_seconds,
+                                                         publish_seconds=publish_seconds,
+                                                         mode='serial'))
  
         return
 
     def copy_into_publish_path(self, full_file_path, camera):
-        """ Copies created alembic file into published path.
+        """ Publishes created alembic file into published path, cloned when
+        possible, copied otherwise.
         Args:
             full_file_path: String representing the full file path name.
             camera: String 'camera' if full_file_path is a camera, None otherwise
+        Return:
+            String representing the publish strategy used.
         """
 
         file_name = os.path.basename(full_file_path)
@@ -578,52 +849,203 @@ class ExportToAlembicCore(ExportToAlembicUI):
         
         else:
             destination_path = os.path.join(self.publish_path, camera, file_name)
-            destination_path_dir = os.path.dirname(destination_path)
 
-            if not os.path.exists(destination_path_dir):
-                os.makedirs(destination_path_dir)
+        return publish_strategies.publish_file(full_file_path, destination_path)
+    
+    def get_jobs(self):
+        """ Creates the jobs of the selection, per selection or one for all.
+        Return:
+            List of AlembicJob.
+        """
 
-        destination_path_reformat = destination_path.replace('/', '\\')
-        full_file_path_reformat = full_file_path.replace('/', '\\')
+        if self.exports_file_per_selection():
+            return self.get_jobs_per_selection()
 
-        os.popen('copy {} {}'.format(full_file_path_reformat, destination_path_reformat))
+        return self.get_job_for_all_selected()
 
-        return
-    
-    def export_one_file_for_all_selected(self):
-        """ Exports all selected files under one alembic file.
+    def skip_unchanged_jobs(self, jobs):
+        """ Fingerprints jobs and leaves out the ones exported already with the
+        same fingerprint, when skipping unchanged alembics is checked.
+        Args:
+            jobs: List of AlembicJob.
+        Return:
+            Tuple (list of AlembicJob to export, list of skipped names).
         """
-        
-        root_string = ''
-        name_from_namespace = ''
 
-        for name in self.selection:
-            root_string += ' -root {}'.format(name.name())
-            name_from_namespace = self.get_name_for_alembic_file(name)
+        changed_jobs = []
+        skipped_names = []
+
+        for job in jobs:
+            scene_hash = export_fingerprints.get_scene_hash(job.roots, job.start_time)
+            job.fingerprint = export_fingerprints.compose_fingerprint(scene_hash, job)
+
+            if self.skip_unchanged_checkBox.isChecked() and export_fingerprints.is_unchanged(job, job.fingerprint):
+                skipped_names.append(job.name)
+
+                continue
+
+            changed_jobs.append(job)
+
+        return changed_jobs, skipped_names
+
+    def record_fingerprint(self, job):
+        """ Records the fingerprint of an exported job, next exports skip it
+        while it does not change.
+        Args:
+            job: AlembicJob exported.
+        """
 
-        self.export_command(name_from_namespace, root_string)
+        try:
+            export_fingerprints.record_fingerprint(job.output_path, job.fingerprint)
+
+        except (IOError, OSError):
+            OpenMaya.MGlobal.displayWarning('Could not record fingerprint of {}'.format(job.output_path))
 
         return
 
-    def export_file_per_selection(self):
-        """ Export one alembic per selection.
+    def get_profile(self):
+
+        return export_profiles.get_profile(self.profile_comboBox.currentText())
+
+    def get_export_selection(self):
+        """ Gets the selected nodes exported, only cameras with the
+        camera-only profile.
+        Return:
+            List of pymel.core.nodetypes.Transform.
         """
-                
-        root_string = ''
-        name_from_namespace = ''
 
-        for name in self.selection:
+        if not self.get_profile().cameras_only:
+            return self.selection
+
+        return [name for name in self.selection if isinstance(name.getShape(), pymel.core.nodetypes.Camera)]
+
+    def get_job_for_all_selected(self):
+        """ Creates one job exporting all selected under one alembic file,
+        named after the last selected.
+        Return:
+            List with one AlembicJob.
+        """
+
+        selection = self.get_export_selection()
+
+        roots = [name.name() for name in selection]
+        name_from_namespace = self.get_name_for_alembic_file(selection[-1])
+
+        return [self.create_job(name_from_namespace, roots)]
+
+    def get_jobs_per_selection(self):
+        """ Creates one job per selection, cameras go in camera folder.
+        Return:
+            List of AlembicJob.
+        """
+
+        jobs = []
+
+        for name in self.get_export_selection():
             camera_folder = None
 
             if isinstance(name.getShape(), pymel.core.nodetypes.Camera):
                 camera_folder = 'camera'
 
-            root_string = ' -root {}'.format(name.name())
             name_from_namespace = self.get_name_for_alembic_file(name)
 
-            self.export_command(name_from_namespace, root_string, camera=camera_folder)
+            jobs.append(self.create_job(name_from_namespace, [name.name()], camera=camera_folder))
+
+        return jobs
+
+    def export_one_file_for_all_selected(self, jobs):
+        """ Exports all selected files under one alembic file.
+        Args:
+            jobs: List of AlembicJob of get_job_for_all_selected, empty if
+            unchanged.
+        Return:
+            List of tuples (job name, error message) of jobs not exported.
+        """
+
+        failures = []
+
+        for job in jobs:
+            try:
+                self.export_command(job.name, job.root_string, alembic_options=job.alembic_options)
+
+            except (RuntimeError, IOError, OSError) as error:
+                failures.append((job.name, str(error)))
+
+                continue
+
+            self.record_fingerprint(job)
+
+        return failures
+
+    def export_file_per_selection(self, jobs):
+        """ Export one alembic per selection, all alembics are exported in
+        one AbcExport call so the animation is evaluated only once, calls are
+        split if the jobs do not fit in one. If a call fails its jobs are
+        exported one by one, so only jobs that can not be exported fail.
+        Args:
+            jobs: List of AlembicJob of get_jobs_per_selection.
+        Return:
+            List of tuples (job name, error message) of jobs not exported.
+        """
+
+        for job in jobs:
+            if not os.path.exists(os.path.dirname(job.output_path)):
+                os.makedirs(os.path.dirname(job.output_path))
+
+        # Export to temporary files, readers never see half written files.
+        temp_paths = dict((job.output_path, publish_strategies.temp_path_for(job.output_path)) for job in jobs)
+        pending = alembic_jobs.batch_jobs(jobs, lambda job: job.job_string(output_path=temp_paths[job.output_path]))
+        failures = []
+
+        while pending:
+            batch = pending.pop(0)
+            start = time.time()
+
+            try:
+                pymel.core.AbcExport(j=[job_string for _, job_string in batch])
+
+                for job, _ in batch:
+                    publish_strategies.commit_file(temp_paths[job.output_path], job.output_path)
+
+            except (RuntimeError, IOError, OSError) as error:
+                # Export jobs of a failed call one by one, like export_worker.
+                if len(batch) > 1:
+                    pending[:0] = [[job_and_string] for job_and_string in batch]
+
+                    continue
+
+                failures.append((batch[0][0].name, str(error)))
+
+                continue
+
+            finally:
+                for job, _ in batch:
+                    publish_strategies.remove_file(temp_paths[job.output_path])
+
+            export_seconds = time.time() - start
+
+            for job, _ in batch:
+                try:
+                    publish_seconds = self.publish_and_time(job.output_path, job.camera)
+
+                except (IOError, OSError) as error:
+                    failures.append((job.name, 'Could not publish: {}'.format(error)))
+
+                    continue
+
+                # Only once published, else a stale publish would be skipped.
+                self.record_fingerprint(job)
+
+                self.job_timings.append(export_timings.JobTiming(job.name,
+                                                                 job.output_path,
+                                                                 job.start_time,
+                                                                 job.end_time,
+                                                                 export_seconds=export_seconds,
+                                                                 publish_seconds=publish_seconds,
+                                                                 jobs_in_call=len(batch),
+                                                                 mode='serial'))
         
-        return
+        return failures
     
     def get_name_for_alembic_file(self, selection):
         """ Gets the namespace from selection.
@@ -2,12 +2,15 @@
 
 @author Esteban Ortega <brutools@gmail.com>
 """
+import multiprocessing
 import sys
 
 from PySide2 import QtWidgets
 from PySide2 import QtCore
 from PySide2 import QtGui
 
+import export_profiles
+
 
 class ExportToAlembicUI(QtWidgets.QDialog):
     """ UI to export to alembics.
@@ -63,12 +66,94 @@ class ExportToAlembicUI(QtWidgets.QDialog):
         group_layout.addLayout(cache_time_layout)
         main_layout.addWidget(self.options_GroupBox)
 
+        # Export profile, what is written into the alembics.
+        ########################################################################
+        profile_layout = QtWidgets.QHBoxLayout()
+        profile_label = QtWidgets.QLabel('Export profile:')
+
+        self.profile_comboBox = QtWidgets.QComboBox()
+
+        for index, profile in enumerate(export_profiles.PROFILES.values()):
+            self.profile_comboBox.addItem(profile.name)
+            self.profile_comboBox.setItemData(index, profile.description, QtCore.Qt.ToolTipRole)
+
+        profile_layout.addWidget(profile_label)
+        profile_layout.addWidget(self.profile_comboBox)
+
+        group_layout.addLayout(profile_layout)
+
         # Checkbox per selection
         ########################################################################
         self.alembic_per_selection_checkBox = QtWidgets.QCheckBox('Create Alembic file per selection')
         self.alembic_per_selection_checkBox.setChecked(True)
         group_layout.addWidget(self.alembic_per_selection_checkBox)
 
+        # Checkbox to skip alembics which animation did not change.
+        ########################################################################
+        self.skip_unchanged_checkBox = QtWidgets.QCheckBox('Skip alembics with unchanged animation')
+        self.skip_unchanged_checkBox.setToolTip('Alembics are not exported again if their animation curves, '
+                                                'transforms, frame range and options did not change since their '
+                                                'last export in the destination path.')
+        group_layout.addWidget(self.skip_unchanged_checkBox)
+
+        # Checkbox to export with mayapy and keep working.
+        ########################################################################
+        self.background_checkBox = QtWidgets.QCheckBox('Export in background (uses saved scene)')
+        self.background_checkBox.setChecked(True)
+        group_layout.addWidget(self.background_checkBox)
+
+        # Amount of mayapy processes sharing the alembics.
+        ########################################################################
+        processes_layout = QtWidgets.QHBoxLayout()
+        processes_label = QtWidgets.QLabel('Background processes:')
+
+        self.processes_spinBox = QtWidgets.QSpinBox()
+        self.processes_spinBox.setRange(1, max(1, multiprocessing.cpu_count()))
+        self.processes_spinBox.setValue(min(4, max(1, multiprocessing.cpu_count() // 2)))
+        self.processes_spinBox.setToolTip('Alembics per selection are shared between processes, '
+                                          'processes only start while there is free memory.')
+
+        processes_layout.addWidget(processes_label)
+        processes_layout.addWidget(self.processes_spinBox)
+
+        group_layout.addLayout(processes_layout)
+
+        # Frame chunks exported at the same time and stitched.
+        ########################################################################
+        chunks_layout = QtWidgets.QHBoxLayout()
+        chunks_label = QtWidgets.QLabel('Frame chunks:')
+
+        self.chunks_spinBox = QtWidgets.QSpinBox()
+        self.chunks_spinBox.setRange(1, max(1, multiprocessing.cpu_count()))
+        self.chunks_spinBox.setSpecialValueText('Whole frame range')
+        self.chunks_spinBox.setToolTip('Long frame ranges are split into chunks exported by several processes '
+                                       'and stitched with abcstitcher. Not used for cfx, sfx, crw and scenes '
+                                       'with simulations.')
+
+        chunks_layout.addWidget(chunks_label)
+        chunks_layout.addWidget(self.chunks_spinBox)
+
+        group_layout.addLayout(chunks_layout)
+
+        # Stage alembics on local disk and transfer them in background.
+        ########################################################################
+        staging_layout = QtWidgets.QHBoxLayout()
+
+        self.staging_checkBox = QtWidgets.QCheckBox('Stage on local scratch disk')
+        self.staging_checkBox.setToolTip('Alembics are written to local disk and transferred into work '
+                                         'and publish directories while next alembics are exported.')
+
+        self.bandwidth_spinBox = QtWidgets.QSpinBox()
+        self.bandwidth_spinBox.setRange(0, 10000)
+        self.bandwidth_spinBox.setSuffix(' MB/s')
+        self.bandwidth_spinBox.setSpecialValueText('No transfer limit')
+        self.bandwidth_spinBox.setEnabled(False)
+
+        staging_layout.addWidget(self.staging_checkBox)
+        staging_layout.addWidget(self.bandwidth_spinBox)
+
+        group_layout.addLayout(staging_layout)
+
         # Browse button to redirect the output.
         ########################################################################
         browse_layout = QtWidgets.QHBoxLayout()
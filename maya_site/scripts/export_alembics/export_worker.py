@@ -0,0 +1,317 @@
+""" Exports alembic jobs from a saved maya file, run with mayapy by the export
+queue so maya user interface is not blocked while exporting. Progress is
+printed as event lines read by the queue.
+
+With a scratch directory in the jobs options, alembics are written to the
+local scratch disk and transferred into their work and publish locations in
+background threads while next jobs are exported.
+
+Usage:
+    mayapy export_worker.py --jobs D:/temp/alembic_jobs.json
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import alembic_jobs
+import publish_strategies
+import transfer_queue
+
+
+## Per frame callback added to every job, reports the evaluated frame of the
+# job, formatted with the job id.
+# type: str
+FRAME_CALLBACK = ' -pythonPerFrameCallback report_frame(#FRAME#,{})'
+
+## Transfer threads report events too.
+# type: Lock
+_REPORT_LOCK = threading.Lock()
+
+
+def report(event, job_id, **values):
+    """ Prints an event line for the export queue.
+    """
+
+    with _REPORT_LOCK:
+        sys.stdout.write(alembic_jobs.format_event(event, job_id, **values) + '\n')
+        sys.stdout.flush()
+
+    return
+
+
+def report_frame(frame, job_id):
+    """ Executes in AbcExport for every evaluated frame of every job.
+    Args:
+        frame: Float representing the frame.
+        job_id: Integer representing the job.
+    """
+
+    report(alembic_jobs.FRAME, job_id, frame=frame)
+
+    return
+
+
+def initialize_maya(scene_path):
+    """ Initializes maya standalone, loads AbcExport and opens the maya file.
+    Args:
+        scene_path: String representing the maya file full path.
+    """
+
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    import maya.cmds as cmds
+
+    if not cmds.pluginInfo('AbcExport', query=True, loaded=True):
+        cmds.loadPlugin('AbcExport')
+
+    cmds.file(scene_path, open=True, force=True, prompt=False)
+
+    # Python commands of AbcExport run in __main__, even if this module
+    # was imported.
+    import __main__
+    __main__.report_frame = report_frame
+
+    return
+
+
+def make_directory(directory):
+    """ Creates a directory, other workers can be creating it too.
+    Args:
+        directory: String representing the directory.
+    """
+
+    try:
+        os.makedirs(directory)
+
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+
+    return
+
+
+def get_job_string(job, temp_path):
+    """ Composes the job string of a job, reporting its frames.
+    Args:
+        job: AlembicJob to export.
+        temp_path: String representing the file AbcExport writes.
+    Return:
+        String representing the job string.
+    """
+
+    return job.job_string(output_path=temp_path) + FRAME_CALLBACK.format(job.job_id)
+
+
+def get_temp_paths(jobs, scratch_directory=None):
+    """ Composes the file AbcExport writes for every job, next to its output
+    or in the scratch directory.
+    Args:
+        jobs: List of AlembicJob.
+        scratch_directory: String representing the local scratch directory,
+        None to write next to the output.
+    Return:
+        Dictionary with the temporary full path by job id.
+    """
+
+    temp_paths = {}
+
+    for job in jobs:
+        if scratch_directory is None:
+            temp_paths[job.job_id] = publish_strategies.temp_path_for(job.output_path)
+
+        else:
+            scratch_path = os.path.join(scratch_directory, os.path.basename(job.output_path))
+            temp_paths[job.job_id] = publish_strategies.temp_path_for(scratch_path)
+
+    return temp_paths
+
+
+def export_batch(batch, temp_paths, commit=True):
+    """ Exports several jobs in one AbcExport call, evaluating the frame
+    range once for all of them. Files are written to temporary names and
+    renamed when the call finished.
+    Args:
+        batch: List of tuples (AlembicJob, job string).
+        temp_paths: Dictionary with the temporary file of every job id.
+        commit: False to keep the temporary files (eg. on scratch disk).
+    """
+
+    import maya.cmds as cmds
+
+    for job, _ in batch:
+        make_directory(os.path.dirname(job.output_path if commit else temp_paths[job.job_id]))
+
+    exported = False
+
+    try:
+        cmds.AbcExport(j=[job_string for _, job_string in batch])
+
+        if commit:
+            for job, _ in batch:
+                publish_strategies.commit_file(temp_paths[job.job_id], job.output_path)
+
+        exported = True
+
+    finally:
+        if commit or not exported:
+            for job, _ in batch:
+                publish_strategies.remove_file(temp_paths[job.job_id])
+
+    return
+
+
+def publish_job(job):
+    """ Publishes the exported file of a job into its publish directory.
+    Args:
+        job: AlembicJob exported.
+    Return:
+        String representing the publish strategy used.
+    """
+
+    return publish_strategies.publish_file(job.output_path, job.publish_path)
+
+
+def on_transferred(result, job, export_seconds, jobs_in_call, failures):
+    """ Executes in a transfer thread when a staged file was transferred.
+    Args:
+        result: TransferResult of the file.
+        job: AlembicJob of the file.
+        export_seconds: Float representing the time of its AbcExport call.
+        jobs_in_call: Integer representing the jobs sharing the call.
+        failures: List the job is added to if transfer failed.
+    """
+
+    if not result.succeeded:
+        failures.append(job.job_id)
+        report(alembic_jobs.FAILED,
+               job.job_id,
+               error='Transfer failed after {} tries, file kept in {}: {}'.format(result.attempts,
+                                                                                    result.source,
+                                                                                    result.error))
+
+        return
+
+    report(alembic_jobs.DONE,
+           job.job_id,
+           seconds=export_seconds,
+           publish_seconds=result.seconds,
+           jobs_in_call=jobs_in_call,
+           file_size=os.path.getsize(job.output_path))
+
+    return
+
+
+def main(argv=None):
+    """ Exports the jobs of a jobs file.
+    Args:
+        argv: List of command line arguments, sys.argv if None.
+    Return:
+        Integer exit code, 0 if every job was exported.
+    """
+
+    parser = argparse.ArgumentParser(description='Export alembic jobs from a saved maya file.')
+    parser.add_argument('--jobs', required=True, help='Jobs file written by the export queue.')
+
+    args = parser.parse_args(argv)
+
+    scene_path, jobs, options = alembic_jobs.read_jobs(args.jobs)
+
+    try:
+        initialize_maya(scene_path)
+
+    except RuntimeError as error:
+        for job in jobs:
+            report(alembic_jobs.FAILED, job.job_id, error='Could not open {}: {}'.format(scene_path, error))
+
+        return 1
+
+    exit_code = 0
+
+    scratch_directory = options.get('scratch_directory')
+    transfers = None
+    failures = []
+
+    if scratch_directory is not None:
+        transfers = transfer_queue.TransferQueue(bytes_per_second=options.get('bytes_per_second', 0))
+
+    temp_paths = get_temp_paths(jobs, scratch_directory)
+    pending = alembic_jobs.batch_jobs(jobs, lambda job: get_job_string(job, temp_paths[job.job_id]))
+
+    while pending:
+        batch = pending.pop(0)
+
+        for job, _ in batch:
+            report(alembic_jobs.STARTED, job.job_id)
+
+        start = time.time()
+
+        try:
+            export_batch(batch, temp_paths, commit=transfers is None)
+
+        except (RuntimeError, IOError, OSError) as error:
+            # Export jobs of a failed call one by one, to only fail the
+            # jobs that can not be exported.
+            if len(batch) > 1:
+                pending[:0] = [[job_and_string] for job_and_string in batch]
+
+                continue
+
+            report(alembic_jobs.FAILED, batch[0][0].job_id, error=str(error))
+            exit_code = 1
+
+            continue
+
+        export_seconds = time.time() - start
+
+        # Transfer staged files while next jobs are exported.
+        if transfers is not None:
+            for job, _ in batch:
+                destinations = [job.output_path]
+
+                if job.publish_directory is not None:
+                    destinations.append(job.publish_path)
+
+                transfers.add(temp_paths[job.job_id],
+                              destinations,
+                              callback=lambda result, job=job, seconds=export_seconds, jobs_in_call=len(batch):
+                                  on_transferred(result, job, seconds, jobs_in_call, failures))
+
+            continue
+
+        for job, _ in batch:
+            start = time.time()
+
+            try:
+                if job.publish_directory is not None:
+                    publish_job(job)
+
+            except (IOError, OSError) as error:
+                report(alembic_jobs.FAILED, job.job_id, error=str(error))
+                exit_code = 1
+
+                continue
+
+            report(alembic_jobs.DONE,
+                   job.job_id,
+                   seconds=export_seconds,
+                   publish_seconds=time.time() - start if job.publish_directory is not None else 0.0,
+                   jobs_in_call=len(batch),
+                   file_size=os.path.getsize(job.output_path))
+
+    if transfers is not None:
+        transfers.wait()
+
+        if failures:
+            exit_code = 1
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
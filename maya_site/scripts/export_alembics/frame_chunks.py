@@ -0,0 +1,276 @@
+""" Splits alembic jobs of long shots into frame chunks exported at the same
+time by several workers, chunks are stitched back into one alembic with
+abcstitcher and validated against what a serial export writes: same objects
+and one sample per frame.
+
+Chunks are evaluated from their first frame, without the frames before it.
+Simulations (cloth, hair, fx, crowd) would restart at every chunk, so steps
+and scenes that simulate are never split.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+import re
+import subprocess
+import uuid
+
+try:
+    import alembic
+except ImportError:
+    alembic = None
+
+import alembic_jobs
+
+
+## Environment variable with the full path of abcstitcher.
+# type: str
+STITCHER_VARIABLE = 'ALEMBIC_STITCHER'
+
+## Shortest chunk, shorter chunks cost more opening the scene than they save.
+# type: int
+MIN_CHUNK_FRAMES = 50
+
+## Steps simulating over time, cloth, fx and crowd.
+# type: []
+SIMULATED_STEPS = ['cfx', 'sfx', 'crw']
+
+## Node types evaluated from previous frames, plugin types are only found
+# if their plugin is loaded.
+# type: []
+DYNAMIC_NODE_TYPES = ['nucleus',
+                      'hairSystem',
+                      'particle',
+                      'fluidShape',
+                      'rigidSolver',
+                      'bifrostGraphShape',
+                      'CrowdManagerNode',
+                      'McdGlobal']
+
+## Finds the step between samples in AbcExport options.
+# type: regex
+_STEP_PATTERN = re.compile(r'-step ([0-9.]+)')
+
+
+def find_stitcher():
+    """ Finds abcstitcher, from ALEMBIC_STITCHER, maya bin directory or PATH.
+    Return:
+        String representing abcstitcher full path, None if not found.
+    """
+
+    stitcher_path = os.environ.get(STITCHER_VARIABLE)
+
+    if stitcher_path and os.path.isfile(stitcher_path):
+        return stitcher_path.replace('\\', '/')
+
+    executable_name = 'abcstitcher.exe' if os.name == 'nt' else 'abcstitcher'
+
+    directories = [os.path.join(os.environ.get('MAYA_LOCATION', ''), 'bin')]
+    directories.extend(os.environ.get('PATH', '').split(os.pathsep))
+
+    for directory in directories:
+        stitcher_path = os.path.join(directory, executable_name)
+
+        if directory and os.path.isfile(stitcher_path):
+            return stitcher_path.replace('\\', '/')
+
+    return None
+
+
+def split_frame_range(start_time, end_time, chunks, min_frames=MIN_CHUNK_FRAMES):
+    """ Splits a frame range into consecutive ranges without shared frames.
+    Args:
+        start_time: Float representing the first frame.
+        end_time: Float representing the last frame.
+        chunks: Integer representing the amount of ranges wanted.
+        min_frames: Integer representing the fewest frames of a range.
+    Return:
+        List of tuples (first frame, last frame), one if range is too short.
+    """
+
+    start_time = int(round(float(start_time)))
+    end_time = int(round(float(end_time)))
+    frames = end_time - start_time + 1
+
+    chunks = max(1, min(chunks, frames // max(min_frames, 1)))
+    chunk_size, remainder = divmod(frames, chunks)
+
+    frame_ranges = []
+    first_frame = start_time
+
+    for index in range(chunks):
+        last_frame = first_frame + chunk_size - 1 + (1 if index < remainder else 0)
+        frame_ranges.append((first_frame, last_frame))
+        first_frame = last_frame + 1
+
+    return frame_ranges
+
+
+def get_chunking_issue(step, dynamic_nodes):
+    """ Checks if jobs of a scene can be exported in frame chunks.
+    Args:
+        step: String representing the step of the scene, None if unknown.
+        dynamic_nodes: List of string representing simulation nodes of the
+        scene (see DYNAMIC_NODE_TYPES).
+    Return:
+        String representing why jobs can not be split, empty if they can.
+    """
+
+    if step in SIMULATED_STEPS:
+        return 'Step {} simulates over time, chunks would restart the simulation.'.format(step)
+
+    if dynamic_nodes:
+        return 'Scene simulates over time ({}), chunks would restart the simulation.'.format(', '.join(dynamic_nodes[:3]))
+
+    return ''
+
+
+def get_step(alembic_options):
+    """ Gets the frames between samples of AbcExport options.
+    Args:
+        alembic_options: String representing the options.
+    Return:
+        Float representing the step, 1.0 if not set.
+    """
+
+    match = _STEP_PATTERN.search(alembic_options)
+
+    return float(match.group(1)) if match else 1.0
+
+
+def get_chunk_directory(output_path, scratch_directory=None):
+    """ Gets a new directory to export the chunks of an alembic into. The
+    scratch directory is shared by every shot and maya session of the
+    machine, so the directory is unique to this export and removing it once
+    stitched only removes its own chunks.
+    Args:
+        output_path: String representing the alembic full path.
+        scratch_directory: String representing the local scratch directory,
+        None to use the alembic directory.
+    Return:
+        String representing the directory, a different one every call.
+    """
+
+    directory, file_name = os.path.split(output_path)
+    chunk_folder = '.{}_{}_chunks'.format(os.path.splitext(file_name)[0], uuid.uuid4().hex)
+
+    return os.path.join(scratch_directory or directory, chunk_folder).replace('\\', '/')
+
+
+def create_chunk_jobs(job, frame_ranges, chunk_directory):
+    """ Creates a job per frame range, exporting the roots of a job. With
+    several samples per frame, chunks end at the last sample before the next
+    chunk, so no sample is lost.
+    Args:
+        job: AlembicJob to split.
+        frame_ranges: List of tuples (first frame, last frame).
+        chunk_directory: String representing where chunks are exported.
+    Return:
+        List of AlembicJob, not published.
+    """
+
+    step = get_step(job.alembic_options)
+    chunk_jobs = []
+
+    for index, (first_frame, last_frame) in enumerate(frame_ranges):
+        chunk_path = '{}/{}.{}_{}.abc'.format(chunk_directory, job.name, first_frame, last_frame)
+        end_time = last_frame
+
+        if step < 1.0 and index < len(frame_ranges) - 1:
+            end_time = last_frame + 1 - step
+
+        chunk_jobs.append(alembic_jobs.AlembicJob('{} [{}-{}]'.format(job.name, first_frame, last_frame),
+                                                  job.roots,
+                                                  chunk_path,
+                                                  first_frame,
+                                                  end_time,
+                                                  camera=job.camera,
+                                                  alembic_options=job.alembic_options))
+
+    return chunk_jobs
+
+
+def stitch_chunks(stitcher_path, merged_path, chunk_paths):
+    """ Stitches chunks in frame order into one alembic.
+    Args:
+        stitcher_path: String representing abcstitcher full path.
+        merged_path: String representing the alembic to create.
+        chunk_paths: List of string representing chunks in frame order.
+    """
+
+    process = subprocess.Popen([stitcher_path, merged_path] + list(chunk_paths),
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT)
+    output = process.communicate()[0]
+
+    if process.returncode != 0 or not os.path.isfile(merged_path):
+        raise RuntimeError('abcstitcher failed ({}): {}'.format(process.returncode,
+                                                              output.decode('utf-8', 'replace').strip()))
+
+    return
+
+
+def read_archive(full_path):
+    """ Reads objects and samples of an alembic, requires alembic module.
+    Args:
+        full_path: String representing the alembic full path.
+    Return:
+        Tuple (set of object full names, most samples of a time sampling).
+    """
+
+    archive = alembic.Abc.IArchive(str(full_path))
+
+    object_names = set()
+    pending = [archive.getTop()]
+
+    while pending:
+        alembic_object = pending.pop()
+        object_names.add(alembic_object.getFullName())
+        pending.extend(alembic_object.children)
+
+    samples = 0
+
+    for index in range(archive.getNumTimeSamplings()):
+        samples = max(samples, archive.getMaxNumSamplesForTimeSamplingIndex(index))
+
+    return object_names, samples
+
+
+def validate_merged(merged_path, chunk_paths, start_time, end_time, step=1.0):
+    """ Checks a stitched alembic holds what a serial export of the frame
+    range holds: every object of the chunks and one sample per step. Without
+    alembic module only size is checked.
+    Args:
+        merged_path: String representing the stitched alembic.
+        chunk_paths: List of string representing the chunks.
+        start_time: Float representing the first frame.
+        end_time: Float representing the last frame.
+        step: Float representing the frames between samples.
+    Return:
+        String representing why it is not valid, empty if valid.
+    """
+
+    if not os.path.isfile(merged_path):
+        return 'Stitched alembic does not exist.'
+
+    if alembic is None:
+        if os.path.getsize(merged_path) < max(os.path.getsize(chunk_path) for chunk_path in chunk_paths):
+            return 'Stitched alembic is smaller than one of its chunks.'
+
+        return ''
+
+    merged_names, merged_samples = read_archive(merged_path)
+
+    for chunk_path in chunk_paths:
+        chunk_names = read_archive(chunk_path)[0]
+
+        if chunk_names != merged_names:
+            return 'Objects of {} differ from stitched alembic.'.format(os.path.basename(chunk_path))
+
+    samples = int(round((float(end_time) - float(start_time)) / step)) + 1
+
+    # Static alembics have one sample whatever the frame range.
+    if merged_samples > 1 and merged_samples != samples:
+        return 'Stitched alembic has {} samples, a serial export has {}.'.format(merged_samples, samples)
+
+    return ''
@@ -0,0 +1,136 @@
+""" Stitches frame chunks of alembic jobs exported by several workers into
+their output alembic, validates it and publishes it. Run with mayapy by the
+export queue when every chunk of a job was exported, maya is not initialized.
+Events are printed like export_worker does.
+
+Usage:
+    mayapy merge_chunks.py --jobs D:/temp/alembic_jobs.json
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+import alembic_jobs
+import frame_chunks
+import publish_strategies
+
+
+def report(event, job_id, **values):
+    """ Prints an event line for the export queue.
+    """
+
+    sys.stdout.write(alembic_jobs.format_event(event, job_id, **values) + '\n')
+    sys.stdout.flush()
+
+    return
+
+
+def merge_job(job, chunk_paths, stitcher_path):
+    """ Stitches the chunks of a job into its output path, through a
+    temporary file renamed once the stitched alembic is valid.
+    Args:
+        job: AlembicJob which frame range was exported in chunks.
+        chunk_paths: List of string representing chunks in frame order.
+        stitcher_path: String representing abcstitcher full path.
+    """
+
+    output_directory = os.path.dirname(job.output_path)
+
+    try:
+        os.makedirs(output_directory)
+
+    except OSError:
+        if not os.path.isdir(output_directory):
+            raise
+
+    temp_path = publish_strategies.temp_path_for(job.output_path)
+
+    try:
+        frame_chunks.stitch_chunks(stitcher_path, temp_path, chunk_paths)
+
+        error = frame_chunks.validate_merged(temp_path,
+                                             chunk_paths,
+                                             job.start_time,
+                                             job.end_time,
+                                             step=frame_chunks.get_step(job.alembic_options))
+
+        if error:
+            raise RuntimeError(error)
+
+        publish_strategies.commit_file(temp_path, job.output_path)
+
+    finally:
+        publish_strategies.remove_file(temp_path)
+
+    return
+
+
+def main(argv=None):
+    """ Merges the jobs of a jobs file, options hold the stitcher and the
+    chunk paths of every job id.
+    Args:
+        argv: List of command line arguments, sys.argv if None.
+    Return:
+        Integer exit code, 0 if every job was merged.
+    """
+
+    parser = argparse.ArgumentParser(description='Stitch frame chunks of alembic jobs.')
+    parser.add_argument('--jobs', required=True, help='Jobs file written by the export queue.')
+
+    args = parser.parse_args(argv)
+
+    _, jobs, options = alembic_jobs.read_jobs(args.jobs)
+
+    exit_code = 0
+
+    for job in jobs:
+        report(alembic_jobs.STARTED, job.job_id)
+
+        # Json keys are strings.
+        chunk_paths = options['chunk_paths'][str(job.job_id)]
+        start = time.time()
+
+        try:
+            merge_job(job, chunk_paths, options['stitcher'])
+
+        except (RuntimeError, IOError, OSError) as error:
+            # Chunks are kept to stitch them by hand.
+            report(alembic_jobs.FAILED,
+                   job.job_id,
+                   error='Could not stitch chunks in {}: {}'.format(os.path.dirname(chunk_paths[0]), error))
+            exit_code = 1
+
+            continue
+
+        merge_seconds = time.time() - start
+        start = time.time()
+
+        try:
+            if job.publish_directory is not None:
+                publish_strategies.publish_file(job.output_path, job.publish_path)
+
+        except (IOError, OSError) as error:
+            report(alembic_jobs.FAILED, job.job_id, error=str(error))
+            exit_code = 1
+
+            continue
+
+        # Chunk directory is unique to this job, see get_chunk_directory.
+        shutil.rmtree(os.path.dirname(chunk_paths[0]), ignore_errors=True)
+
+        report(alembic_jobs.DONE,
+               job.job_id,
+               seconds=merge_seconds,
+               publish_seconds=time.time() - start if job.publish_directory is not None else 0.0,
+               file_size=os.path.getsize(job.output_path))
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
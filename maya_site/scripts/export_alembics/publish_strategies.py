@@ -0,0 +1,275 @@
+""" Ways to publish exported alembics without copying them when possible.
+Files are always written to a temporary name next to the destination and
+renamed at the end, so nobody reading the destination sees half written files.
+
+Strategies, tried in order by publish_file:
+    RENAME: moves the file, same volume only, the source is gone.
+    HARDLINK: links the same data under another name, same volume only.
+    Only used if asked for: a published file hardlinked to a workFile export
+    changes if the export is edited in place.
+    REFLINK: copy on write clone (btrfs, xfs, apfs), data is shared until
+    one of the files changes.
+    COPY: streams the data in chunks.
+
+Exports are written to a temporary name and renamed too, so a new export
+never overwrites data hardlinked into a published file.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+import shutil
+import sys
+import uuid
+
+
+## Moves the file, the source does not exist after.
+# type: str
+RENAME = 'rename'
+
+## Hardlinks the file.
+# type: str
+HARDLINK = 'hardlink'
+
+## Clones the file with copy on write.
+# type: str
+REFLINK = 'reflink'
+
+## Copies the file in chunks.
+# type: str
+COPY = 'copy'
+
+## Uses the cheapest strategy that works.
+# type: str
+AUTO = 'auto'
+
+## Strategies tried by AUTO when source is kept, published files must not
+# share data with the mutable source, so HARDLINK is left out.
+# type: []
+KEEP_SOURCE_STRATEGIES = [REFLINK, COPY]
+
+## Strategies tried by AUTO when source can be moved.
+# type: []
+MOVE_SOURCE_STRATEGIES = [RENAME, REFLINK, COPY]
+
+## Bytes copied at once by COPY.
+# type: int
+CHUNK_SIZE = 8 * 1024 * 1024
+
+## ioctl request cloning a file on linux (FICLONE).
+# type: int
+_FICLONE = 0x40049409
+
+
+def temp_path_for(path):
+    """ Composes a unique temporary path next to a file, keeping its extension
+    so tools writing it (eg. AbcExport) do not add another one.
+    Args:
+        path: String representing the final full path.
+    Return:
+        String representing the temporary full path.
+    """
+
+    directory, file_name = os.path.split(path)
+    name, extension = os.path.splitext(file_name)
+
+    temp_name = '.{}.{}.tmp{}'.format(name, uuid.uuid4().hex[:12], extension)
+
+    return os.path.join(directory, temp_name).replace('\\', '/')
+
+
+def remove_file(path):
+    """ Removes a file if it exists.
+    """
+
+    try:
+        os.remove(path)
+
+    except OSError:
+        pass
+
+    return
+
+
+def commit_file(temp_path, destination):
+    """ Renames a temporary file into its destination at once, replacing the
+    destination if it exists.
+    Args:
+        temp_path: String representing the temporary full path.
+        destination: String representing the final full path.
+    """
+
+    replace = getattr(os, 'replace', None)
+
+    if replace is not None:
+        replace(temp_path, destination)
+
+        return
+
+    # Python 2 can not replace files on windows with rename.
+    if os.name == 'nt' and os.path.exists(destination):
+        os.remove(destination)
+
+    os.rename(temp_path, destination)
+
+    return
+
+
+def hardlink_file(source, destination):
+    """ Hardlinks source into destination, fails across volumes.
+    """
+
+    link = getattr(os, 'link', None)
+
+    if link is None:
+        raise OSError('Hardlinks are not supported.')
+
+    link(source, destination)
+
+    return
+
+
+def reflink_file(source, destination):
+    """ Clones source into destination sharing its data (copy on write),
+    fails if the filesystem does not support it.
+    """
+
+    if sys.platform.startswith('linux'):
+        import fcntl
+
+        with open(source, 'rb') as source_file:
+            with open(destination, 'wb') as destination_file:
+                try:
+                    fcntl.ioctl(destination_file.fileno(), _FICLONE, source_file.fileno())
+
+                except (IOError, OSError):
+                    destination_file.close()
+                    remove_file(destination)
+
+                    raise
+
+        return
+
+    if sys.platform == 'darwin':
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+        if libc.clonefile(source.encode('utf-8'), destination.encode('utf-8'), 0) != 0:
+            raise OSError(ctypes.get_errno(), 'clonefile failed')
+
+        return
+
+    raise OSError('Reflinks are not supported on {}.'.format(sys.platform))
+
+
+def copy_file(source, destination, chunk_size=CHUNK_SIZE, on_chunk=None):
+    """ Copies source into destination in chunks, flushed to disk.
+    Args:
+        source: String representing the file to copy.
+        destination: String representing the full path to create.
+        chunk_size: Integer representing the bytes copied at once.
+        on_chunk: Function called with the size of every chunk before
+        writing it (eg. to limit bandwidth).
+    """
+
+    with open(source, 'rb') as source_file:
+        with open(destination, 'wb') as destination_file:
+            while True:
+                chunk = source_file.read(chunk_size)
+
+                if not chunk:
+                    break
+
+                if on_chunk is not None:
+                    on_chunk(len(chunk))
+
+                destination_file.write(chunk)
+
+            destination_file.flush()
+            os.fsync(destination_file.fileno())
+
+    shutil.copystat(source, destination)
+
+    return
+
+
+## Function of every strategy, (source, destination).
+# type: {}
+_STRATEGY_FUNCTIONS = {RENAME: commit_file,
+                       HARDLINK: hardlink_file,
+                       REFLINK: reflink_file,
+                       COPY: copy_file}
+
+
+def publish_file(source, destination, strategy=AUTO, keep_source=True):
+    """ Publishes a file into destination through a temporary file renamed at
+    the end, destination is replaced if it exists.
+    Args:
+        source: String representing the file to publish.
+        destination: String representing the published full path.
+        strategy: String representing the strategy, AUTO tries the cheapest.
+        keep_source: False if source can be moved, only used by AUTO.
+    Return:
+        String representing the strategy used.
+    """
+
+    destination_directory = os.path.dirname(destination)
+
+    if destination_directory and not os.path.isdir(destination_directory):
+        try:
+            os.makedirs(destination_directory)
+
+        except OSError:
+            if not os.path.isdir(destination_directory):
+                raise
+
+    if strategy != AUTO:
+        strategies = [strategy]
+
+    elif keep_source:
+        strategies = KEEP_SOURCE_STRATEGIES
+
+    else:
+        strategies = MOVE_SOURCE_STRATEGIES
+
+    temp_path = temp_path_for(destination)
+    error = None
+
+    for strategy_name in strategies:
+        # Renaming is atomic already, and fails across volumes.
+        if strategy_name == RENAME:
+            try:
+                commit_file(source, destination)
+
+            except (IOError, OSError) as strategy_error:
+                error = strategy_error
+
+                continue
+
+            return strategy_name
+
+        try:
+            _STRATEGY_FUNCTIONS[strategy_name](source, temp_path)
+
+        except (IOError, OSError) as strategy_error:
+            remove_file(temp_path)
+            error = strategy_error
+
+            continue
+
+        try:
+            commit_file(temp_path, destination)
+
+        except (IOError, OSError):
+            remove_file(temp_path)
+
+            raise
+
+        if not keep_source:
+            remove_file(source)
+
+        return strategy_name
+
+    raise error
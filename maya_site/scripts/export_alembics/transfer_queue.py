@@ -0,0 +1,234 @@
+""" Transfers alembics exported to a local scratch disk into their work and
+publish locations in background threads, retrying failed transfers and
+sharing a bandwidth limit, so exports do not wait for network disks.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from multiprocessing.pool import ThreadPool
+
+import publish_strategies
+
+
+## Environment variable with the local scratch directory.
+# type: str
+SCRATCH_VARIABLE = 'ALEMBIC_SCRATCH_DIR'
+
+## Times a failed transfer is tried again.
+# type: int
+RETRIES = 3
+
+## Seconds waited before the first retry, doubled on every retry.
+# type: float
+RETRY_DELAY = 2.0
+
+
+def get_scratch_directory():
+    """ Gets the local scratch directory, from ALEMBIC_SCRATCH_DIR or the
+    temporary directory of the system.
+    Return:
+        String representing the directory with forward slashes.
+    """
+
+    scratch_directory = os.environ.get(SCRATCH_VARIABLE) or os.path.join(tempfile.gettempdir(), 'alembic_scratch')
+
+    return scratch_directory.replace('\\', '/')
+
+
+class BandwidthLimiter(object):
+    """ Limits bytes per second written by several threads together.
+    """
+
+    def __init__(self, bytes_per_second=0):
+
+        ## Bytes allowed per second, 0 for no limit.
+        # type: int
+        self.bytes_per_second = bytes_per_second
+
+        self._lock = threading.Lock()
+        self._next_time = time.time()
+
+    def consume(self, size):
+        """ Waits until size bytes can be written without going over the limit.
+        Args:
+            size: Integer representing the bytes about to be written.
+        """
+
+        if not self.bytes_per_second:
+            return
+
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next_time)
+            self._next_time = start + size / float(self.bytes_per_second)
+
+        if start > now:
+            time.sleep(start - now)
+
+        return
+
+
+class TransferResult(object):
+    """ Result of transferring a file into its destinations.
+    """
+
+    def __init__(self, source, destinations, seconds=0.0, attempts=0, error=None):
+
+        ## Scratch full path of the file.
+        # type: str
+        self.source = source
+
+        ## Full paths the file was transferred into.
+        # type: [str]
+        self.destinations = destinations
+
+        ## Seconds spent transferring, retries included.
+        # type: float
+        self.seconds = seconds
+
+        ## Amount of tries.
+        # type: int
+        self.attempts = attempts
+
+        ## Error message if transfer failed, None otherwise.
+        # type: str
+        self.error = error
+
+    @property
+    def succeeded(self):
+
+        return self.error is None
+
+
+class TransferQueue(object):
+    """ Transfers files with a bounded pool of threads.
+    """
+
+    def __init__(self, workers=2, bytes_per_second=0, retries=RETRIES, retry_delay=RETRY_DELAY):
+
+        ## Limit shared by every transfer.
+        # type: BandwidthLimiter
+        self.limiter = BandwidthLimiter(bytes_per_second)
+
+        ## Times a failed transfer is tried again.
+        # type: int
+        self.retries = retries
+
+        ## Seconds waited before the first retry.
+        # type: float
+        self.retry_delay = retry_delay
+
+        self._pool = ThreadPool(workers)
+
+    def add(self, source, destinations, callback=None, keep_source=False):
+        """ Queues the transfer of a file.
+        Args:
+            source: String representing the file on scratch disk.
+            destinations: List of string representing the full paths to
+            create, first one is copied and the rest linked to it if possible.
+            callback: Function called with the TransferResult, in the thread
+            transferring.
+            keep_source: True to keep source after the transfer.
+        """
+
+        self._pool.apply_async(self.transfer, (source, destinations, keep_source), callback=callback)
+
+        return
+
+    def wait(self):
+        """ Waits for every queued transfer, no more transfers can be added.
+        """
+
+        self._pool.close()
+        self._pool.join()
+
+        return
+
+    def copy_throttled(self, source, destination):
+        """ Copies a file within the bandwidth limit, through a temporary file.
+        Args:
+            source: String representing the file to copy.
+            destination: String representing the full path to create.
+        """
+
+        destination_directory = os.path.dirname(destination)
+
+        try:
+            os.makedirs(destination_directory)
+
+        except OSError:
+            if not os.path.isdir(destination_directory):
+                raise
+
+        temp_path = publish_strategies.temp_path_for(destination)
+
+        try:
+            publish_strategies.copy_file(source, temp_path, on_chunk=self.limiter.consume)
+            publish_strategies.commit_file(temp_path, destination)
+
+        finally:
+            publish_strategies.remove_file(temp_path)
+
+        return
+
+    def transfer_once(self, source, destinations):
+        """ Transfers a file into its destinations, other destinations are
+        cloned from the first one when possible. They are never hardlinked,
+        the first destination is a workFile that can change.
+        Args:
+            source: String representing the file on scratch disk.
+            destinations: List of string representing the full paths.
+        """
+
+        self.copy_throttled(source, destinations[0])
+
+        for destination in destinations[1:]:
+            try:
+                publish_strategies.publish_file(destinations[0], destination, strategy=publish_strategies.REFLINK)
+
+            except (IOError, OSError):
+                self.copy_throttled(source, destination)
+
+        return
+
+    def transfer(self, source, destinations, keep_source=False):
+        """ Transfers a file, retrying with increasing delay if it fails.
+        Runs in worker threads.
+        Args:
+            source: String representing the file on scratch disk.
+            destinations: List of string representing the full paths.
+            keep_source: True to keep source after the transfer.
+        Return:
+            TransferResult.
+        """
+
+        start = time.time()
+        error = None
+        attempt = 0
+
+        for attempt in range(1, self.retries + 2):
+            try:
+                self.transfer_once(source, destinations)
+
+            except (IOError, OSError) as transfer_error:
+                error = str(transfer_error)
+
+                if attempt <= self.retries:
+                    time.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+                continue
+
+            error = None
+
+            break
+
+        # Failed files stay on scratch disk, to be recovered.
+        if error is None and not keep_source:
+            publish_strategies.remove_file(source)
+
+        return TransferResult(source, destinations, time.time() - start, attempt, error)
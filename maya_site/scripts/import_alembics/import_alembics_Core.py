@@ -3,13 +3,14 @@
 @author Esteban Ortega <brutools@gmail.com>
 """
 
-import os
 import sys
 import pymel
 
 from PySide2 import QtWidgets
 from PySide2 import QtCore
 
+from common_utils import root_paths
+
 class ImportAlembicsCore(QtWidgets.QFileDialog):
     """ Creates a QFileDialog window to import alembic files.
     """
@@ -28,7 +29,7 @@ class ImportAlembicsCore(QtWidgets.QFileDialog):
         """ Sets the default directory.
         """
 
-        default_dir = os.path.expandvars('%ADI_ROOT_FOLDER%')
+        default_dir = root_paths.get_root_directory()
         QDirectory = QtCore.QDir(default_dir)
 
         self.setDirectory(QDirectory)
@@ -9,6 +9,8 @@ import maya.mel
 from PySide2 import QtWidgets
 from jobin_UI import JobInUI
 
+from common_utils import root_paths
+
 
 class JobInCore(JobInUI):
     """ Class with methods to work with jobin information.
@@ -494,7 +496,10 @@ class JobInCore(JobInUI):
         else:
             assetName, assetType = shotAsset        
         
-        root_dir = os.path.expandvars('%ADI_ROOT_FOLDER%')
+        root_dir = root_paths.get_root_directory()
+
+        if not root_dir:
+            return
 
         if seq:
             full_path = os.path.join(root_dir, seq, shot, step, 'workFile')
@@ -599,6 +604,15 @@ class JobInCore(JobInUI):
         """ Populate shotAsset comboBox. 
         """
 
+        # Without root folder shots and assets would be searched in the
+        # current directory.
+        if not root_paths.get_root_directory():
+            self.shotAsset_comboBox.clear()
+            self.show_info_msg('{} environment variable is not set!\n'
+                               'Shots and assets can not be found.'.format(root_paths.ROOT_VARIABLE))
+
+            return
+
         if self.shot_radioButton.isChecked():
 
             self.populate_shots_comboBox()
@@ -634,7 +648,7 @@ class JobInCore(JobInUI):
         """ Populate with shots comboBox.
         """
 
-        root_folder = os.path.expandvars('%ADI_ROOT_FOLDER%')
+        root_folder = root_paths.get_root_directory()
 
         shots_directory = {}
 
@@ -721,7 +735,7 @@ class JobInCore(JobInUI):
         """ Gets assets directory from project root folder.
         """
 
-        root_dir = os.path.expandvars('%ADI_ROOT_FOLDER%')
+        root_dir = root_paths.get_root_directory()
         
         return os.path.join(root_dir, 'assets')
 
@@ -0,0 +1,284 @@
+""" Copy engine used to pack files, copies files natively using a bounded pool
+of worker threads.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+import time
+
+from multiprocessing.pool import ThreadPool
+
+import pack_checksums
+
+
+class CopyResult(object):
+    """ Result of a single file copy.
+    """
+
+    def __init__(self, source, destination, size=0, error=None, saved=0, digest=None):
+
+        ## Source full path name.
+        # type: str
+        self.source = source
+
+        ## Destination full path name.
+        # type: str
+        self.destination = destination
+
+        ## Amount of bytes copied.
+        # type: int
+        self.size = size
+
+        ## Error message if copy failed, None otherwise.
+        # type: str
+        self.error = error
+
+        ## Amount of bytes not written thanks to a content store.
+        # type: int
+        self.saved = saved
+
+        ## Hex digest of the contents copied.
+        # type: str
+        self.digest = digest
+
+    @property
+    def succeeded(self):
+        """ True if file was copied, False otherwise.
+        """
+
+        return self.error is None
+
+
+class CopyReport(object):
+    """ Gathers the results of a copy session.
+    """
+
+    def __init__(self):
+
+        ## Amount of files copied.
+        # type: int
+        self.files_copied = 0
+
+        ## Amount of bytes copied.
+        # type: int
+        self.bytes_copied = 0
+
+        ## Amount of bytes not written thanks to a content store.
+        # type: int
+        self.bytes_saved = 0
+
+        ## Amount of files skipped as already packed.
+        # type: int
+        self.files_up_to_date = 0
+
+        ## Seconds spent copying.
+        # type: float
+        self.elapsed = 0.0
+
+        ## Results of files that could not be copied.
+        # type: [CopyResult]
+        self.failures = []
+
+    def add(self, result):
+        """ Adds a copy result to the report.
+        Args:
+            result: CopyResult of a finished copy.
+        """
+
+        if result.succeeded:
+            self.files_copied += 1
+            self.bytes_copied += result.size
+            self.bytes_saved += result.saved
+
+        else:
+            self.failures.append(result)
+
+        return
+
+    @property
+    def throughput(self):
+        """ Bytes copied per second.
+        """
+
+        if not self.elapsed:
+            return 0.0
+
+        return self.bytes_copied / self.elapsed
+
+    def summary(self, convert_size=None):
+        """ Composes a readable summary of the copy session.
+        Args:
+            convert_size: Function to convert bytes into readable string.
+        Return:
+            String representing the summary.
+        """
+
+        if convert_size is None:
+            convert_size = lambda size_bytes: '{} B'.format(size_bytes)
+
+        lines = ['Files copied: {}'.format(self.files_copied),
+                 'Files up to date: {}'.format(self.files_up_to_date),
+                 'Size copied: {}'.format(convert_size(self.bytes_copied)),
+                 'Time: {:.1f} s'.format(self.elapsed),
+                 'Throughput: {}/s'.format(convert_size(int(self.throughput)))]
+
+        if self.bytes_saved:
+            lines.append('Saved by store: {}'.format(convert_size(self.bytes_saved)))
+
+        if self.failures:
+            lines.append('Failed: {}'.format(len(self.failures)))
+
+            for result in self.failures:
+                lines.append('  {} ({})'.format(result.source, result.error))
+
+        return '\n'.join(lines)
+
+
+class CopyEngine(object):
+    """ Copies files using a bounded pool of threads, hashing contents while
+    they are copied. Every finished copy is reported through on_file_copied
+    callback from the calling thread.
+    """
+
+    ## Default amount of threads copying at the same time.
+    # type: int
+    DEFAULT_WORKERS = 8
+
+    def __init__(self, workers=None, on_file_copied=None, manifest=None, store=None, checksums=None):
+
+        ## Amount of threads copying at the same time.
+        # type: int
+        self.workers = max(1, workers or self.DEFAULT_WORKERS)
+
+        ## Function called as on_file_copied(result, done, total).
+        # type: function
+        self.on_file_copied = on_file_copied
+
+        ## Manifest of the pack, if set only new or changed files are copied.
+        # type: PackManifest
+        self.manifest = manifest
+
+        ## Content store, if set files are stored once and linked into place.
+        # type: ContentStore
+        self.store = store
+
+        ## Checksums of the pack, every copied file is recorded into it.
+        # type: ChecksumManifest
+        self.checksums = checksums
+
+        ## Hash algorithm of files contents while they are copied.
+        # type: str
+        self.algorithm = checksums.algorithm if checksums is not None else pack_checksums.DEFAULT_ALGORITHM
+
+    def copy(self, jobs):
+        """ Copies every source into its destination.
+        Args:
+            jobs: List of tuples (source full path, destination full path).
+        Return:
+            CopyReport with the results.
+        """
+
+        report = CopyReport()
+
+        if self.manifest is not None:
+            jobs, up_to_date = self.manifest.filter_jobs(jobs)
+            report.files_up_to_date = len(up_to_date)
+
+            if self.checksums is not None:
+                self.record_missing_checksums(up_to_date)
+
+        total = len(jobs)
+
+        if not total:
+            if self.checksums is not None and self.checksums.checksums:
+                self.checksums.save()
+
+            return report
+
+        self.create_destination_directories(jobs)
+
+        start = time.time()
+        pool = ThreadPool(min(self.workers, total))
+
+        try:
+            for done, result in enumerate(pool.imap_unordered(self.copy_file, jobs), 1):
+                report.add(result)
+
+                if result.succeeded:
+                    if self.manifest is not None:
+                        self.manifest.record(result.source,
+                                             result.destination,
+                                             digest=result.digest,
+                                             algorithm=self.algorithm)
+
+                    if self.checksums is not None:
+                        self.checksums.record(result.destination, result.digest)
+
+                if self.on_file_copied is not None:
+                    self.on_file_copied(result, done, total)
+
+        finally:
+            pool.close()
+            pool.join()
+
+            if self.manifest is not None:
+                self.manifest.save()
+
+            if self.checksums is not None:
+                self.checksums.save()
+
+        report.elapsed = time.time() - start
+
+        return report
+
+    def record_missing_checksums(self, jobs):
+        """ Hashes packed files skipped as up to date without a checksum, it
+        happens when the checksum algorithm changed since previous pack.
+        Args:
+            jobs: List of tuples (source full path, destination full path).
+        """
+
+        for _, destination in jobs:
+            if self.checksums.relative_path(destination) not in self.checksums.checksums:
+                self.checksums.record(destination, pack_checksums.hash_file(destination, self.algorithm))
+
+        return
+
+    def create_destination_directories(self, jobs):
+        """ Creates destination directories before copying, so threads do not
+        race creating the same directory.
+        Args:
+            jobs: List of tuples (source full path, destination full path).
+        """
+
+        directories = set(os.path.dirname(destination) for _, destination in jobs)
+
+        for directory in directories:
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+
+        return
+
+    def copy_file(self, job):
+        """ Copies one file, runs in a worker thread.
+        Args:
+            job: Tuple (source full path, destination full path).
+        Return:
+            CopyResult of the copy.
+        """
+
+        source, destination = job
+
+        try:
+            if self.store is not None:
+                size, saved, digest = self.store.place(source, destination)
+
+                return CopyResult(source, destination, size=size, saved=saved, digest=digest)
+
+            size, digest = pack_checksums.copy_with_hash(source, destination, self.algorithm)
+
+        except (IOError, OSError) as error:
+            return CopyResult(source, destination, error=str(error))
+
+        return CopyResult(source, destination, size=size, digest=digest)
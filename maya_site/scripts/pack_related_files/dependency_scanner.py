@@ -0,0 +1,199 @@
+""" Scans current maya file for every file it depends on, xgen collections,
+images, references and the file itself. Used by pack UI and headless packing.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import collections
+import os
+
+import pymel
+import xgenm
+
+import maya.api.OpenMaya as om
+
+import reference_walker
+import xgen_collections
+
+from common_utils import maya_ascii
+from common_utils import texture_tiles
+
+
+## Category for xgen files.
+# type: str
+XGEN = 'Xgen'
+
+## Category for image files.
+# type: str
+IMAGES = 'Images'
+
+## Category for referenced files.
+# type: str
+REFERENCES = 'References'
+
+## Category for alembic and gpu caches.
+# type: str
+CACHES = 'Caches'
+
+## Category for current maya file.
+# type: str
+CURRENT_FILE = 'Current_File'
+
+## Categories in the order they are shown.
+# type: []
+CATEGORIES = [XGEN, IMAGES, REFERENCES, CACHES, CURRENT_FILE]
+
+## Category by kind of file found walking referenced files.
+# type: {}
+_WALKED_CATEGORIES = {maya_ascii.REFERENCE: REFERENCES,
+                      maya_ascii.TEXTURE: IMAGES,
+                      maya_ascii.CACHE: CACHES,
+                      maya_ascii.XGEN: XGEN}
+
+## Attributes of a file node required to resolve its images.
+# type: namedtuple
+FileNodeRecord = collections.namedtuple('FileNodeRecord', ['node',
+                                                           'path',
+                                                           'uv_tiling_mode',
+                                                           'pattern'])
+
+## A file current maya file depends on.
+# type: namedtuple
+DependencyRecord = collections.namedtuple('DependencyRecord', ['category', 'path'])
+
+
+def scan_file_nodes():
+    """ Reads every file node attributes in one pass through the dependency
+    graph, without repeating the image loaded in it.
+    Return:
+        List of FileNodeRecord.
+    """
+
+    records = collections.OrderedDict()
+
+    iterator = om.MItDependencyNodes(om.MFn.kFileTexture)
+    dependency_node = om.MFnDependencyNode()
+
+    while not iterator.isDone():
+        dependency_node.setObject(iterator.thisNode())
+        path = dependency_node.findPlug('fileTextureName', False).asString()
+
+        if path not in records:
+            records[path] = FileNodeRecord(dependency_node.name(),
+                                           path,
+                                           dependency_node.findPlug('uvTilingMode', False).asInt(),
+                                           dependency_node.findPlug('computedFileTextureNamePattern', False).asString())
+
+        iterator.next()
+
+    return list(records.values())
+
+
+def iter_image_paths(file_node_records):
+    """ Yields every full file path for images including UDIM related files,
+    every texture directory is listed only once.
+    Args:
+        file_node_records: List of FileNodeRecord.
+    Yield:
+        String representing full file path, can repeat for tiled images.
+    """
+
+    for record in file_node_records:
+        if record.path == '':
+            continue
+
+        if record.uv_tiling_mode != 0:
+            yield record.path
+
+        for full_file_path in texture_tiles.resolve_pattern(record.pattern):
+            yield full_file_path
+
+
+def iter_xgen_paths(palettes, scene_name):
+    """ Yields xgen files related to current maya file, the main xgen file of
+    every palette (eg. maya_file__xgenPalettes.xgen) and every file under its
+    collection.
+    Args:
+        palettes: List of xgen palette names.
+        scene_name: String representing full path name of current maya file.
+    Yield:
+        String representing full file path.
+    """
+
+    maya_file_dir = os.path.dirname(scene_name)
+    maya_file_name_no_extension = os.path.splitext(os.path.basename(scene_name))[0]
+
+    for palette in palettes:
+        xgen_file_name = '{}__{}.xgen'.format(maya_file_name_no_extension, palette)
+        xgen_full_path = os.path.join(maya_file_dir, xgen_file_name)
+
+        if os.path.exists(xgen_full_path):
+            yield xgen_full_path.replace('\\', '/')
+
+    for collection in xgen_collections.index_collections(xgenm.localRepo(), palettes):
+        for col_file in collection.files:
+            yield col_file
+
+
+def get_reference_paths():
+    """ Gets paths from top level referenced files, loaded or not, without
+    copy number.
+    Return:
+        List of string representing the path of references.
+    """
+
+    list_reference_paths = []
+
+    for ref in pymel.core.listReferences(references=True):
+        reference_path = maya_ascii.strip_copy_number(ref.withCopyNumber()).replace('\\', '/')
+
+        if reference_path not in list_reference_paths:
+            list_reference_paths.append(reference_path)
+
+    return list_reference_paths
+
+
+def iter_nested_dependencies(reference_paths):
+    """ Yields files referenced files depend on, at any depth, reading them
+    from disk so unloaded references are packed too.
+    Args:
+        reference_paths: List of string representing top level references.
+    Yield:
+        Tuple (category, full file path).
+    """
+
+    for dependency in reference_walker.walk_references(reference_paths):
+        yield _WALKED_CATEGORIES[dependency.kind], dependency.path
+
+
+def scan_scene_dependencies():
+    """ Scans current maya file for every file it depends on, each path is
+    only listed once under the first category it is found.
+    Return:
+        List of DependencyRecord ordered by CATEGORIES.
+    """
+
+    scene_name = pymel.core.sceneName()
+    palettes = xgenm.palettes()
+
+    dependencies = collections.OrderedDict()
+
+    def add(category, paths):
+        for path in paths:
+            if path and path not in dependencies:
+                dependencies[path] = DependencyRecord(category, path)
+
+    if palettes:
+        add(XGEN, iter_xgen_paths(palettes, scene_name))
+
+    reference_paths = get_reference_paths()
+
+    add(IMAGES, iter_image_paths(scan_file_nodes()))
+    add(REFERENCES, reference_paths)
+
+    for category, path in iter_nested_dependencies(reference_paths):
+        add(category, [path])
+
+    add(CURRENT_FILE, [scene_name])
+
+    return list(dependencies.values())
@@ -0,0 +1,112 @@
+""" Estimates a pack in a background thread, probing the pack directory and
+filtering files already packed can take seconds on network drives. The
+estimate is sent back to the Qt main thread through signals.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from PySide2 import QtCore
+
+import pack_estimator
+
+from pack_manifest import PackManifest
+
+
+class EstimateWorker(QtCore.QObject):
+    """ Estimates packs one at a time, only the estimate of the last request
+    is sent.
+    """
+
+    ## Emitted with the PackEstimate of the last request.
+    # type: Signal
+    estimate_ready = QtCore.Signal(object)
+
+    ## Emitted with the error message if the last request failed.
+    # type: Signal
+    estimate_failed = QtCore.Signal(str)
+
+    def __init__(self, parent=None):
+        super(EstimateWorker, self).__init__(parent)
+
+        self._pool = None
+        self._request = 0
+        self._lock = threading.Lock()
+
+    def start(self, pack_files, copy_jobs, pack_directory, workers=1, incremental=False):
+        """ Starts estimating a pack, previous requests not sent yet are
+        dropped.
+        Args:
+            pack_files: PackModel with analysed files.
+            copy_jobs: List of tuples (source full path, destination full path).
+            pack_directory: String representing the pack directory.
+            workers: Integer representing the amount of files copied at same time.
+            incremental: True to leave out files already packed.
+        """
+
+        with self._lock:
+            self._request += 1
+            request = self._request
+
+        if self._pool is None:
+            self._pool = ThreadPool(1)
+
+        self._pool.apply_async(self.estimate,
+                               (request, pack_files, copy_jobs, pack_directory, workers, incremental),
+                               callback=self.on_estimate_done)
+
+        return
+
+    def estimate(self, request, pack_files, copy_jobs, pack_directory, workers, incremental):
+        """ Estimates a pack, runs in the pool thread.
+        Return:
+            Tuple (request number, PackEstimate or None, error message).
+        """
+
+        try:
+            manifest = PackManifest(pack_directory) if incremental else None
+
+            estimate = pack_estimator.estimate_pack(pack_files,
+                                                    copy_jobs,
+                                                    pack_directory,
+                                                    workers=workers,
+                                                    manifest=manifest)
+
+        except (IOError, OSError) as error:
+            return request, None, 'Could not write into {}: {}'.format(pack_directory, error)
+
+        return request, estimate, ''
+
+    def on_estimate_done(self, result):
+        """ Executes in the pool thread when an estimate finished, signals are
+        queued into the thread owning this object.
+        Args:
+            result: Tuple (request number, PackEstimate or None, error message).
+        """
+
+        request, estimate, error = result
+
+        with self._lock:
+            if request != self._request:
+                return
+
+        if error:
+            self.estimate_failed.emit(error)
+
+        else:
+            self.estimate_ready.emit(estimate)
+
+        return
+
+    def stop(self):
+        """ Stops estimating, pending requests are dropped.
+        """
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+        return
@@ -0,0 +1,245 @@
+""" Packing without user interface, classifies the files a maya file depends
+on, composes where they go inside the pack and copies them.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import math
+import os
+
+from multiprocessing.pool import ThreadPool
+
+import pack_checksums
+import pack_model
+
+from common_utils import root_paths
+
+from copy_engine import CopyEngine
+from pack_manifest import PackManifest
+from pack_store import ContentStore
+from stat_cache import stat_paths
+
+
+def get_root_directory():
+    """ Gets the root folder of the folder structure.
+    Return:
+        String representing the root directory.
+    """
+
+    return root_paths.get_root_directory()
+
+
+def in_folder_structure(full_path, root_directory):
+    """ Check if directory is in current folder structure.
+    Args:
+        full_path: It is a string representing the full path to a file.
+        root_directory: String representing the root folder.
+    Return:
+        True if directory is part of the folder structure, false otherwise.
+    """
+
+    return root_paths.is_in_structure(full_path, root_directory)
+
+
+def classify(path, exists, root_directory):
+    """ Gets the pack status of a path.
+    Args:
+        path: String representing the full file path.
+        exists: True if path exists on disk, False otherwise.
+        root_directory: String representing the root folder.
+    Return:
+        pack_model.IN_STRUCTURE, pack_model.NOT_IN_STRUCTURE or pack_model.MISSING
+    """
+
+    if not exists:
+        return pack_model.MISSING
+
+    if not in_folder_structure(path, root_directory):
+        return pack_model.NOT_IN_STRUCTURE
+
+    return pack_model.IN_STRUCTURE
+
+
+def compose_on_root_destination_directory(path, root_folder, pack_directory):
+    """ Compose destination directory for files within in root folder,
+    based on selected directory and current item directory path.
+    Args:
+        path: Is a string representing the current full path name for
+        referenced files within current maya file.
+        root_folder: Is a string representing the name of the root folder
+        "ADI_project" expected.
+        pack_directory: String representing the pack directory.
+    Return:
+        tuple (string source path, string destination path)
+    """
+
+    index = path.find(root_folder)
+    path_under_root_folder = path[index:]
+
+    # compose destination path
+    destination_path = os.path.join(pack_directory, path_under_root_folder)
+    destination_path_formatted = destination_path.replace('\\', '/')
+
+    return path, destination_path_formatted
+
+
+def compose_not_on_root_destination_directory(path, pack_directory):
+    """ Compose destination directory for files not in root folder,
+    based on selected directory and current item directory path.
+    Args:
+        path: Is a string representing the current full path name for
+        referenced files within current maya file.
+        pack_directory: String representing the pack directory.
+    Return:
+        tuple (string source path, string destination path)
+    """
+
+    # CONSIDER XGEN FOLDER OUTSIDE OF STRUCTURE, SO WE CAN SEARCH FOR xgen
+    # folder and that could be the folder to copy.
+    path_parts = path.split('/')
+    xgen_folder = 'xgen'
+
+    if xgen_folder in path_parts:
+        index = path.find(xgen_folder)
+        path_under_root_folder = path[index:]
+
+        # compose destination path
+        destination_path = os.path.join(pack_directory, path_under_root_folder)
+        destination_path_formatted = destination_path.replace('\\', '/')
+
+        return path, destination_path_formatted
+
+    # HERE WILL USE THE TOP MOST DIRECTORY OF THE LONGEST FILE
+    longest_dir_parts = path.split('/')[1:]
+    destination_path = os.path.join(pack_directory, *longest_dir_parts)
+    destination_path_formatted = destination_path.replace('\\', '/')
+
+    return path, destination_path_formatted
+
+
+def build_pack_model(dependencies, root_directory, workers=16):
+    """ Creates a pack model from dependencies checking them on disk.
+    Args:
+        dependencies: List of DependencyRecord.
+        root_directory: String representing the root folder.
+        workers: Integer representing the amount of threads checking paths.
+    Return:
+        PackModel with every dependency.
+    """
+
+    model = pack_model.PackModel()
+
+    for dependency in dependencies:
+        model.add(dependency.category, dependency.path)
+
+    paths = [item.path for item in model.items()]
+    batches = [paths[index:index + 64] for index in range(0, len(paths), 64)]
+
+    if not batches:
+        return model
+
+    pool = ThreadPool(workers)
+
+    try:
+        for results in pool.imap_unordered(stat_paths, batches):
+            for path, exists, size in results:
+                model.set_status(model.get(path), classify(path, exists, root_directory), size)
+
+    finally:
+        pool.close()
+        pool.join()
+
+    return model
+
+
+def build_copy_jobs(pack_files, pack_directory, root_directory):
+    """ Composes source and destination of every file to pack.
+    Args:
+        pack_files: PackModel with analysed files.
+        pack_directory: String representing the pack directory.
+        root_directory: String representing the root folder.
+    Return:
+        List of tuples (source full path, destination full path).
+    """
+
+    root_folder = os.path.basename(root_directory)
+
+    # TODO: Create a clean folders in the pack firectory to remove
+    # folders not required, walk through folder omiting ADI_project and xgen
+    # the other can be analized to remove un used folders.
+
+    copy_jobs = []
+
+    for path in pack_files.paths(pack_model.IN_STRUCTURE):
+        copy_jobs.append(compose_on_root_destination_directory(path, root_folder, pack_directory))
+
+    list_of_path_not_in_structure = pack_files.paths(pack_model.NOT_IN_STRUCTURE)
+    paths_not_in_structure_dic = {path:len(os.path.dirname(path).split('/')) for path in list_of_path_not_in_structure}
+    list_key_value_pairs = paths_not_in_structure_dic.items()
+    list_sorted = sorted(list_key_value_pairs, key=lambda x: x[1], reverse=True)
+
+    for path, _ in list_sorted:
+        copy_jobs.append(compose_not_on_root_destination_directory(path, pack_directory))
+
+    return copy_jobs
+
+
+def pack(copy_jobs, pack_directory, workers=None, incremental=True, use_hash=False,
+         on_file_copied=None, store_directory=None, checksum_algorithm=pack_checksums.DEFAULT_ALGORITHM):
+    """ Copies files into pack directory, writing the checksum of every file
+    copied into the pack checksum file.
+    Args:
+        copy_jobs: List of tuples (source full path, destination full path).
+        pack_directory: String representing the pack directory.
+        workers: Integer representing the amount of files copied at same time.
+        incremental: True to copy only new or changed files.
+        use_hash: True to compare file contents for incremental packs.
+        on_file_copied: Function called as on_file_copied(result, done, total).
+        store_directory: String representing a content store directory, if
+        set files are stored once in it and hardlinked into the pack.
+        checksum_algorithm: String representing the hash algorithm of checksums,
+        the store only supports sha1.
+    Return:
+        CopyReport with the results.
+    """
+
+    # Store already hashes contents with sha1 to key them.
+    if store_directory and checksum_algorithm != 'sha1':
+        raise ValueError('Content store only supports sha1 checksums, not {}.'.format(checksum_algorithm))
+
+    manifest = None
+    store = None
+
+    if incremental:
+        manifest = PackManifest(pack_directory, use_hash=use_hash)
+
+    if store_directory:
+        store = ContentStore(store_directory)
+
+    # Files skipped by an incremental pack keep checksums of previous packs.
+    checksums = pack_checksums.ChecksumManifest(pack_directory, checksum_algorithm)
+
+    copy_engine = CopyEngine(workers=workers,
+                             on_file_copied=on_file_copied,
+                             manifest=manifest,
+                             store=store,
+                             checksums=checksums)
+
+    return copy_engine.copy(copy_jobs)
+
+
+def convert_size(size_bytes):
+    """ Convert bytes to human readable format.
+    Args:
+        size_bytes is an integer representing the file size in bytes.
+    Return:
+        String representing the size of the file.
+    """
+    if size_bytes == 0:
+        return "0B"
+
+    size_name = ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")
+    i = int(math.floor(math.log(size_bytes, 1024)))
+    p = math.pow(1024, i)
+    s = round(size_bytes / p, 2)
+    return "%s %s" % (s, size_name[i])
@@ -0,0 +1,513 @@
+""" Streams files to pack straight into a tar or zip archive, keeping the
+same layout as a pack directory, without copying them first.
+
+Split tar volumes are plain byte chunks (name.tar.gz.001, name.tar.gz.002..)
+join them before extracting (eg. cat name.tar.gz.* > name.tar.gz). Split zip
+volumes are independent zip files (name.part001.zip, name.part002.zip..).
+
+A file failing once its entry header was written leaves a truncated entry,
+the archive is aborted and its volumes removed.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+import pack_checksums
+
+from copy_engine import CopyReport, CopyResult
+
+
+## File extension by archive format.
+# type: {}
+ARCHIVE_EXTENSIONS = {'tar': 'tar',
+                      'tar.gz': 'tar.gz',
+                      'tar.xz': 'tar.xz',
+                      'tar.zst': 'tar.zst',
+                      'zip': 'zip'}
+
+## Size of chunks read from source files and written into the archive.
+# type: int
+_CHUNK_SIZE = 1024 * 1024
+
+
+def available_formats():
+    """ Gets archive formats supported by current python.
+    Return:
+        List of string representing the formats.
+    """
+
+    formats = ['tar', 'tar.gz']
+
+    try:
+        import lzma
+        formats.append('tar.xz')
+
+    except ImportError:
+        pass
+
+    if zstandard is not None:
+        formats.append('tar.zst')
+
+    formats.append('zip')
+
+    return formats
+
+
+def remove_volumes(volume_paths):
+    """ Removes volumes of an aborted archive.
+    Args:
+        volume_paths: List of string representing the volumes written.
+    """
+
+    for volume_path in volume_paths:
+        if os.path.exists(volume_path):
+            os.remove(volume_path)
+
+    return
+
+
+def default_archive_path(pack_directory, archive_format, name=None):
+    """ Composes the archive full path inside the pack directory.
+    Args:
+        pack_directory: String representing the pack directory.
+        archive_format: String representing one of ARCHIVE_EXTENSIONS keys.
+        name: String representing the archive name, pack directory name if None.
+    Return:
+        String representing the archive full path.
+    """
+
+    if not name:
+        name = os.path.basename(pack_directory.rstrip('/\\')) or 'pack'
+
+    archive_name = '{}.{}'.format(name, ARCHIVE_EXTENSIONS[archive_format])
+
+    return os.path.join(pack_directory, archive_name).replace('\\', '/')
+
+
+class VolumeWriter(object):
+    """ Write only file object splitting what is written into volumes of a
+    maximum size, path.001, path.002.. Writes to path itself if no size.
+    """
+
+    def __init__(self, path, volume_size=None):
+
+        ## Archive full path.
+        # type: str
+        self.path = path
+
+        ## Maximum bytes per volume, None to write a single file.
+        # type: int
+        self.volume_size = volume_size
+
+        ## Full path of every volume written.
+        # type: []
+        self.volume_paths = []
+
+        self._file = None
+        self._volume_written = 0
+        self._position = 0
+
+    def _open_next_volume(self):
+
+        if self._file is not None:
+            self._file.close()
+
+        if self.volume_size:
+            volume_path = '{}.{:03d}'.format(self.path, len(self.volume_paths) + 1)
+
+        else:
+            volume_path = self.path
+
+        self._file = open(volume_path, 'wb')
+        self._volume_written = 0
+        self.volume_paths.append(volume_path)
+
+        return
+
+    def write(self, data):
+
+        data = memoryview(data)
+
+        while len(data):
+            if self._file is None or (self.volume_size and self._volume_written >= self.volume_size):
+                self._open_next_volume()
+
+            if self.volume_size:
+                chunk = data[:self.volume_size - self._volume_written]
+
+            else:
+                chunk = data
+
+            self._file.write(chunk)
+            self._volume_written += len(chunk)
+            self._position += len(chunk)
+            data = data[len(chunk):]
+
+        return
+
+    def tell(self):
+
+        return self._position
+
+    def flush(self):
+
+        if self._file is not None:
+            self._file.flush()
+
+        return
+
+    def close(self):
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        return
+
+
+class TarArchiveWriter(object):
+    """ Writes files into a tar stream, optionally compressed.
+    """
+
+    def __init__(self, path, archive_format='tar', volume_size=None, algorithm=pack_checksums.DEFAULT_ALGORITHM):
+
+        ## Hash algorithm of files contents while they are streamed.
+        # type: str
+        self.algorithm = algorithm
+
+        ## Splits the output in volumes.
+        # type: VolumeWriter
+        self.volume_writer = VolumeWriter(path, volume_size)
+
+        ## True once an entry was cut while streaming, archive is unusable.
+        # type: bool
+        self.broken = False
+
+        self._zstd_writer = None
+        stream = self.volume_writer
+        mode = 'w|'
+
+        if archive_format == 'tar.gz':
+            mode = 'w|gz'
+
+        elif archive_format == 'tar.xz':
+            mode = 'w|xz'
+
+        elif archive_format == 'tar.zst':
+            if zstandard is None:
+                raise RuntimeError('zstandard module is required for tar.zst archives.')
+
+            self._zstd_writer = zstandard.ZstdCompressor(threads=-1).stream_writer(self.volume_writer)
+            stream = self._zstd_writer
+
+        self._tar = tarfile.open(fileobj=stream, mode=mode, bufsize=_CHUNK_SIZE)
+
+    def add(self, source, arcname):
+        """ Streams source into the archive.
+        Args:
+            source: String representing the source full path name.
+            arcname: String representing the path inside the archive.
+        Return:
+            Tuple (bytes read from source, hex digest of its contents).
+        """
+
+        tar_info = self._tar.gettarinfo(source, arcname=arcname)
+
+        with open(source, 'rb') as source_file:
+            hashing_reader = pack_checksums.HashingReader(source_file, self.algorithm)
+
+            # Header is written first, an error reading or writing contents
+            # leaves the entry truncated.
+            try:
+                self._tar.addfile(tar_info, hashing_reader)
+
+            except (IOError, OSError):
+                self.broken = True
+                raise
+
+        return tar_info.size, hashing_reader.hexdigest()
+
+    def add_text(self, text, arcname):
+        """ Writes text as a file of the archive.
+        Args:
+            text: String representing the file contents.
+            arcname: String representing the path inside the archive.
+        """
+
+        data = text.encode('utf-8')
+        tar_info = tarfile.TarInfo(arcname)
+        tar_info.size = len(data)
+        tar_info.mtime = time.time()
+
+        self._tar.addfile(tar_info, io.BytesIO(data))
+
+        return
+
+    def close(self):
+        """ Finishes the archive.
+        Return:
+            List of string representing the volumes written.
+        """
+
+        self._tar.close()
+
+        if self._zstd_writer is not None:
+            self._zstd_writer.flush(zstandard.FLUSH_FRAME)
+
+        self.volume_writer.close()
+
+        return self.volume_writer.volume_paths
+
+    def abort(self):
+        """ Closes the archive and removes every volume written.
+        """
+
+        try:
+            self._tar.close()
+
+        except (IOError, OSError, ValueError):
+            pass
+
+        self.volume_writer.close()
+        remove_volumes(self.volume_writer.volume_paths)
+
+        return
+
+
+class ZipArchiveWriter(object):
+    """ Writes files into zip archives, starting a new zip file every time a
+    volume gets bigger than volume size.
+    """
+
+    def __init__(self, path, volume_size=None, algorithm=pack_checksums.DEFAULT_ALGORITHM):
+
+        ## Archive full path.
+        # type: str
+        self.path = path
+
+        ## Hash algorithm of files contents while they are streamed.
+        # type: str
+        self.algorithm = algorithm
+
+        ## Maximum bytes per volume, None to write a single file.
+        # type: int
+        self.volume_size = volume_size
+
+        ## Full path of every volume written.
+        # type: []
+        self.volume_paths = []
+
+        ## True once an entry was cut while streaming, archive is unusable.
+        # type: bool
+        self.broken = False
+
+        self._zip = None
+
+    def _open_next_volume(self):
+
+        if self._zip is not None:
+            self._zip.close()
+
+        if self.volume_size:
+            base_path = os.path.splitext(self.path)[0]
+            volume_path = '{}.part{:03d}.zip'.format(base_path, len(self.volume_paths) + 1)
+
+        else:
+            volume_path = self.path
+
+        self._zip = zipfile.ZipFile(volume_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
+        self.volume_paths.append(volume_path)
+
+        return
+
+    def add(self, source, arcname):
+        """ Streams source into the archive.
+        Args:
+            source: String representing the source full path name.
+            arcname: String representing the path inside the archive.
+        Return:
+            Tuple (bytes read from source, hex digest of its contents).
+        """
+
+        if self._zip is None:
+            self._open_next_volume()
+
+        elif self.volume_size and self._zip.fp.tell() >= self.volume_size:
+            self._open_next_volume()
+
+        # Python 2 zipfile can not write entries as streams, hash it apart.
+        if not hasattr(zipfile.ZipInfo, 'from_file'):
+            size = os.path.getsize(source)
+
+            try:
+                self._zip.write(source, arcname)
+
+            except (IOError, OSError):
+                self.broken = True
+                raise
+
+            return size, pack_checksums.hash_file(source, self.algorithm)
+
+        zip_info = zipfile.ZipInfo.from_file(source, arcname)
+        zip_info.compress_type = zipfile.ZIP_DEFLATED
+        hasher = pack_checksums.new_hasher(self.algorithm)
+
+        with open(source, 'rb') as source_file:
+            # Header is written first, an error reading or writing contents
+            # leaves the entry truncated.
+            try:
+                with self._zip.open(zip_info, 'w', force_zip64=True) as zip_entry:
+                    for chunk in iter(lambda: source_file.read(_CHUNK_SIZE), b''):
+                        hasher.update(chunk)
+                        zip_entry.write(chunk)
+
+            except (IOError, OSError):
+                self.broken = True
+                raise
+
+        return zip_info.file_size, hasher.hexdigest()
+
+    def add_text(self, text, arcname):
+        """ Writes text as a file of the current volume.
+        Args:
+            text: String representing the file contents.
+            arcname: String representing the path inside the archive.
+        """
+
+        if self._zip is None:
+            self._open_next_volume()
+
+        self._zip.writestr(arcname, text.encode('utf-8'))
+
+        return
+
+    def close(self):
+        """ Finishes the archive.
+        Return:
+            List of string representing the volumes written.
+        """
+
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+        return self.volume_paths
+
+    def abort(self):
+        """ Closes the archive and removes every volume written.
+        """
+
+        if self._zip is not None:
+            try:
+                self._zip.close()
+
+            except (IOError, OSError, ValueError):
+                pass
+
+            self._zip = None
+
+        remove_volumes(self.volume_paths)
+
+        return
+
+
+def open_archive(path, archive_format, volume_size=None, algorithm=pack_checksums.DEFAULT_ALGORITHM):
+    """ Creates the writer for passed archive format.
+    Args:
+        path: String representing the archive full path.
+        archive_format: String representing one of ARCHIVE_EXTENSIONS keys.
+        volume_size: Integer representing maximum bytes per volume, or None.
+        algorithm: String representing the hash algorithm of files contents.
+    Return:
+        TarArchiveWriter or ZipArchiveWriter.
+    """
+
+    if archive_format == 'zip':
+        return ZipArchiveWriter(path, volume_size, algorithm)
+
+    if archive_format not in ARCHIVE_EXTENSIONS:
+        raise ValueError('Unknown archive format {}'.format(archive_format))
+
+    return TarArchiveWriter(path, archive_format, volume_size, algorithm)
+
+
+def write_archive(copy_jobs, pack_directory, archive_path, archive_format='tar',
+                  volume_size=None, on_file_copied=None, checksum_algorithm=pack_checksums.DEFAULT_ALGORITHM):
+    """ Streams every source into an archive, path inside the archive is the
+    destination relative to the pack directory. Checksums of every file are
+    written as the last file of the archive. If an entry is cut while
+    streaming, or the archive can not be finished, the archive is aborted:
+    its volumes are removed and the report holds that failure only.
+    Args:
+        copy_jobs: List of tuples (source full path, destination full path).
+        pack_directory: String representing the pack directory.
+        archive_path: String representing the archive full path.
+        archive_format: String representing one of ARCHIVE_EXTENSIONS keys.
+        volume_size: Integer representing maximum bytes per volume, or None.
+        on_file_copied: Function called as on_file_copied(result, done, total).
+        checksum_algorithm: String representing the hash algorithm of checksums.
+    Return:
+        Tuple (CopyReport with the results, list of volumes written).
+    """
+
+    report = CopyReport()
+    checksums = pack_checksums.ChecksumManifest(pack_directory, checksum_algorithm, load=False)
+    total = len(copy_jobs)
+
+    archive_directory = os.path.dirname(archive_path)
+
+    if archive_directory and not os.path.isdir(archive_directory):
+        os.makedirs(archive_directory)
+
+    start = time.time()
+    archive = open_archive(archive_path, archive_format, volume_size, checksum_algorithm)
+    volume_paths = None
+
+    try:
+        for done, (source, destination) in enumerate(copy_jobs, 1):
+            arcname = checksums.relative_path(destination)
+
+            try:
+                size, digest = archive.add(source, arcname)
+                result = CopyResult(source, archive_path, size=size, digest=digest)
+                checksums.record(destination, digest)
+
+            except (IOError, OSError) as error:
+                result = CopyResult(source, archive_path, error=str(error))
+
+            report.add(result)
+
+            if on_file_copied is not None:
+                on_file_copied(result, done, total)
+
+            if archive.broken:
+                break
+
+        if not archive.broken:
+            archive.add_text(checksums.to_text(), os.path.basename(checksums.checksum_path))
+            volume_paths = archive.close()
+
+    finally:
+        if volume_paths is None:
+            archive.abort()
+
+    if archive.broken:
+        error = 'Archive aborted, {} was cut while streaming: {}'.format(arcname, result.error)
+
+        report = CopyReport()
+        report.add(CopyResult(source, archive_path, error=error))
+        volume_paths = []
+
+    report.elapsed = time.time() - start
+
+    return report, volume_paths
@@ -0,0 +1,230 @@
+""" Packs several maya files into one directory without user interface, to
+be run with mayapy on render nodes. Files shared by several maya files are
+copied only once.
+
+Usage:
+    mayapy pack_batch.py --output D:/delivery scene_a.ma scene_b.ma
+    mayapy pack_batch.py --output D:/delivery --scene-list shots.txt --workers 16
+    mayapy pack_batch.py --output D:/delivery/sq010 --store D:/delivery/.pack_store sq010_*.ma
+    mayapy pack_batch.py --output D:/delivery --archive tar.gz --volume-size 4 scene_a.ma
+    mayapy pack_batch.py --output D:/delivery --checksum xxh64 scene_a.ma
+    mayapy pack_batch.py --output //nas/delivery --estimate scene_a.ma scene_b.ma
+
+Packs are verified with verify_pack.py.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import argparse
+import collections
+import logging
+import sys
+
+import pack_archive
+import pack_checksums
+import pack_estimator
+
+from pack_manifest import PackManifest
+
+
+def read_scene_list(scene_list_path):
+    """ Reads maya files from a text file, one per line.
+    Args:
+        scene_list_path: String representing the text file full path.
+    Return:
+        List of string representing maya files full path.
+    """
+
+    with open(scene_list_path, 'r') as scene_list:
+        return [line.strip() for line in scene_list if line.strip() and not line.startswith('#')]
+
+
+def initialize_maya():
+    """ Initializes maya standalone and loads plugins required to scan files.
+    """
+
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    import maya.cmds as cmds
+
+    try:
+        cmds.loadPlugin('xgenToolkit', quiet=True)
+
+    except RuntimeError:
+        logging.warning('Could not load xgenToolkit, xgen files will not be packed.')
+
+    return
+
+
+def collect_copy_jobs(scene_files, pack_directory, workers):
+    """ Opens every maya file and composes the copy jobs of its dependencies,
+    jobs to the same destination are only kept once. Dependencies of every
+    maya file are merged into one pack model.
+    Args:
+        scene_files: List of string representing maya files full path.
+        pack_directory: String representing the pack directory.
+        workers: Integer representing the amount of threads checking paths.
+    Return:
+        Tuple (list of copy jobs, list of missing paths, PackModel).
+    """
+
+    import maya.cmds as cmds
+
+    import dependency_scanner
+    import pack_api
+    import pack_model
+
+    root_directory = pack_api.get_root_directory()
+
+    copy_jobs = collections.OrderedDict()
+    missing_paths = set()
+    all_pack_files = pack_model.PackModel()
+
+    for scene_file in scene_files:
+        logging.info('Scanning {}'.format(scene_file))
+
+        try:
+            cmds.file(scene_file, open=True, force=True, prompt=False)
+
+        except RuntimeError as error:
+            logging.error('Could not open {}: {}'.format(scene_file, error))
+
+            continue
+
+        dependencies = dependency_scanner.scan_scene_dependencies()
+        pack_files = pack_api.build_pack_model(dependencies, root_directory, workers=workers)
+
+        missing_paths.update(pack_files.paths(pack_model.MISSING))
+
+        for item in pack_files.items():
+            all_pack_files.add(item.category, item.path, item.size, item.status)
+
+        for source, destination in pack_api.build_copy_jobs(pack_files, pack_directory, root_directory):
+            shared_source = copy_jobs.setdefault(destination, source)
+
+            if shared_source != source:
+                logging.warning('{} and {} are packed into the same path, keeping first.'.format(shared_source, source))
+
+    jobs = [(source, destination) for destination, source in copy_jobs.items()]
+
+    return jobs, sorted(missing_paths), all_pack_files
+
+
+def log_file_copied(result, done, total):
+    """ Logs copy progress every now and then.
+    """
+
+    if not result.succeeded:
+        logging.error('Failed copying {}: {}'.format(result.source, result.error))
+
+    if done == total or done % 500 == 0:
+        logging.info('Copied {} / {}'.format(done, total))
+
+    return
+
+
+def main(argv=None):
+    """ Packs passed maya files.
+    Args:
+        argv: List of command line arguments, sys.argv if None.
+    Return:
+        Integer exit code, 0 if every file was packed.
+    """
+
+    parser = argparse.ArgumentParser(description='Pack maya files with every file they depend on.')
+    parser.add_argument('scenes', nargs='*', help='Maya files to pack.')
+    parser.add_argument('--scene-list', help='Text file with one maya file per line.')
+    parser.add_argument('--output', required=True, help='Pack directory.')
+    parser.add_argument('--workers', type=int, default=8, help='Files copied at the same time.')
+    parser.add_argument('--full', action='store_true', help='Copy every file, even if already packed.')
+    parser.add_argument('--hash', action='store_true', help='Compare file contents for incremental packs.')
+    parser.add_argument('--store', help='Content store directory, files are stored once and hardlinked into the pack.')
+    parser.add_argument('--archive', choices=sorted(pack_archive.ARCHIVE_EXTENSIONS),
+                        help='Stream files into an archive inside output directory instead of copying them.')
+    parser.add_argument('--volume-size', type=float, default=0, help='Split archive in volumes of this size in GB.')
+    parser.add_argument('--checksum', choices=pack_checksums.available_algorithms(),
+                        default=pack_checksums.DEFAULT_ALGORITHM, help='Hash algorithm of the pack checksum file.')
+    parser.add_argument('--estimate', action='store_true', help='Only show files, size and time the pack would take.')
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s: %(levelname)s: %(message)s',
+                        datefmt='%d/%m/%Y %I:%M %p')
+
+    scene_files = list(args.scenes)
+
+    if args.scene_list:
+        scene_files.extend(read_scene_list(args.scene_list))
+
+    if not scene_files:
+        parser.error('No maya files to pack.')
+
+    if args.store and not args.archive and args.checksum != 'sha1':
+        parser.error('--store only supports sha1 checksums.')
+
+    pack_directory = args.output.replace('\\', '/')
+
+    initialize_maya()
+
+    import pack_api
+
+    copy_jobs, missing_paths, pack_files = collect_copy_jobs(scene_files, pack_directory, args.workers)
+
+    for path in missing_paths:
+        logging.warning('Path does not exist! {}'.format(path))
+
+    if args.estimate:
+        manifest = None
+
+        if not args.full and not args.archive:
+            manifest = PackManifest(pack_directory)
+
+        estimate = pack_estimator.estimate_pack(pack_files,
+                                                copy_jobs,
+                                                pack_directory,
+                                                workers=args.workers,
+                                                manifest=manifest)
+
+        logging.info('\n' + estimate.summary(pack_api.convert_size))
+
+        return 0
+
+    logging.info('Packing {} files from {} maya files into {}'.format(len(copy_jobs),
+                                                                    len(scene_files),
+                                                                    pack_directory))
+
+    if args.archive:
+        archive_path = pack_archive.default_archive_path(pack_directory, args.archive)
+        report, volume_paths = pack_archive.write_archive(copy_jobs,
+                                                          pack_directory,
+                                                          archive_path,
+                                                          args.archive,
+                                                          volume_size=int(args.volume_size * 1024 ** 3) or None,
+                                                          on_file_copied=log_file_copied,
+                                                          checksum_algorithm=args.checksum)
+
+        for volume_path in volume_paths:
+            logging.info('Written {}'.format(volume_path))
+
+    else:
+        report = pack_api.pack(copy_jobs,
+                               pack_directory,
+                               workers=args.workers,
+                               incremental=not args.full,
+                               use_hash=args.hash,
+                               on_file_copied=log_file_copied,
+                               store_directory=args.store,
+                               checksum_algorithm=args.checksum)
+
+    logging.info('\n' + report.summary(pack_api.convert_size))
+
+    if report.failures:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
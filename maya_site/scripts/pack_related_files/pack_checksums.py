@@ -0,0 +1,402 @@
+""" Checksums of packed files, computed while files are copied and written
+into the pack root, so a pack can be verified later (eg. at the vendor).
+
+The checksum file uses sha1sum format, one "<digest>  <relative path>" per
+line, pack_checksums.sha1 can be checked with sha1sum -c from pack root.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import hashlib
+import os
+import shutil
+import time
+import uuid
+
+from multiprocessing.pool import ThreadPool
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+## Size of chunks read when copying and hashing files.
+# type: int
+CHUNK_SIZE = 4 * 1024 * 1024
+
+## Algorithm used if none is requested.
+# type: str
+DEFAULT_ALGORITHM = 'sha1'
+
+## Base name of the checksum file, algorithm is the extension.
+# type: str
+CHECKSUM_FILE_NAME = 'pack_checksums'
+
+
+def available_algorithms():
+    """ Gets hash algorithms supported by current python.
+    Return:
+        List of string representing the algorithms.
+    """
+
+    algorithms = ['sha1']
+
+    if xxhash is not None:
+        algorithms.append('xxh64')
+
+    return algorithms
+
+
+def new_hasher(algorithm=DEFAULT_ALGORITHM):
+    """ Creates a hash object for passed algorithm.
+    Args:
+        algorithm: String 'sha1' or 'xxh64'.
+    Return:
+        Object with update() and hexdigest().
+    """
+
+    if algorithm == 'xxh64':
+        if xxhash is None:
+            raise RuntimeError('xxhash module is required for xxh64 checksums.')
+
+        return xxhash.xxh64()
+
+    return hashlib.new(algorithm)
+
+
+def hash_file(full_path, algorithm=DEFAULT_ALGORITHM):
+    """ Hashes file contents reading in chunks.
+    Args:
+        full_path: String representing the full path name of the file.
+        algorithm: String 'sha1' or 'xxh64'.
+    Return:
+        String representing the hex digest.
+    """
+
+    hasher = new_hasher(algorithm)
+
+    with open(full_path, 'rb') as file_to_hash:
+        for chunk in iter(lambda: file_to_hash.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+def temporary_path_for(destination):
+    """ Gets a unique temporary path next to destination, on the same volume
+    so it can be renamed into place.
+    Args:
+        destination: String representing the destination full path name.
+    Return:
+        String representing the temporary full path name.
+    """
+
+    return '{}.{}.tmp'.format(destination, uuid.uuid4().hex)
+
+
+def replace_file(temporary_path, destination):
+    """ Renames a temporary file over destination. The destination entry is
+    replaced, never written through, so a destination hardlinked or
+    symlinked to a store object leaves the object untouched.
+    Args:
+        temporary_path: String representing the temporary full path name.
+        destination: String representing the destination full path name.
+    """
+
+    replace = getattr(os, 'replace', None)
+
+    if replace is not None:
+        replace(temporary_path, destination)
+
+        return
+
+    # Python 2 rename does not overwrite on windows.
+    if os.name == 'nt' and os.path.lexists(destination):
+        os.remove(destination)
+
+    os.rename(temporary_path, destination)
+
+    return
+
+
+def copy_with_hash(source, destination, algorithm=DEFAULT_ALGORITHM):
+    """ Copies source into destination hashing contents while they are read,
+    file permissions and times are copied too. Contents are written into a
+    temporary file renamed over destination, so links to destination are
+    broken instead of written through.
+    Args:
+        source: String representing the source full path name.
+        destination: String representing the destination full path name.
+        algorithm: String 'sha1' or 'xxh64'.
+    Return:
+        Tuple (bytes copied, hex digest).
+    """
+
+    hasher = new_hasher(algorithm)
+    size = 0
+    temporary_path = temporary_path_for(destination)
+
+    try:
+        with open(source, 'rb') as source_file:
+            with open(temporary_path, 'wb') as destination_file:
+                for chunk in iter(lambda: source_file.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                    destination_file.write(chunk)
+                    size += len(chunk)
+
+        shutil.copystat(source, temporary_path)
+        replace_file(temporary_path, destination)
+
+    finally:
+        if os.path.lexists(temporary_path):
+            os.remove(temporary_path)
+
+    return size, hasher.hexdigest()
+
+
+class HashingReader(object):
+    """ File object wrapper hashing everything read through it.
+    """
+
+    def __init__(self, file_object, algorithm=DEFAULT_ALGORITHM):
+
+        self._file_object = file_object
+
+        ## Hash of contents read so far.
+        # type: hash object
+        self.hasher = new_hasher(algorithm)
+
+    def read(self, size=-1):
+
+        data = self._file_object.read(size)
+        self.hasher.update(data)
+
+        return data
+
+    def hexdigest(self):
+
+        return self.hasher.hexdigest()
+
+
+class ChecksumManifest(object):
+    """ Checksums of packed files by path relative to pack root.
+    """
+
+    def __init__(self, pack_directory, algorithm=DEFAULT_ALGORITHM, load=True):
+
+        ## Root directory of the pack.
+        # type: str
+        self.pack_directory = pack_directory
+
+        ## Hash algorithm of the checksums.
+        # type: str
+        self.algorithm = algorithm
+
+        ## Full path name of the checksum file.
+        # type: str
+        self.checksum_path = os.path.join(pack_directory,
+                                          '{}.{}'.format(CHECKSUM_FILE_NAME, algorithm)).replace('\\', '/')
+
+        ## Hex digest by relative path.
+        # type: {}
+        self.checksums = {}
+
+        if load:
+            self.load()
+
+    @classmethod
+    def find(cls, pack_directory):
+        """ Finds the checksum file of a pack, whatever its algorithm.
+        Args:
+            pack_directory: String representing the pack directory.
+        Return:
+            ChecksumManifest, None if pack has no checksum file.
+        """
+
+        for algorithm in ['sha1', 'xxh64']:
+            checksum_name = '{}.{}'.format(CHECKSUM_FILE_NAME, algorithm)
+
+            if os.path.exists(os.path.join(pack_directory, checksum_name)):
+                return cls(pack_directory, algorithm)
+
+        return None
+
+    def load(self):
+        """ Loads checksums from checksum file if any.
+        """
+
+        self.checksums = {}
+
+        if not os.path.exists(self.checksum_path):
+            return
+
+        with open(self.checksum_path, 'r') as checksum_file:
+            for line in checksum_file:
+                digest, separator, relative_path = line.rstrip('\n').partition('  ')
+
+                if separator:
+                    self.checksums[relative_path] = digest
+
+        return
+
+    def relative_path(self, destination):
+        """ Gets the destination path relative to pack directory.
+        Args:
+            destination: String representing the full destination path.
+        Return:
+            String representing the relative path with forward slashes.
+        """
+
+        return os.path.relpath(destination, self.pack_directory).replace('\\', '/')
+
+    def record(self, destination, digest):
+        """ Records the checksum of a packed file.
+        Args:
+            destination: String representing the destination full path name.
+            digest: String representing the hex digest of its contents.
+        """
+
+        self.checksums[self.relative_path(destination)] = digest
+
+        return
+
+    def to_text(self):
+        """ Composes checksum file contents.
+        Return:
+            String with one "<digest>  <relative path>" line per file.
+        """
+
+        return ''.join('{}  {}\n'.format(self.checksums[relative_path], relative_path)
+                       for relative_path in sorted(self.checksums))
+
+    def save(self):
+        """ Writes the checksum file.
+        """
+
+        if not os.path.isdir(self.pack_directory):
+            os.makedirs(self.pack_directory)
+
+        with open(self.checksum_path, 'w') as checksum_file:
+            checksum_file.write(self.to_text())
+
+        # A checksum file of another algorithm is out of date now, and find()
+        # could pick it instead of this one.
+        for algorithm in ['sha1', 'xxh64']:
+            checksum_path = os.path.join(self.pack_directory, '{}.{}'.format(CHECKSUM_FILE_NAME, algorithm))
+
+            if algorithm != self.algorithm and os.path.exists(checksum_path):
+                os.remove(checksum_path)
+
+        return
+
+
+class VerifyReport(object):
+    """ Results of verifying a pack against its checksums.
+    """
+
+    def __init__(self):
+
+        ## Amount of files matching its checksum.
+        # type: int
+        self.files_verified = 0
+
+        ## Amount of bytes read.
+        # type: int
+        self.bytes_verified = 0
+
+        ## Relative paths which contents do not match.
+        # type: []
+        self.mismatches = []
+
+        ## Relative paths which do not exist in pack.
+        # type: []
+        self.missing = []
+
+        ## Seconds spent verifying.
+        # type: float
+        self.elapsed = 0.0
+
+    @property
+    def succeeded(self):
+        """ True if every file matches its checksum.
+        """
+
+        return not self.mismatches and not self.missing
+
+    def summary(self):
+        """ Composes a readable summary of the verification.
+        Return:
+            String representing the summary.
+        """
+
+        lines = ['Files verified: {}'.format(self.files_verified),
+                 'Mismatches: {}'.format(len(self.mismatches)),
+                 'Missing: {}'.format(len(self.missing)),
+                 'Time: {:.1f} s'.format(self.elapsed)]
+
+        lines.extend('  MISMATCH {}'.format(relative_path) for relative_path in self.mismatches)
+        lines.extend('  MISSING {}'.format(relative_path) for relative_path in self.missing)
+
+        return '\n'.join(lines)
+
+
+def verify_pack(pack_directory, workers=8, on_file_verified=None):
+    """ Rehashes every file of the pack in parallel and compares it with its
+    checksum file.
+    Args:
+        pack_directory: String representing the pack directory.
+        workers: Integer representing the amount of files hashed at same time.
+        on_file_verified: Function called as on_file_verified(done, total).
+    Return:
+        VerifyReport with the results.
+    """
+
+    report = VerifyReport()
+    checksum_manifest = ChecksumManifest.find(pack_directory)
+
+    if checksum_manifest is None:
+        raise IOError('No {}.* file found in {}'.format(CHECKSUM_FILE_NAME, pack_directory))
+
+    algorithm = checksum_manifest.algorithm
+    jobs = sorted(checksum_manifest.checksums.items())
+
+    # Raises RuntimeError once, not from every worker, if algorithm is not
+    # supported by current python (eg. xxh64 without xxhash).
+    new_hasher(algorithm)
+
+    def verify_file(job):
+        relative_path, digest = job
+        full_path = os.path.join(pack_directory, relative_path)
+
+        try:
+            return relative_path, hash_file(full_path, algorithm) == digest, os.path.getsize(full_path)
+
+        except (IOError, OSError):
+            return relative_path, None, 0
+
+    start = time.time()
+    pool = ThreadPool(max(1, workers))
+
+    try:
+        for done, (relative_path, matches, size) in enumerate(pool.imap_unordered(verify_file, jobs), 1):
+            if matches is None:
+                report.missing.append(relative_path)
+
+            elif matches:
+                report.files_verified += 1
+                report.bytes_verified += size
+
+            else:
+                report.mismatches.append(relative_path)
+
+            if on_file_verified is not None:
+                on_file_verified(done, len(jobs))
+
+    finally:
+        pool.close()
+        pool.join()
+
+    report.elapsed = time.time() - start
+
+    return report
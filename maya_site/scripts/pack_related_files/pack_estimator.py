@@ -0,0 +1,241 @@
+""" Estimates size and time of a pack before copying, measuring how fast the
+pack directory is written with a short probe.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import collections
+import os
+import time
+import uuid
+
+
+## Bytes written by the throughput probe.
+# type: int
+PROBE_SIZE = 32 * 1024 * 1024
+
+## Small files created by the probe to measure the cost of every file.
+# type: int
+PROBE_FILES = 16
+
+## Size of chunks written by the probe.
+# type: int
+_CHUNK_SIZE = 4 * 1024 * 1024
+
+## Measured (bytes per second, seconds per file) by directory.
+# type: {}
+_PROBE_CACHE = {}
+
+
+def clear_probe_cache():
+    """ Forgets every measured directory, next estimate probes again.
+    """
+
+    _PROBE_CACHE.clear()
+
+    return
+
+
+def probe_directory(directory, probe_size=PROBE_SIZE, probe_files=PROBE_FILES):
+    """ Measures write speed of a directory writing a temporary file, and the
+    time spent creating small files, both are removed after.
+    Args:
+        directory: String representing the directory to probe.
+        probe_size: Integer representing the bytes to write.
+        probe_files: Integer representing the amount of small files to create.
+    Return:
+        Tuple (bytes per second, seconds per file).
+    """
+
+    cache_key = (directory, probe_size, probe_files)
+
+    if cache_key in _PROBE_CACHE:
+        return _PROBE_CACHE[cache_key]
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    probe_path = os.path.join(directory, '.pack_probe_{}'.format(uuid.uuid4().hex))
+    chunk = os.urandom(min(_CHUNK_SIZE, probe_size))
+    written = 0
+
+    start = time.time()
+
+    try:
+        with open(probe_path, 'wb') as probe_file:
+            while written < probe_size:
+                probe_file.write(chunk)
+                written += len(chunk)
+
+            # Measure the disk, not the operating system cache.
+            probe_file.flush()
+            os.fsync(probe_file.fileno())
+
+        bytes_per_second = written / max(time.time() - start, 1e-6)
+
+    finally:
+        if os.path.exists(probe_path):
+            os.remove(probe_path)
+
+    small_paths = ['{}_{}'.format(probe_path, index) for index in range(probe_files)]
+
+    start = time.time()
+
+    try:
+        for small_path in small_paths:
+            with open(small_path, 'wb') as small_file:
+                small_file.write(b'0')
+
+        seconds_per_file = (time.time() - start) / max(probe_files, 1)
+
+    finally:
+        for small_path in small_paths:
+            if os.path.exists(small_path):
+                os.remove(small_path)
+
+    _PROBE_CACHE[cache_key] = (bytes_per_second, seconds_per_file)
+
+    return bytes_per_second, seconds_per_file
+
+
+class PackEstimate(object):
+    """ Files, bytes and time a pack is expected to take, by category.
+    """
+
+    def __init__(self, bytes_per_second=0.0, seconds_per_file=0.0, workers=1):
+
+        ## Files and bytes to copy by category.
+        # type: {category: [files, bytes]}
+        self.categories = collections.OrderedDict()
+
+        ## Files skipped because they are already packed.
+        # type: int
+        self.files_up_to_date = 0
+
+        ## Measured write speed of the pack directory.
+        # type: float
+        self.bytes_per_second = bytes_per_second
+
+        ## Measured time spent creating a file in the pack directory.
+        # type: float
+        self.seconds_per_file = seconds_per_file
+
+        ## Amount of files copied at the same time.
+        # type: int
+        self.workers = max(1, workers)
+
+    def add(self, category, size):
+        """ Adds a file to copy.
+        Args:
+            category: String representing the category of the file.
+            size: Integer representing the size of the file in bytes.
+        """
+
+        totals = self.categories.setdefault(category, [0, 0])
+        totals[0] += 1
+        totals[1] += size
+
+        return
+
+    @property
+    def total_files(self):
+
+        return sum(files for files, _ in self.categories.values())
+
+    @property
+    def total_bytes(self):
+
+        return sum(size for _, size in self.categories.values())
+
+    @property
+    def seconds(self):
+        """ Projected copy time, bandwidth is shared by every worker while the
+        cost of creating files overlaps between them.
+        """
+
+        if not self.bytes_per_second:
+            return 0.0
+
+        transfer_time = self.total_bytes / float(self.bytes_per_second)
+        files_time = self.total_files * self.seconds_per_file / self.workers
+
+        return transfer_time + files_time
+
+    def summary(self, convert_size=None):
+        """ Composes a readable summary of the estimate.
+        Args:
+            convert_size: Function to convert bytes into readable string.
+        Return:
+            String representing the summary.
+        """
+
+        if convert_size is None:
+            convert_size = lambda size_bytes: '{} B'.format(size_bytes)
+
+        lines = []
+
+        for category, (files, size) in self.categories.items():
+            lines.append('{}: {} files, {}'.format(category, files, convert_size(size)))
+
+        lines.append('Total: {} files, {}'.format(self.total_files, convert_size(self.total_bytes)))
+
+        if self.files_up_to_date:
+            lines.append('Already packed: {} files'.format(self.files_up_to_date))
+
+        lines.append('Write speed: {}/s'.format(convert_size(int(self.bytes_per_second))))
+        lines.append('Estimated time: {}'.format(format_duration(self.seconds)))
+
+        return '\n'.join(lines)
+
+
+def format_duration(seconds):
+    """ Converts seconds into a readable duration.
+    Args:
+        seconds: Float representing the seconds.
+    Return:
+        String like 1h 05m, 3m 20s or 12s.
+    """
+
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+
+    if hours:
+        return '{}h {:02d}m'.format(hours, minutes)
+
+    if minutes:
+        return '{}m {:02d}s'.format(minutes, seconds)
+
+    return '{}s'.format(seconds)
+
+
+def estimate_pack(pack_files, copy_jobs, pack_directory, workers=1, manifest=None):
+    """ Estimates files, bytes and time to pack, probing the pack directory.
+    Args:
+        pack_files: PackModel with analysed files.
+        copy_jobs: List of tuples (source full path, destination full path).
+        pack_directory: String representing the pack directory.
+        workers: Integer representing the amount of files copied at same time.
+        manifest: PackManifest of an incremental pack, files already packed
+        are not estimated.
+    Return:
+        PackEstimate with the results.
+    """
+
+    up_to_date = []
+
+    if manifest is not None:
+        copy_jobs, up_to_date = manifest.filter_jobs(copy_jobs)
+
+    bytes_per_second, seconds_per_file = probe_directory(pack_directory)
+
+    estimate = PackEstimate(bytes_per_second, seconds_per_file, workers)
+    estimate.files_up_to_date = len(up_to_date)
+
+    sources = set(source for source, _ in copy_jobs)
+
+    for item in pack_files.items():
+        if item.path in sources:
+            estimate.add(item.category, item.size)
+
+    return estimate
@@ -0,0 +1,190 @@
+""" Qt item model showing a PackModel in a QTreeView, children are fetched
+lazily in batches so only shown rows cost anything.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+from PySide2 import QtCore, QtGui
+
+
+class PackItemModel(QtCore.QAbstractItemModel):
+    """ Two level tree model, categories as top level rows and pack items as
+    children. Child indexes store row of its category plus one as internal id,
+    top level indexes use 0.
+    """
+
+    ## Amount of children added every time more rows are fetched.
+    # type: int
+    _FETCH_BATCH_SIZE = 256
+
+    def __init__(self, pack_files, header_labels, row_colors, size_to_text, parent=None):
+        super(PackItemModel, self).__init__(parent)
+
+        ## Data shown by this model.
+        # type: PackModel
+        self.pack_files = pack_files
+
+        ## Labels for every column.
+        # type: []
+        self.header_labels = header_labels
+
+        ## Background brush by status of the item.
+        # type: {}
+        self.row_brushes = dict((status, QtGui.QBrush(color)) for status, color in row_colors.items())
+
+        ## Function converting bytes into readable text.
+        # type: function
+        self.size_to_text = size_to_text
+
+        ## Category names, one per top level row.
+        # type: []
+        self.category_names = list(pack_files.categories.keys())
+
+        ## Amount of children fetched by category row.
+        # type: []
+        self.fetched_counts = [0] * len(self.category_names)
+
+        ## Tuple (category row, row) by item id, to find the index of an item.
+        # type: {}
+        self.item_rows = {}
+
+        for category_row, category in enumerate(self.category_names):
+            for row, item in enumerate(pack_files.categories[category]):
+                self.item_rows[id(item)] = (category_row, row)
+
+    def category_items(self, category_row):
+        """ Gets the items of a category.
+        Args:
+            category_row: Integer representing the top level row.
+        Return:
+            List of PackItem.
+        """
+
+        return self.pack_files.categories[self.category_names[category_row]]
+
+    def items_changed(self, items):
+        """ Refreshes the rows of passed items, one dataChanged signal per
+        category for the range of fetched rows changed.
+        Args:
+            items: List of PackItem which data changed.
+        """
+
+        changed_ranges = {}
+
+        for item in items:
+            category_row, row = self.item_rows[id(item)]
+
+            if row >= self.fetched_counts[category_row]:
+                continue
+
+            first, last = changed_ranges.get(category_row, (row, row))
+            changed_ranges[category_row] = (min(first, row), max(last, row))
+
+        for category_row, (first, last) in changed_ranges.items():
+            parent = self.createIndex(category_row, 0, 0)
+            self.dataChanged.emit(self.index(first, 0, parent),
+                                  self.index(last, self.columnCount() - 1, parent))
+
+        return
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+
+        if not index.isValid() or index.internalId() == 0:
+            return QtCore.QModelIndex()
+
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+
+        if not parent.isValid():
+            return len(self.category_names)
+
+        if parent.internalId() == 0 and parent.column() == 0:
+            return self.fetched_counts[parent.row()]
+
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+
+        return len(self.header_labels)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+
+        if not parent.isValid():
+            return bool(self.category_names)
+
+        if parent.internalId() == 0 and parent.column() == 0:
+            return bool(self.category_items(parent.row()))
+
+        return False
+
+    def canFetchMore(self, parent):
+
+        if not parent.isValid() or parent.internalId() != 0:
+            return False
+
+        return self.fetched_counts[parent.row()] < len(self.category_items(parent.row()))
+
+    def fetchMore(self, parent):
+
+        category_row = parent.row()
+        fetched = self.fetched_counts[category_row]
+        to_fetch = min(self._FETCH_BATCH_SIZE, len(self.category_items(category_row)) - fetched)
+
+        if to_fetch <= 0:
+            return
+
+        self.beginInsertRows(parent, fetched, fetched + to_fetch - 1)
+        self.fetched_counts[category_row] += to_fetch
+        self.endInsertRows()
+
+        return
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+
+        if not index.isValid():
+            return None
+
+        if index.internalId() == 0:
+            if role == QtCore.Qt.DisplayRole and index.column() == 0:
+                return self.category_names[index.row()]
+
+            return None
+
+        item = self.category_items(index.internalId() - 1)[index.row()]
+
+        if role == QtCore.Qt.DisplayRole:
+            column = index.column()
+
+            if column == 1:
+                return item.path
+
+            if column == 2:
+                return self.size_to_text(item.size)
+
+            if column == 3:
+                return item.status
+
+            return ''
+
+        if role == QtCore.Qt.BackgroundRole:
+            return self.row_brushes.get(item.status)
+
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.header_labels[section]
+
+        return None
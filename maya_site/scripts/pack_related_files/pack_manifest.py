@@ -0,0 +1,189 @@
+""" Manifest stored in the pack root directory, used to know which files are
+already packed so next pack only copies new or changed files.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import json
+import os
+
+import pack_checksums
+
+
+class PackManifest(object):
+    """ Records every file copied into a pack directory.
+
+    Every record is appended as one json line when a copy finishes, so an
+    interrupted pack keeps the files already copied and resumes from there.
+    The file is rewritten with one line per file when saved.
+    """
+
+    ## File name of the manifest in the pack root directory.
+    # type: str
+    FILE_NAME = '.pack_manifest.jsonl'
+
+    def __init__(self, pack_directory, use_hash=False):
+
+        ## Root directory of the pack.
+        # type: str
+        self.pack_directory = pack_directory
+
+        ## Full path name of the manifest file.
+        # type: str
+        self.manifest_path = os.path.join(pack_directory, self.FILE_NAME).replace('\\', '/')
+
+        ## Compare file contents hash besides size and modification time.
+        # type: bool
+        self.use_hash = use_hash
+
+        ## Records by destination path relative to pack directory.
+        # type: {}
+        self.records = {}
+
+        self._journal = None
+
+        self.load()
+
+    def load(self):
+        """ Loads records from manifest file if any, last record of a file wins.
+        """
+
+        self.records = {}
+
+        if not os.path.exists(self.manifest_path):
+            return
+
+        with open(self.manifest_path, 'r') as manifest:
+            for line in manifest:
+                try:
+                    record = json.loads(line)
+
+                # Last line could be truncated if pack was interrupted.
+                except ValueError:
+                    continue
+
+                self.records[record['path']] = record
+
+        return
+
+    def save(self):
+        """ Rewrites manifest file with one line per record.
+        """
+
+        self.close()
+
+        if not os.path.isdir(self.pack_directory):
+            os.makedirs(self.pack_directory)
+
+        with open(self.manifest_path, 'w') as manifest:
+            for relative_path in sorted(self.records):
+                manifest.write(json.dumps(self.records[relative_path]) + '\n')
+
+        return
+
+    def close(self):
+        """ Closes the journal opened while recording.
+        """
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        return
+
+    def relative_path(self, destination):
+        """ Gets the destination path relative to pack directory.
+        Args:
+            destination: String representing the full destination path.
+        Return:
+            String representing the relative path with forward slashes.
+        """
+
+        relative_path = os.path.relpath(destination, self.pack_directory)
+
+        return relative_path.replace('\\', '/')
+
+    def is_up_to_date(self, source, destination):
+        """ Checks if destination is already packed from current source.
+        Args:
+            source: String representing the source full path name.
+            destination: String representing the destination full path name.
+        Return:
+            True if there is no need to copy source, False otherwise.
+        """
+
+        record = self.records.get(self.relative_path(destination))
+
+        if record is None or record.get('source') != source:
+            return False
+
+        try:
+            source_stat = os.stat(source)
+            destination_size = os.path.getsize(destination)
+
+        except OSError:
+            return False
+
+        if record['size'] != source_stat.st_size or destination_size != source_stat.st_size:
+            return False
+
+        if record['mtime'] == int(source_stat.st_mtime):
+            return True
+
+        # Touched file, still the same if contents did not change.
+        if self.use_hash and record.get('hash'):
+            algorithm = record.get('hash_algorithm', pack_checksums.DEFAULT_ALGORITHM)
+
+            return record['hash'] == pack_checksums.hash_file(source, algorithm)
+
+        return False
+
+    def filter_jobs(self, jobs):
+        """ Splits copy jobs into the ones to copy and the ones already packed.
+        Args:
+            jobs: List of tuples (source full path, destination full path).
+        Return:
+            Tuple (list of jobs to copy, list of jobs up to date).
+        """
+
+        to_copy = []
+        up_to_date = []
+
+        for job in jobs:
+            if self.is_up_to_date(*job):
+                up_to_date.append(job)
+
+            else:
+                to_copy.append(job)
+
+        return to_copy, up_to_date
+
+    def record(self, source, destination, digest=None, algorithm=pack_checksums.DEFAULT_ALGORITHM):
+        """ Records a finished copy and appends it to the manifest file.
+        Args:
+            source: String representing the source full path name.
+            destination: String representing the destination full path name.
+            digest: String representing the hex digest computed while copying.
+            algorithm: String representing the hash algorithm of digest.
+        """
+
+        source_stat = os.stat(source)
+
+        record = {'path': self.relative_path(destination),
+                  'source': source,
+                  'size': source_stat.st_size,
+                  'mtime': int(source_stat.st_mtime)}
+
+        if self.use_hash:
+            record['hash'] = digest or pack_checksums.hash_file(destination, algorithm)
+            record['hash_algorithm'] = algorithm
+
+        self.records[record['path']] = record
+
+        if self._journal is None:
+            self._journal = open(self.manifest_path, 'a')
+
+        self._journal.write(json.dumps(record) + '\n')
+        self._journal.flush()
+
+        return
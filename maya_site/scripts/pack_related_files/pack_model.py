@@ -0,0 +1,188 @@
+""" Data of the files to pack, indexed by path and grouped by category. The
+pack window is a view of this data.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import collections
+import os
+
+
+## Status for files under the folder structure.
+# type: str
+IN_STRUCTURE = 'Yes'
+
+## Status for files outside the folder structure.
+# type: str
+NOT_IN_STRUCTURE = 'No'
+
+## Status for files which do not exist.
+# type: str
+MISSING = 'Path does not exist!'
+
+## Status for files not checked on disk yet.
+# type: str
+PENDING = 'Checking...'
+
+
+def normalize_path(path):
+    """ Normalizes a path to be used as index key.
+    Args:
+        path: String representing a full path name.
+    Return:
+        String with forward slashes and case normalized for the platform.
+    """
+
+    return os.path.normcase(path).replace('\\', '/')
+
+
+class PackItem(object):
+    """ One file to pack.
+    """
+
+    __slots__ = ('category', 'path', 'size', 'status')
+
+    def __init__(self, category, path, size=0, status=PENDING):
+
+        ## Category the file belongs to (eg. 'Images').
+        # type: str
+        self.category = category
+
+        ## Full path name of the file.
+        # type: str
+        self.path = path
+
+        ## Size of the file in bytes.
+        # type: int
+        self.size = size
+
+        ## IN_STRUCTURE, NOT_IN_STRUCTURE, MISSING or PENDING.
+        # type: str
+        self.status = status
+
+
+class PackModel(object):
+    """ Files to pack indexed by normalized path, grouped by category and
+    counted by status.
+    """
+
+    def __init__(self):
+
+        ## Items by normalized path.
+        # type: {}
+        self.index = {}
+
+        ## List of items by category, in the order categories were added.
+        # type: OrderedDict
+        self.categories = collections.OrderedDict()
+
+        ## Amount of items by status.
+        # type: {}
+        self.counts = collections.defaultdict(int)
+
+        ## Size in bytes of every item.
+        # type: int
+        self.total_size = 0
+
+    def __len__(self):
+
+        return len(self.index)
+
+    def __contains__(self, path):
+
+        return normalize_path(path) in self.index
+
+    def get(self, path):
+        """ Gets the item of passed path.
+        Args:
+            path: String representing a full path name.
+        Return:
+            PackItem, None if path is not in model.
+        """
+
+        return self.index.get(normalize_path(path))
+
+    def add(self, category, path, size=0, status=PENDING):
+        """ Adds a file to the model, if it is not already in it.
+        Args:
+            category: String representing the category of the file.
+            path: String representing the full path name.
+            size: Integer representing the size in bytes.
+            status: IN_STRUCTURE, NOT_IN_STRUCTURE, MISSING or PENDING.
+        Return:
+            Added PackItem, None if path already was in model.
+        """
+
+        key = normalize_path(path)
+
+        if key in self.index:
+            return None
+
+        item = PackItem(category, path, size, status)
+
+        self.index[key] = item
+        self.categories.setdefault(category, []).append(item)
+        self.counts[status] += 1
+        self.total_size += size
+
+        return item
+
+    def set_status(self, item, status, size=None):
+        """ Updates status of an item keeping counts up to date.
+        Args:
+            item: PackItem to update.
+            status: IN_STRUCTURE, NOT_IN_STRUCTURE or MISSING.
+            size: Integer representing the size in bytes, None to keep it.
+        """
+
+        self.counts[item.status] -= 1
+        self.counts[status] += 1
+
+        item.status = status
+
+        if size is not None:
+            self.total_size += size - item.size
+            item.size = size
+
+        return
+
+    def items(self, category=None):
+        """ Gets items of a category or every item.
+        Args:
+            category: String representing the category, None for every item.
+        Return:
+            List of PackItem.
+        """
+
+        if category is not None:
+            return self.categories.get(category, [])
+
+        return [item for items in self.categories.values() for item in items]
+
+    def paths(self, status):
+        """ Gets paths of every item with passed status.
+        Args:
+            status: IN_STRUCTURE, NOT_IN_STRUCTURE or MISSING.
+        Return:
+            List of string representing full path names.
+        """
+
+        return [item.path for item in self.items() if item.status == status]
+
+    def count(self, status):
+        """ Gets the amount of items with passed status.
+        Args:
+            status: IN_STRUCTURE, NOT_IN_STRUCTURE or MISSING.
+        Return:
+            Integer representing the amount of items.
+        """
+
+        return self.counts[status]
+
+    def packable_count(self):
+        """ Gets the amount of items that exist and can be packed.
+        Return:
+            Integer representing the amount of items.
+        """
+
+        return self.counts[IN_STRUCTURE] + self.counts[NOT_IN_STRUCTURE]
@@ -5,16 +5,23 @@
 
 import os
 import sys
-import math
 
 import pymel
-import xgenm
 
-import maya.app.general.fileTexturePathResolver
+import dependency_scanner
+import pack_api
+import pack_archive
+import pack_checksums
+import pack_model
+import stat_cache
 
 from PySide2 import QtWidgets, QtCore, QtGui
 
+from estimate_worker import EstimateWorker
 from pack_related_files_UI import PackRelatedFilesUI
+from pack_item_model import PackItemModel
+from pack_store import ContentStore
+from stat_worker import StatWorker
 
 class PackRelatedFilesCore(PackRelatedFilesUI):
     """ Add funtionaly to windows ui, to show gathered data.
@@ -38,78 +45,69 @@ class PackRelatedFilesCore(PackRelatedFilesUI):
     
     ## String for inexisting path in system
     # type: str
-    _NO_EXIST_LABEL = 'Path does not exist!'
+    _NO_EXIST_LABEL = pack_model.MISSING
+
+    ## Row color by status of the file.
+    # type: {}
+    _ROW_COLORS = {_NO_EXIST_LABEL: _NO_EXISTS,
+                   pack_model.NOT_IN_STRUCTURE: _NO_IN_STRUCTURE}
 
 
     def __init__(self, parent=None):
         super(PackRelatedFilesCore, self).__init__(parent=parent)
 
-        self.references_QTreeWidget.setHeaderLabels(self._HEADER_LABELS)
+        ## Root folder of the folder structure.
+        # type: str
+        self.root_directory = pack_api.get_root_directory()
+
+        ## Directory selected to pack into.
+        # type: str
+        self.pack_directory = ''
 
         ########################################################################
         # Get the referenced files at instancing.
         ########################################################################
-        self.xgen_palettes = xgenm.palettes()
-        self.all_file_nodes = self.get_all_unique_file_nodes()
-        self.all_reference_files = self.get_reference_file_path()
+        self.dependencies = dependency_scanner.scan_scene_dependencies()
+        self.pack_files = self.populate_pack_model()
 
         ########################################################################
         self.populate_reference_QtWidget()
 
+        ########################################################################
+        # Check files on disk in background.
+        ########################################################################
+        self.stat_worker = StatWorker(parent=self)
+        self.stat_worker.stats_ready.connect(self.on_stats_ready)
+        self.stat_worker.finished.connect(self.check_if_paths_to_pack)
 
-        # self.amount_of_paths = len(list(self.get_paths_from_QtWidget('Yes'))) + 
-        # # print('++++++++++++++++++++++++++++++++++++++++++++++++, next No')
-        # self.get_paths_from_QtWidget('No')
+        ########################################################################
+        # Probe pack directory in background.
+        ########################################################################
+        self.estimate_worker = EstimateWorker(parent=self)
+        self.estimate_worker.estimate_ready.connect(self.on_estimate_ready)
+        self.estimate_worker.estimate_failed.connect(self.estimate_label.setText)
 
-        self.check_if_paths_to_pack()
         ########################################################################
         # Connect signals
         ########################################################################
         self.pack_buttonBox.rejected.connect(self.close)
         self.browse_button.clicked.connect(self.on_browse_clicked)
+        self.finished.connect(self.stat_worker.stop)
+        self.finished.connect(self.estimate_worker.stop)
 
         self.pack_buttonBox.accepted.connect(self.copy_files_into_pack_folder)
 
-    def get_all_unique_file_nodes(self):
-        """ Gets all files nodes without repeating the image loaded in it.
-        Return:
-            List of file nodes representing the full file path to a texture.
-        """
-
-        unique_node_files = []
-        unique_paths = []
-
-        for file_node in pymel.core.ls(type='file'):
-            path = pymel.core.general.getAttr('{}.fileTextureName'.format(file_node))
-
-            if path not in unique_paths:
-                unique_paths.append(path)
-                unique_node_files.append(file_node)
-
-        return unique_node_files
-
-    def get_all_unique_full_file_paths(self):
-        """ Gets every full file path for images including UDIM related files,
-        based on file nodes.
-        Return:
-            List of string representing full file path.
-        """
-
-        for file_node in self.all_file_nodes:
-            path = pymel.core.general.getAttr('{}.fileTextureName'.format(file_node))
+        self.output_comboBox.addItems(pack_archive.available_formats())
+        self.output_comboBox.currentIndexChanged.connect(self.on_output_changed)
 
-            if path == '':
-                yield None
+        self.checksum_comboBox.addItems(pack_checksums.available_algorithms())
+        self.store_checkBox.toggled.connect(self.on_store_toggled)
+        self.incremental_checkBox.toggled.connect(self.show_pack_estimate)
+        self.verify_button.clicked.connect(self.verify_pack_folder)
 
-            uv_tiling_mode = pymel.core.general.getAttr('{}.uvTilingMode'.format(file_node))
-            if uv_tiling_mode != 0:
-                yield path
-
-            compound_file_name_patter = pymel.core.general.getAttr('{}.computedFileTextureNamePattern'.format(file_node))
-            all_files_related_for_pattern = maya.app.general.fileTexturePathResolver.findAllFilesForPattern(compound_file_name_patter, None)
-
-            for full_file_path in all_files_related_for_pattern:
-                yield full_file_path
+        # Files may have been deleted or restored since last dialog.
+        stat_cache.clear_stat_cache()
+        self.stat_worker.start([item.path for item in self.pack_files.items()])
 
     def check_if_paths_to_pack(self):
         """ Checks if there is any path to pack.
@@ -117,7 +115,7 @@ class PackRelatedFilesCore(PackRelatedFilesUI):
             True if there is something to pack, False otherwise.
         """
 
-        if list(self.get_paths_from_QtWidget('Yes')) or list(self.get_paths_from_QtWidget('No')):
+        if self.pack_files.packable_count():
             self.browse_button.setEnabled(True)
 
             return True
@@ -126,112 +124,35 @@ class PackRelatedFilesCore(PackRelatedFilesUI):
 
         return False
 
-    def populate_reference_QtWidget(self):
-        """ Check if there is files nodes, xgen collections and references in
-        current maya file.
+    def populate_pack_model(self):
+        """ Adds scanned dependencies into the pack model, pending to be
+        checked on disk.
         Return:
-            List ['Images', 'References', 'xgen'], is there is files associated
-        with them, otherwise will return empty list.
+            PackModel with every dependency.
         """
 
-        if self.xgen_palettes:
-            xgenItem = QtWidgets.QTreeWidgetItem(['Xgen', '', '', ''])
-            top_level_item = self.references_QTreeWidget.addTopLevelItem(xgenItem)
-
-            # This part add the main xgen file.
-            for main_xgen_file in self.get_xgen_collection_file():
-
-                arguments = self.analyse_full_path(main_xgen_file)
-                row_path = arguments[:4]
-                row_color_brush = arguments[-1]
-
-                xgen_item = QtWidgets.QTreeWidgetItem(row_path)
-
-                if row_color_brush is not None:
-                    for column in range(self.references_QTreeWidget.columnCount()):
-                        xgen_item.setBackground(column, row_color_brush)
-
-                xgenItem.addChild(xgen_item)
-
-            # This part add all related xgen files for styling xgen.
-            for path in self.get_every_file_full_path_name():
-                
-                arguments = self.analyse_full_path(path)
-                row_path = arguments[:4]
-                row_color_brush = arguments[-1]
-                
-                # Adding all referenced files from xgen thing.
-                xgen_item = QtWidgets.QTreeWidgetItem(row_path)
-
-                if row_color_brush is not None:
-                    for column in range(self.references_QTreeWidget.columnCount()):
-                        xgen_item.setBackground(column, row_color_brush)
-
-                xgenItem.addChild(xgen_item)
-
-        if self.all_file_nodes:
-            imagesItem = QtWidgets.QTreeWidgetItem(['Images', '', '', ''])
-            self.references_QTreeWidget.addTopLevelItem(imagesItem)
-
-            for path in self.get_all_unique_full_file_paths():
-
-                if path is None:
-                    continue
-
-                find_path = self.references_QTreeWidget.findItems(path, QtCore.Qt.MatchFixedString | QtCore.Qt.MatchRecursive, column=1)
-                
-                if find_path:
-                    continue
-                
-                arguments = self.analyse_full_path(path)
-                row_path = arguments[:4]
-                row_color_brush = arguments[-1]
+        model = pack_model.PackModel()
 
-                # Adding all referenced files from xgen thing.
-                image_item = QtWidgets.QTreeWidgetItem(row_path)
+        for dependency in self.dependencies:
+            model.add(dependency.category, dependency.path)
 
-                if row_color_brush is not None:
-                    for column in range(self.references_QTreeWidget.columnCount()):
-                        image_item.setBackground(column, row_color_brush)
+        return model
 
-                imagesItem.addChild(image_item)
-        
-        if self.all_reference_files:
-            referencesItem = QtWidgets.QTreeWidgetItem(['References', '', '', ''])
-            self.references_QTreeWidget.addTopLevelItem(referencesItem)
-
-            for path in self.all_reference_files:
-                
-                arguments = self.analyse_full_path(path)
-                row_path = arguments[:4]
-                row_color_brush = arguments[-1]
-                
-                # Adding all referenced files from xgen thing.
-                ref_item = QtWidgets.QTreeWidgetItem(row_path)
-
-                if row_color_brush is not None:
-                    for column in range(self.references_QTreeWidget.columnCount()):
-                        ref_item.setBackground(column, row_color_brush)
-
-                referencesItem.addChild(ref_item)
-        
-        current_file_item = QtWidgets.QTreeWidgetItem(['Current_File', '', '', ''])
-        self.references_QTreeWidget.addTopLevelItem(current_file_item)
-        arguments = self.analyse_full_path(pymel.core.sceneName())
-        
-        row_path = arguments[:4]
-        row_color_brush = arguments[-1]
-
-        currentFile = QtWidgets.QTreeWidgetItem(row_path)
+    def populate_reference_QtWidget(self):
+        """ Shows pack model in QTreeView, one top level row per category
+        found (Xgen, Images, References, Current_File).
+        """
 
-        if row_color_brush is not None:
-            for column in range(self.references_QTreeWidget.columnCount()):
-                currentFile.setBackground(column, row_color_brush)
+        self.pack_item_model = PackItemModel(self.pack_files,
+                                             self._HEADER_LABELS,
+                                             self._ROW_COLORS,
+                                             pack_api.convert_size,
+                                             parent=self)
 
-        current_file_item.addChild(currentFile)
+        self.references_QTreeView.setModel(self.pack_item_model)
 
         return
-    
+
     def on_browse_clicked(self):
         """ Executes when select directory button clicked.
         """
@@ -246,193 +167,207 @@ class PackRelatedFilesCore(PackRelatedFilesUI):
 
         if self.pack_directory == '':
             self.pack_buttonBox.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(False)
+            self.verify_button.setEnabled(False)
 
             return
         
         self.pack_buttonBox.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(True)
+        self.verify_button.setEnabled(True)
+
+        self.show_pack_estimate()
 
         return
-    
-    def get_paths_from_QtWidget(self, in_folder_structure):
-        """ Get paths from QTreeWidget based on passed argument, in or not in 
-        folder structure.
-        Args:
-            in_folder_structure: String 'Yes' or 'No'
-        yield a string representing the path of the referenced file.
+
+    def show_pack_estimate(self):
+        """ Starts estimating files, size and time expected to pack into
+        selected directory, shown by category when ready.
         """
 
-        for item in self.references_QTreeWidget.findItems(in_folder_structure, QtCore.Qt.MatchFixedString | QtCore.Qt.MatchRecursive, column=3):
-            # print(item.text(1))
-            yield item.text(1)
+        if not self.pack_directory:
+            return
 
-    def get_collection_path(self):
-        """ Gets the current collection if there is pallets in file.
-        Return:
-            List of string representing the path to present collections.
+        copy_jobs = pack_api.build_copy_jobs(self.pack_files,
+                                             self.pack_directory,
+                                             self.root_directory)
+
+        self.estimate_label.setText('Estimating pack...')
+        self.estimate_worker.start(self.pack_files,
+                                   copy_jobs,
+                                   self.pack_directory,
+                                   workers=self.workers_spinBox.value(),
+                                   incremental=self.incremental_checkBox.isChecked() and self.incremental_checkBox.isEnabled())
+
+        return
+
+    def on_estimate_ready(self, estimate):
+        """ Executes when the pack estimate finished.
+        Args:
+            estimate: PackEstimate of selected directory.
         """
 
-        collection_paths = []
+        self.estimate_label.setText(estimate.summary(pack_api.convert_size))
 
-        for palette in self.xgen_palettes:
-            for path, dirs, files in os.walk(xgenm.localRepo()):
-                if palette in dirs:
-                    collection_path = os.path.join(path, palette)
-                    collection_path_reformat = collection_path.replace('\\', '/')
-                    collection_paths.append(collection_path_reformat)
-        
-        return collection_paths
+        return
     
-    def compose_on_root_destination_directory(self, path, root_folder):
-        """ Compose destination directory for files within in root folder,
-        based on selected directory and current item directory path.
-        Args:
-            path: Is a string representing the current full path name for 
-            referenced files within current maya file.
-            root_folder: Is a string representing the name of the root folder
-            "ADI_project" expected.
-        Return:
-            tuple (string source path, string destination path)
+    def on_output_changed(self, index):
+        """ Executes when pack output changes, volumes only apply to archives.
         """
 
-        index = path.find(root_folder)
-        path_under_root_folder = path[index:]
+        is_archive = self.output_comboBox.currentText() != 'Folder'
 
-        # compose destination path
-        destination_path = os.path.join(self.pack_directory, path_under_root_folder)
-        destination_path_formatted = destination_path.replace('\\', '/')
+        self.volume_spinBox.setEnabled(is_archive)
+        self.incremental_checkBox.setEnabled(not is_archive)
+        self.hash_checkBox.setEnabled(not is_archive)
+        self.store_checkBox.setEnabled(not is_archive)
+        self.on_store_toggled(self.store_checkBox.isChecked())
 
-        return path, destination_path_formatted
+        self.show_pack_estimate()
 
-    def compose_not_on_root_destination_directory(self, path):
-        """ Compose destination directory for files not in root folder,
-        based on selected directory and current item directory path.
+        return
+
+    def on_store_toggled(self, checked):
+        """ Executes when store is toggled, the store only supports sha1
+        checksums.
         Args:
-            path: Is a string representing the current full path name for 
-            referenced files within current maya file.
-        Return:
-            tuple (string source path, string destination path)
+            checked: True if store checkbox is checked.
         """
 
-        # CONSIDER XGEN FOLDER OUTSIDE OF STRUCTURE, SO WE CAN SEARCH FOR xgen
-        # folder and that could be the folder to copy.
-        path_parts = path.split('/')
-        xgen_folder = 'xgen'
+        uses_store = checked and self.store_checkBox.isEnabled()
 
-        if xgen_folder in path_parts:
-            index = path.find(xgen_folder)
-            path_under_root_folder = path[index:]
+        if uses_store:
+            self.checksum_comboBox.setCurrentText('sha1')
 
-            # compose destination path
-            destination_path = os.path.join(self.pack_directory, path_under_root_folder)
-            destination_path_formatted = destination_path.replace('\\', '/')
+        self.checksum_comboBox.setEnabled(not uses_store)
 
-            return path, destination_path_formatted
+        return
 
-        # HERE WILL USE THE TOP MOST DIRECTORY OF THE LONGEST FILE
-        longest_dir_parts = path.split('/')[1:]
-        destination_path = os.path.join(self.pack_directory, *longest_dir_parts)
-        destination_path_formatted = destination_path.replace('\\', '/')
+    def copy_files_into_pack_folder(self):
+        """ Copies files into pack folder, or streams them into an archive
+        inside pack folder.
+        """
 
-        return path, destination_path_formatted
+        copy_jobs = pack_api.build_copy_jobs(self.pack_files,
+                                             self.pack_directory,
+                                             self.root_directory)
 
-    def get_every_file_full_path_name(self):
-        """ Gets full path of every file under collection path.
-        Yield:
-            Yields every full path name of every file found.
-        """
+        self.progress_bar.setValue(0)
 
-        collection_path_list = self.get_collection_path()
+        if self.output_comboBox.currentText() != 'Folder':
+            report = self.write_files_into_archive(copy_jobs)
 
-        for collection_path in collection_path_list:
-            for path, dirs, files in os.walk(collection_path):
-                if not files:
-                    continue
-                for col_file in files:
-                    file_path = os.path.join(path, col_file)
-                    file_path_reformat = file_path.replace('\\', '/')
-                    yield file_path_reformat
-    
-    def get_xgen_collection_file(self):
-        """ Gets the xgen file related to current maya file. (eg. maya_file__xgenPalettes.xgen)
-        """
+        else:
+            report = self.copy_files(copy_jobs)
 
-        current_maya_full_path_name = pymel.core.sceneName()
-        maya_file_dir = os.path.dirname(current_maya_full_path_name)
-        maya_file_name = os.path.basename(current_maya_full_path_name)
-        maya_file_name_no_extension = os.path.splitext(maya_file_name)[0]
-
-        for palette in self.xgen_palettes:
-            
-            xgen_file_name = '{}__{}.xgen'.format(maya_file_name_no_extension, palette)
-            
-            xgen_full_path = os.path.join(maya_file_dir, xgen_file_name)
-
-            if os.path.exists(xgen_full_path):
-                xgen_full_path_reformat = xgen_full_path.replace('\\', '/')
-                yield xgen_full_path_reformat
-                
-    def copy_files_into_pack_folder(self):
-        """ Copies files into pack folder.
+        # Every file was already packed.
+        if not report.files_copied and not report.failures:
+            self.progress_bar.setMaximum(1)
+            self.progress_bar.setValue(1)
+
+        msg = 'Files copied under: \n{}\n\n{}'.format(self.pack_directory,
+                                                       report.summary(pack_api.convert_size))
+
+        self.show_info_msg(msg)
+
+        return
+
+    def copy_files(self, copy_jobs):
+        """ Copies files into pack folder keeping its layout.
+        Args:
+            copy_jobs: List of tuples (source full path, destination full path).
+        Return:
+            CopyReport with the results.
         """
-        root_path = os.path.expandvars("%ADI_ROOT_FOLDER%")
-        root_folder = os.path.basename(root_path)
 
-        # TODO: Create a clean folders in the pack firectory to remove
-        # folders not required, walk through folder omiting ADI_project and xgen
-        # the other can be analized to remove un used folders.
+        store_directory = None
 
-        total_files = len(list(self.get_paths_from_QtWidget('Yes'))) + len(list(self.get_paths_from_QtWidget('No')))
-        self.progress_bar.setMaximum(total_files)
-        progress = 0
+        if self.store_checkBox.isChecked():
+            store_directory = ContentStore.default_directory(self.pack_directory)
 
-        # THIS ALREADY WORKS AS EXPECTED MUTTED TO ADD NO Files.
-        if list(self.get_paths_from_QtWidget('Yes')):
+        return pack_api.pack(copy_jobs,
+                             self.pack_directory,
+                             workers=self.workers_spinBox.value(),
+                             incremental=self.incremental_checkBox.isChecked(),
+                             use_hash=self.hash_checkBox.isChecked(),
+                             on_file_copied=self.on_file_copied,
+                             store_directory=store_directory,
+                             checksum_algorithm=self.checksum_comboBox.currentText())
 
-            for path in self.get_paths_from_QtWidget('Yes'):
-                source_full_path_name, destination_path_name = self.compose_on_root_destination_directory(path, root_folder)    
-                destination_directory = os.path.dirname(destination_path_name)
+    def write_files_into_archive(self, copy_jobs):
+        """ Streams files into an archive named after current maya file,
+        keeping the pack folder layout inside it.
+        Args:
+            copy_jobs: List of tuples (source full path, destination full path).
+        Return:
+            CopyReport with the results.
+        """
 
-                if not os.path.exists(destination_directory):
-                    os.makedirs(destination_directory)
-                
-                source_full_path_name_reformat = source_full_path_name.replace('/', '\\')
-                destination_path_name_reformat = destination_path_name.replace('/', '\\')
+        archive_format = self.output_comboBox.currentText()
+        scene_name = os.path.splitext(os.path.basename(pymel.core.sceneName()))[0]
+        archive_path = pack_archive.default_archive_path(self.pack_directory,
+                                                         archive_format,
+                                                         name=scene_name)
 
-                # copy the files
-                os.popen('copy {} {}'.format(source_full_path_name_reformat, destination_path_name_reformat))
-            
-                progress += 1
-                self.progress_bar.setValue(progress)
+        volume_size = int(self.volume_spinBox.value() * 1024 ** 3) or None
 
-        if list(self.get_paths_from_QtWidget('No')):
-        
-            list_of_path_not_in_structure = self.get_paths_from_QtWidget('No')
-            paths_not_in_structure_dic = {path:len(os.path.dirname(path).split('/')) for path in list_of_path_not_in_structure}
-            list_key_value_pairs = paths_not_in_structure_dic.items()        
-            list_sorted = sorted(list_key_value_pairs, key=lambda x: x[1], reverse=True)
+        report, _ = pack_archive.write_archive(copy_jobs,
+                                               self.pack_directory,
+                                               archive_path,
+                                               archive_format,
+                                               volume_size=volume_size,
+                                               on_file_copied=self.on_file_copied,
+                                               checksum_algorithm=self.checksum_comboBox.currentText())
 
-            for value_pair in list_sorted:
-                path, _ = value_pair
+        return report
 
-                source_full_path_name, destination_path_name = self.compose_not_on_root_destination_directory(path)
-                destination_directory = os.path.dirname(destination_path_name)
+    def verify_pack_folder(self):
+        """ Rehashes every file of the pack folder and shows which ones do
+        not match the pack checksum file.
+        """
 
-                if not os.path.exists(destination_directory):
-                    os.makedirs(destination_directory)
+        self.progress_bar.setValue(0)
 
-                source_full_path_name_reformat = source_full_path_name.replace('/', '\\')
-                destination_path_name_reformat = destination_path_name.replace('/', '\\')
+        try:
+            report = pack_checksums.verify_pack(self.pack_directory,
+                                                workers=self.workers_spinBox.value(),
+                                                on_file_verified=self.on_file_verified)
 
-                os.popen('copy {} {}'.format(source_full_path_name_reformat, destination_path_name_reformat))
+        except (IOError, RuntimeError) as error:
+            self.show_info_msg(str(error))
 
-                progress += 1
-                self.progress_bar.setValue(progress)
+            return
 
-        msg = 'Files copied under: \n{}'.format(self.pack_directory)
+        msg = 'Pack verified: \n{}\n\n{}'.format(self.pack_directory, report.summary())
 
         self.show_info_msg(msg)
 
         return
+
+    def on_file_verified(self, done, total):
+        """ Executes every time a file finished verifying.
+        Args:
+            done: Integer representing the amount of files verified.
+            total: Integer representing the amount of files to verify.
+        """
+
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+        QtWidgets.QApplication.processEvents()
+
+        return
+
+    def on_file_copied(self, result, done, total):
+        """ Executes every time a file finished copying.
+        Args:
+            result: CopyResult of the finished copy.
+            done: Integer representing the amount of files finished.
+            total: Integer representing the amount of files to copy.
+        """
+
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+        QtWidgets.QApplication.processEvents()
+
+        return
     
     def show_info_msg(self, msg):
         """ Creates a generic msg box with ok button.
@@ -445,113 +380,39 @@ class PackRelatedFilesCore(PackRelatedFilesUI):
         return QtWidgets.QMessageBox.information(self, 'Information',
             msg, QtWidgets.QMessageBox.Ok)
         
-    def get_image_full_file_path(self, file_node):
-        """ Gets the full file path from file node passed.
+    def on_stats_ready(self, results):
+        """ Executes when a batch of paths was checked on disk.
         Args:
-            file_node: It is a maya File node.
+            results: List of tuples (path, exists, size in bytes).
         """
 
-        path = pymel.core.general.getAttr("{}.fileTextureName".format(file_node))
-        path_reformat = path.replace('\\', '/')
+        changed_items = []
 
-        if path_reformat == '':
-            return
+        for path, exists, size in results:
+            item = self.pack_files.get(path)
 
-        else:
-            return path_reformat
-    
-    def get_reference_file_path(self):
-        """ Gets paths from referenced files.
-        Return:
-            List of string representing the path of references.
-        """
-        list_reference_paths = []
-        refs = pymel.core.listReferences(references=True, loaded=True)
-
-        for ref in refs:
-            full_path = ref.path
+            if item is None:
+                continue
 
-            if '{' in full_path:
-                full_path = full_path[:full_path('{')]
+            self.pack_files.set_status(item, self.analyse_full_path(path, exists), size)
+            changed_items.append(item)
 
-            list_reference_paths.append(full_path)
+        self.pack_item_model.items_changed(changed_items)
 
-        return list_reference_paths
-    
-    def get_file_size(self, full_path):
-        """ Get file size based on passed full path.
-        Args:
-            full_path: It is a string representing the full path to file.
-        Return:
-            String representing the size of the file.
-        """
+        self.total_size_label.setText('Total size: {}'.format(pack_api.convert_size(self.pack_files.total_size)))
 
-        size_bytes = os.path.getsize(full_path)
+        return
 
-        return self.convert_size(size_bytes)
-    
-    def analyse_full_path(self, path):
-        """ Analizes path for existance, file size.
+    def analyse_full_path(self, path, exists):
+        """ Analizes path for existance and folder structure.
         Args:
             path: String representing the passed full file path.
+            exists: True if path exists on disk, False otherwise.
         Return:
-            tuple ('', full_path, file_size, 'yes/No', "") 
-        """
-
-        row_color_brush = None
-        in_folder_structure = ''
-
-        if not os.path.exists(path):
-            file_size = '0'
-            in_folder_structure = self._NO_EXIST_LABEL
-            row_color_brush = QtGui.QBrush(self._NO_EXISTS)
-
-        else:
-            file_size = self.get_file_size(path)
-            in_folder_structure = self.in_folder_structure(path)
-
-            if not in_folder_structure:
-                in_folder_structure = 'No'
-                row_color_brush = QtGui.QBrush(self._NO_IN_STRUCTURE)
-
-            else:
-                in_folder_structure = 'Yes'
-
-        return ('', path, file_size, in_folder_structure, row_color_brush)
-
-    def in_folder_structure(self, full_path):
-        """ Check if directory is in current folder structure.
-        Args:
-            full_path: It is a string representing the full path to a file.
-        Return:
-            True if directory is part of the folder structure, false otherwise.
+            String representing the status 'Yes'/'No'/_NO_EXIST_LABEL
         """
 
-        root_directory = os.path.expandvars('%ADI_ROOT_FOLDER%')
-        root_full_path = full_path[:len(root_directory)]
-        root_full_path_reformat = root_full_path.replace('\\', '/')
-
-        if root_directory == root_full_path_reformat:
-
-            return True
-        
-        return False
-
-    def convert_size(self, size_bytes):
-        """ Convert bytes to human readable format.
-        Args:
-            size_bytes is an integer representing the file size in bytes.
-        Return:
-            String representing the size of the file.
-        """
-        if size_bytes == 0:
-            return "0B"
-
-        size_name = ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return "%s %s" % (s, size_name[i])
+        return pack_api.classify(path, exists, self.root_directory)
 
 
 def launch_pack_files():
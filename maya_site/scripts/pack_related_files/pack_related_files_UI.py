@@ -26,9 +26,22 @@ class PackRelatedFilesUI(QtWidgets.QDialog):
         ########################################################################
         # Create widgets
         ########################################################################
-        self.references_QTreeWidget = QtWidgets.QTreeWidget()
+        self.references_QTreeView = QtWidgets.QTreeView()
+        self.references_QTreeView.setUniformRowHeights(True)
 
-        main_layout.addWidget(self.references_QTreeWidget)
+        main_layout.addWidget(self.references_QTreeView)
+
+        # Total size of files to pack
+        ########################################################################
+        self.total_size_label = QtWidgets.QLabel('Total size: 0B')
+
+        main_layout.addWidget(self.total_size_label)
+
+        # Estimate of the pack in selected destination directory
+        ########################################################################
+        self.estimate_label = QtWidgets.QLabel('')
+
+        main_layout.addWidget(self.estimate_label)
 
         # Progress bar
         ########################################################################
@@ -49,6 +62,68 @@ class PackRelatedFilesUI(QtWidgets.QDialog):
 
         main_layout.addLayout(browse_layout)
 
+        # Amount of files copied at the same time
+        ########################################################################
+        workers_layout = QtWidgets.QHBoxLayout()
+
+        workers_label = QtWidgets.QLabel('Files copied at the same time')
+        self.workers_spinBox = QtWidgets.QSpinBox()
+        self.workers_spinBox.setRange(1, 64)
+        self.workers_spinBox.setValue(8)
+
+        workers_layout.addWidget(workers_label)
+        workers_layout.addWidget(self.workers_spinBox)
+
+        main_layout.addLayout(workers_layout)
+
+        # Incremental pack options
+        ########################################################################
+        self.incremental_checkBox = QtWidgets.QCheckBox('Only copy new or changed files')
+        self.incremental_checkBox.setChecked(True)
+
+        self.hash_checkBox = QtWidgets.QCheckBox('Compare file contents')
+
+        main_layout.addWidget(self.incremental_checkBox)
+        main_layout.addWidget(self.hash_checkBox)
+
+        # Deduplicate files shared by several packs
+        ########################################################################
+        self.store_checkBox = QtWidgets.QCheckBox('Link files from shared store (.pack_store next to pack)')
+
+        main_layout.addWidget(self.store_checkBox)
+
+        # Pack into a folder or stream into an archive
+        ########################################################################
+        output_layout = QtWidgets.QHBoxLayout()
+
+        output_label = QtWidgets.QLabel('Pack output')
+        self.output_comboBox = QtWidgets.QComboBox()
+        self.output_comboBox.addItem('Folder')
+
+        volume_label = QtWidgets.QLabel('Volume size (GB, 0 = no split)')
+        self.volume_spinBox = QtWidgets.QDoubleSpinBox()
+        self.volume_spinBox.setRange(0, 1024)
+        self.volume_spinBox.setEnabled(False)
+
+        output_layout.addWidget(output_label)
+        output_layout.addWidget(self.output_comboBox)
+        output_layout.addWidget(volume_label)
+        output_layout.addWidget(self.volume_spinBox)
+
+        main_layout.addLayout(output_layout)
+
+        # Checksums written into the pack to verify it later
+        ########################################################################
+        checksum_layout = QtWidgets.QHBoxLayout()
+
+        checksum_label = QtWidgets.QLabel('Checksum algorithm')
+        self.checksum_comboBox = QtWidgets.QComboBox()
+
+        checksum_layout.addWidget(checksum_label)
+        checksum_layout.addWidget(self.checksum_comboBox)
+
+        main_layout.addLayout(checksum_layout)
+
         ########################################################################
         # Create buttons for UI
         ########################################################################
@@ -58,6 +133,9 @@ class PackRelatedFilesUI(QtWidgets.QDialog):
         self.pack_buttonBox.button(QtWidgets.QDialogButtonBox.Ok).setText('Pack')
         self.pack_buttonBox.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(False)
 
+        self.verify_button = self.pack_buttonBox.addButton('Verify pack', QtWidgets.QDialogButtonBox.ActionRole)
+        self.verify_button.setEnabled(False)
+
         main_layout.addWidget(self.pack_buttonBox)
 
 
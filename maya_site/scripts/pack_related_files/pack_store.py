@@ -0,0 +1,182 @@
+""" Content addressed store shared by several packs, every file is stored
+once keyed by the hash of its contents and linked into the pack folders.
+
+Linked files share their contents with the store, editing a file inside a
+pack edits it for every pack linked to it. Packing again, with or without
+the store, replaces linked files instead of writing through them.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+import shutil
+import uuid
+
+import pack_checksums
+
+
+class ContentStore(object):
+    """ Stores files by contents hash under objects/<first 2 chars>/<hash>.
+    """
+
+    ## Default directory name of the store, next to the pack directories.
+    # type: str
+    DIRECTORY_NAME = '.pack_store'
+
+    ## Ways of placing a stored file into a pack, in order of preference.
+    # type: []
+    LINK_MODES = ['hardlink', 'symlink', 'copy']
+
+    def __init__(self, store_directory, link_mode='hardlink'):
+
+        ## Root directory of the store.
+        # type: str
+        self.store_directory = store_directory.replace('\\', '/')
+
+        ## First link mode tried, next ones in LINK_MODES are the fallback.
+        # type: str
+        self.link_mode = link_mode
+
+    @classmethod
+    def default_directory(cls, pack_directory):
+        """ Gets the default store directory for a pack, so packs under the
+        same directory share the store.
+        Args:
+            pack_directory: String representing the pack directory.
+        Return:
+            String representing the store directory.
+        """
+
+        parent_directory = os.path.dirname(pack_directory.rstrip('/\\'))
+
+        return os.path.join(parent_directory, cls.DIRECTORY_NAME).replace('\\', '/')
+
+    def object_path(self, digest):
+        """ Gets where contents with passed hash are stored.
+        Args:
+            digest: String representing the hex digest of the contents.
+        Return:
+            String representing the full path of the stored object.
+        """
+
+        return '{}/objects/{}/{}'.format(self.store_directory, digest[:2], digest)
+
+    def store(self, source):
+        """ Stores source contents if they are not stored yet. Source is read
+        once, copied into a temporary file while hashed, so the object is
+        always keyed by the hash of what was copied even if source changes.
+        Args:
+            source: String representing the source full path name.
+        Return:
+            Tuple (object full path, True if contents were already stored, sha1 hex digest).
+        """
+
+        temporary_directory = '{}/tmp'.format(self.store_directory)
+
+        try:
+            os.makedirs(temporary_directory)
+
+        except OSError:
+            if not os.path.isdir(temporary_directory):
+                raise
+
+        # Copy under a unique name and rename, so other threads storing the
+        # same contents never see a half written object.
+        temporary_path = '{}/{}.tmp'.format(temporary_directory, uuid.uuid4().hex)
+
+        try:
+            digest = pack_checksums.copy_with_hash(source, temporary_path, 'sha1')[1]
+            object_path = self.object_path(digest)
+
+            if os.path.exists(object_path):
+                return object_path, True, digest
+
+            object_directory = os.path.dirname(object_path)
+
+            try:
+                os.makedirs(object_directory)
+
+            except OSError:
+                if not os.path.isdir(object_directory):
+                    raise
+
+            try:
+                os.rename(temporary_path, object_path)
+
+            except OSError:
+                if not os.path.exists(object_path):
+                    raise
+
+                return object_path, True, digest
+
+        finally:
+            if os.path.lexists(temporary_path):
+                os.remove(temporary_path)
+
+        return object_path, False, digest
+
+    def link(self, object_path, destination):
+        """ Places a stored object at destination, trying link modes from
+        self.link_mode on. The link is created under a temporary name renamed
+        over destination, so a previous file or link at destination is
+        replaced and whatever it pointed to is never written.
+        Args:
+            object_path: String representing the stored object full path.
+            destination: String representing the destination full path name.
+        Return:
+            String representing the link mode used.
+        """
+
+        link_modes = self.LINK_MODES[self.LINK_MODES.index(self.link_mode):]
+        temporary_path = pack_checksums.temporary_path_for(destination)
+
+        try:
+            for link_mode in link_modes:
+                try:
+                    if link_mode == 'hardlink':
+                        os.link(object_path, temporary_path)
+
+                    elif link_mode == 'symlink':
+                        os.symlink(os.path.abspath(object_path), temporary_path)
+
+                    else:
+                        shutil.copyfile(object_path, temporary_path)
+
+                    pack_checksums.replace_file(temporary_path, destination)
+
+                    return link_mode
+
+                # Not supported by platform, file system or across volumes.
+                except (AttributeError, NotImplementedError, OSError):
+                    if link_mode == link_modes[-1]:
+                        raise
+
+                    if os.path.lexists(temporary_path):
+                        os.remove(temporary_path)
+
+        finally:
+            if os.path.lexists(temporary_path):
+                os.remove(temporary_path)
+
+        return None
+
+    def place(self, source, destination):
+        """ Stores source and links it into destination.
+        Args:
+            source: String representing the source full path name.
+            destination: String representing the destination full path name.
+        Return:
+            Tuple (bytes written, bytes saved by the store, sha1 hex digest).
+        """
+
+        size = os.path.getsize(source)
+        object_path, already_stored, digest = self.store(source)
+        link_mode = self.link(object_path, destination)
+
+        bytes_written = 0 if already_stored else size
+
+        if link_mode == 'copy':
+            bytes_written += size
+
+        # Without a store source would have been written once.
+        return bytes_written, max(0, size - bytes_written), digest
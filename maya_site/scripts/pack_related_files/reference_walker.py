@@ -0,0 +1,67 @@
+""" Walks referenced maya files recursively without loading them, parsing
+the maya ascii files to find the files they depend on: nested references,
+textures, caches and xgen palettes.
+
+Maya binary files can not be read, they are listed but not walked.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import collections
+import os
+
+from common_utils import root_paths
+from common_utils import texture_tiles
+from common_utils.maya_ascii import REFERENCE, TEXTURE, XGEN, FileDependency, parse_dependencies
+
+
+def walk_references(reference_paths):
+    """ Walks referenced files and every file they reference, collecting
+    what they depend on. Shared files are walked only once.
+    Args:
+        reference_paths: List of string representing referenced files.
+    Return:
+        List of FileDependency without repeated paths, references first
+        found first, texture tokens expanded into the files on disk.
+    """
+
+    dependencies = collections.OrderedDict()
+    pending = list(reversed(reference_paths))
+
+    while pending:
+        reference_path = root_paths.expand_path(pending.pop())
+
+        if reference_path in dependencies:
+            continue
+
+        dependencies[reference_path] = FileDependency(REFERENCE, reference_path)
+
+        if not reference_path.lower().endswith('.ma'):
+            continue
+
+        nested_references = []
+
+        for dependency in parse_dependencies(reference_path):
+            if dependency.kind == REFERENCE:
+                nested_references.append(dependency.path)
+
+                continue
+
+            path = root_paths.expand_path(dependency.path)
+
+            # Xgen files are saved next to the maya file using them.
+            if dependency.kind == XGEN and not os.path.isabs(path):
+                path = os.path.join(os.path.dirname(reference_path), path)
+
+            paths = [path.replace('\\', '/')]
+
+            if dependency.kind == TEXTURE and texture_tiles.has_tokens(paths[0]):
+                paths = texture_tiles.resolve_pattern(paths[0])
+
+            for path in paths:
+                if path not in dependencies:
+                    dependencies[path] = FileDependency(dependency.kind, path)
+
+        pending.extend(reversed(nested_references))
+
+    return list(dependencies.values())
@@ -0,0 +1,61 @@
+""" Existence and size of files checked on disk, cached until the pack dialog
+is opened again.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+
+
+## Results of os.stat by path, cleared by every new pack dialog.
+# type: {path: (exists, size)}
+_STAT_CACHE = {}
+
+
+def clear_stat_cache():
+    """ Forgets every stat result, next requests go to disk again.
+    """
+
+    _STAT_CACHE.clear()
+
+    return
+
+
+def get_cached_stat(path):
+    """ Gets the stat result of a path checked before in this session.
+    Args:
+        path: String representing a full path name.
+    Return:
+        Tuple (path, exists, size in bytes), None if path was not checked.
+    """
+
+    cached_stat = _STAT_CACHE.get(path)
+
+    if cached_stat is None:
+        return None
+
+    return (path,) + cached_stat
+
+
+def stat_paths(paths):
+    """ Checks existence and size of passed paths, runs in worker threads.
+    Args:
+        paths: List of string representing full path names.
+    Return:
+        List of tuples (path, exists, size in bytes).
+    """
+
+    results = []
+
+    for path in paths:
+        try:
+            stat_result = os.stat(path)
+            result = (path, True, stat_result.st_size)
+
+        except OSError:
+            result = (path, False, 0)
+
+        _STAT_CACHE[path] = result[1:]
+        results.append(result)
+
+    return results
@@ -0,0 +1,108 @@
+""" Checks existence and size of files in background threads, results are
+sent back to the Qt main thread through signals as they arrive.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from PySide2 import QtCore
+
+from stat_cache import get_cached_stat, stat_paths
+
+
+class StatWorker(QtCore.QObject):
+    """ Stats paths using a pool of threads and streams results.
+    """
+
+    ## Emitted with a list of tuples (path, exists, size in bytes).
+    # type: Signal
+    stats_ready = QtCore.Signal(list)
+
+    ## Emitted when every requested path has a result.
+    # type: Signal
+    finished = QtCore.Signal()
+
+    ## Amount of paths checked by each task.
+    # type: int
+    _BATCH_SIZE = 64
+
+    def __init__(self, workers=16, parent=None):
+        super(StatWorker, self).__init__(parent)
+
+        ## Amount of threads checking paths at the same time.
+        # type: int
+        self.workers = workers
+
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def start(self, paths):
+        """ Starts checking passed paths, cached paths are sent right away.
+        Args:
+            paths: List of string representing full path names.
+        """
+
+        cached = []
+        to_stat = []
+
+        for path in paths:
+            cached_stat = get_cached_stat(path)
+
+            if cached_stat is not None:
+                cached.append(cached_stat)
+
+            else:
+                to_stat.append(path)
+
+        if cached:
+            self.stats_ready.emit(cached)
+
+        if not to_stat:
+            self.finished.emit()
+
+            return
+
+        batches = [to_stat[index:index + self._BATCH_SIZE]
+                   for index in range(0, len(to_stat), self._BATCH_SIZE)]
+
+        self._pending = len(batches)
+        self._pool = ThreadPool(self.workers)
+
+        for batch in batches:
+            self._pool.apply_async(stat_paths, (batch,), callback=self.on_batch_done)
+
+        self._pool.close()
+
+        return
+
+    def on_batch_done(self, results):
+        """ Executes in the pool thread when a batch finished, signals are
+        queued into the thread owning this object.
+        Args:
+            results: List of tuples (path, exists, size in bytes).
+        """
+
+        self.stats_ready.emit(results)
+
+        with self._lock:
+            self._pending -= 1
+            done = self._pending == 0
+
+        if done:
+            self.finished.emit()
+
+        return
+
+    def stop(self):
+        """ Stops checking paths not started yet.
+        """
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+        return
@@ -0,0 +1,106 @@
+""" Regression tests of the content store, run with
+python -m unittest test_pack_store or pytest from any directory.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pack_api
+import pack_checksums
+
+from pack_store import ContentStore
+
+
+class ContentStoreTest(unittest.TestCase):
+    """ Packs into a directory linked to a content store.
+    """
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'source', 'texture.tx')
+        self.pack_directory = os.path.join(self.directory, 'pack')
+        self.destination = os.path.join(self.pack_directory, 'texture.tx')
+        self.store_directory = ContentStore.default_directory(self.pack_directory)
+
+        os.makedirs(os.path.dirname(self.source))
+        self.write(self.source, b'first contents')
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, full_path, contents):
+
+        with open(full_path, 'wb') as file_to_write:
+            file_to_write.write(contents)
+
+        return
+
+    def read(self, full_path):
+
+        with open(full_path, 'rb') as file_to_read:
+            return file_to_read.read()
+
+    def pack(self, store_directory=None):
+
+        report = pack_api.pack([(self.source, self.destination)],
+                               self.pack_directory,
+                               workers=1,
+                               incremental=False,
+                               store_directory=store_directory)
+
+        self.assertFalse(report.failures)
+
+        return report
+
+    def stored_object(self):
+
+        return ContentStore(self.store_directory).object_path(pack_checksums.hash_file(self.source, 'sha1'))
+
+    def test_repack_without_store_keeps_object(self):
+        """ Packing again without the store must not write into the object
+        the previous pack linked.
+        """
+
+        self.pack(self.store_directory)
+        object_path = self.stored_object()
+
+        self.write(self.source, b'second contents')
+        self.pack()
+
+        self.assertEqual(self.read(object_path), b'first contents')
+        self.assertEqual(self.read(self.destination), b'second contents')
+
+    def test_repack_with_store_keeps_object(self):
+        """ Packing changed contents with the store links a new object and
+        keeps the previous one.
+        """
+
+        self.pack(self.store_directory)
+        object_path = self.stored_object()
+
+        self.write(self.source, b'second contents')
+        self.pack(self.store_directory)
+
+        self.assertEqual(self.read(object_path), b'first contents')
+        self.assertEqual(self.read(self.destination), b'second contents')
+
+    def test_link_leaves_no_temporary_files(self):
+
+        self.pack(self.store_directory)
+
+        self.assertEqual(sorted(os.listdir(self.pack_directory)),
+                         ['pack_checksums.sha1', 'texture.tx'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+""" Verifies a pack directory against its checksum file, rehashing every
+file in parallel. Does not need maya, run it with any python wherever the
+pack was delivered.
+
+Usage:
+    python verify_pack.py D:/delivery
+    python verify_pack.py D:/delivery --workers 16
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import argparse
+import logging
+import sys
+
+import pack_checksums
+
+
+def log_file_verified(done, total):
+    """ Logs verify progress every now and then.
+    """
+
+    if done == total or done % 500 == 0:
+        logging.info('Verified {} / {}'.format(done, total))
+
+    return
+
+
+def main(argv=None):
+    """ Verifies passed pack directory.
+    Args:
+        argv: List of command line arguments, sys.argv if None.
+    Return:
+        Integer exit code, 0 if every file matches its checksum.
+    """
+
+    parser = argparse.ArgumentParser(description='Verify a pack against its checksum file.')
+    parser.add_argument('pack_directory', help='Pack directory.')
+    parser.add_argument('--workers', type=int, default=8, help='Files hashed at the same time.')
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s: %(levelname)s: %(message)s',
+                        datefmt='%d/%m/%Y %I:%M %p')
+
+    try:
+        report = pack_checksums.verify_pack(args.pack_directory,
+                                            workers=args.workers,
+                                            on_file_verified=log_file_verified)
+
+    except (IOError, RuntimeError) as error:
+        logging.error(str(error))
+
+        return 2
+
+    logging.info('\n' + report.summary())
+
+    if not report.succeeded:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
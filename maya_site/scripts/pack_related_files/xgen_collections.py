@@ -0,0 +1,94 @@
+""" Finds xgen collections of every palette and the files under them with a
+single walk through the xgen local repository. Symlinked directories are not
+followed, like os.walk.
+
+@author Esteban Ortega <brutools@gmail.com>
+"""
+
+import collections
+import os
+
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
+
+
+## Collection directory of a palette and every file under it.
+# type: namedtuple
+XgenCollection = collections.namedtuple('XgenCollection', ['palette', 'path', 'files'])
+
+def list_directory(directory):
+    """ Lists a directory splitting directories and files, symlinks to
+    directories are left out so link cycles are not walked.
+    Args:
+        directory: String representing the directory full path.
+    Return:
+        Tuple (list of directory names, list of file names).
+    """
+
+    dir_names = []
+    file_names = []
+
+    try:
+        if scandir is not None:
+            for entry in scandir(directory):
+                if entry.is_dir(follow_symlinks=False):
+                    dir_names.append(entry.name)
+
+                elif not entry.is_dir():
+                    file_names.append(entry.name)
+
+        else:
+            for name in os.listdir(directory):
+                full_path = os.path.join(directory, name)
+
+                if not os.path.isdir(full_path):
+                    file_names.append(name)
+
+                elif not os.path.islink(full_path):
+                    dir_names.append(name)
+
+    except OSError:
+        pass
+
+    return dir_names, file_names
+
+
+def index_collections(repo_path, palettes):
+    """ Walks repo path once resolving the collection of every palette, a
+    collection is a directory named as the palette.
+    Args:
+        repo_path: String representing the xgen local repository.
+        palettes: List of xgen palette names.
+    Return:
+        List of XgenCollection, in the order they were found.
+    """
+
+    # Not cached, files added inside a collection do not change the
+    # modification time of the repository.
+    palettes = frozenset(palettes)
+    found_collections = []
+
+    # Directories to visit with the collection they belong to, if any.
+    pending = [(repo_path, None)]
+
+    while pending:
+        directory, collection = pending.pop()
+        dir_names, file_names = list_directory(directory)
+
+        if collection is not None:
+            collection.files.extend(os.path.join(directory, name).replace('\\', '/')
+                                    for name in file_names)
+
+        for name in dir_names:
+            sub_directory = os.path.join(directory, name)
+            sub_collection = collection
+
+            if collection is None and name in palettes:
+                sub_collection = XgenCollection(name, sub_directory.replace('\\', '/'), [])
+                found_collections.append(sub_collection)
+
+            pending.append((sub_directory, sub_collection))
+
+    return found_collections